@@ -0,0 +1,77 @@
+"""Benchmark search latency of a sharded FAISS index against its shard count."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from arxiv_rec.models.index import INDEX_TYPES, IndexConfig, exact_search, recall_at_k
+from arxiv_rec.models.sharded import build_index
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000, help="Synthetic corpus size")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument(
+        "--shards", default="1,2,4,8", help="Comma-separated shard counts to compare."
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument(
+        "--omp-threads",
+        type=int,
+        default=None,
+        help="FAISS OpenMP threads per search (defaults to all cores).",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.omp_threads:
+        faiss.omp_set_num_threads(args.omp_threads)
+    rng = np.random.default_rng(args.seed)
+    embeddings = rng.standard_normal((args.rows, args.dimension), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+    _, exact_ids = exact_search(embeddings, queries, args.k)
+
+    print(
+        f"{args.rows} x {args.dimension} {args.index_type} vectors, {args.queries} queries, "
+        f"k={args.k}, {faiss.omp_get_max_threads()} OpenMP threads"
+    )
+    print(
+        f"{'shards':>6} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'batch q/s':>10} {'recall':>7}"
+    )
+    for shards in [int(value) for value in args.shards.split(",")]:
+        config = IndexConfig(index_type=args.index_type, shards=shards)
+        started = time.perf_counter()
+        index = build_index(embeddings, config)
+        build_seconds = time.perf_counter() - started
+
+        index.search(queries[:1], k=args.k)  # warm up the thread pool
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query[None], k=args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        _, ids = index.search(queries, k=args.k)
+        batch_seconds = time.perf_counter() - started
+        print(
+            f"{shards:>6} {build_seconds:>8.2f} {np.percentile(latencies, 50):>8.3f} "
+            f"{np.percentile(latencies, 95):>8.3f} {len(queries) / batch_seconds:>10.0f} "
+            f"{recall_at_k(ids, exact_ids):>7.4f}"
+        )
+        if hasattr(index, "close"):
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
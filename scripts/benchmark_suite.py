@@ -0,0 +1,279 @@
+"""Offline benchmarks of ingest, cleaning, encoding, index build/search and the serving path.
+
+Runs without network or model downloads: the corpus is synthetic and queries are encoded
+with the deterministic hashing encoder. Results are written as JSON; ``--compare`` checks
+them against an earlier run and exits non-zero on regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import faiss
+import numpy as np
+import pyarrow as pa
+
+from arxiv_rec.data.clean import prepare_corpus
+from arxiv_rec.data.ingest import load_metadata
+from arxiv_rec.data.metadata import METADATA_COLUMNS, MetadataWriter
+from arxiv_rec.data.synthetic import HashingEmbedder, write_snapshot
+from arxiv_rec.models.artifacts import ArtifactPaths
+from arxiv_rec.models.index import INDEX_TYPES, IndexConfig, exact_search, recall_at_k
+from arxiv_rec.models.lexical import LexicalIndex
+from arxiv_rec.models.sharded import build_index
+
+# Metrics where a larger value is better; every other numeric metric is a cost.
+HIGHER_IS_BETTER = {"rows_per_sec", "qps", "batch_qps", "recall"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="2000,20000", help="Comma-separated corpus sizes.")
+    parser.add_argument(
+        "--index-types", default="flat,hnsw,ivf_flat", help=f"Subset of {','.join(INDEX_TYPES)}."
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs of each timed stage; the fastest is reported to damp scheduler noise.",
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmark.json"))
+    parser.add_argument(
+        "--work-dir", type=Path, default=None, help="Scratch directory (defaults to a temp dir)."
+    )
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON to diff against.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative slowdown (or recall/throughput drop) reported as a regression.",
+    )
+    return parser.parse_args()
+
+
+def timed(
+    function: Callable[..., Any], *args: Any, repeat: int = 1, **kwargs: Any
+) -> Tuple[Any, float]:
+    """Result of ``function`` and its fastest wall time over ``repeat`` runs."""
+
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def latencies_ms(function: Callable[[Any], Any], inputs: List[Any]) -> Dict[str, float]:
+    function(inputs[0])  # warm up lazily created state
+    samples = []
+    for item in inputs:
+        started = time.perf_counter()
+        function(item)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "qps": len(samples) / (sum(samples) / 1000),
+    }
+
+
+def throughput(rows: int, seconds: float) -> Dict[str, float]:
+    return {"seconds": seconds, "rows_per_sec": rows / seconds if seconds else float("inf")}
+
+
+def bench_index(
+    index_type: str,
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    exact_ids: np.ndarray,
+    k: int,
+    repeat: int,
+) -> Tuple[Any, Dict[str, float]]:
+    config = IndexConfig(index_type=index_type)
+    index, build_seconds = timed(build_index, embeddings, config, repeat=repeat)
+    (_, ids), batch_seconds = timed(index.search, queries, k=k, repeat=repeat)
+    result = {
+        "build_seconds": build_seconds,
+        "memory_bytes": index.memory_bytes(),
+        "batch_qps": len(queries) / batch_seconds,
+        "recall": recall_at_k(ids, exact_ids),
+    }
+    result.update(latencies_ms(lambda query: index.search(query[None], k=k), list(queries)))
+    return index, result
+
+
+def bench_lexical(directory: Path, texts: List[str], titles: List[str], k: int, repeat: int):
+    """BM25 build and single-query latency, to compare against the vector leg's budget."""
+
+    chunks = [texts[start : start + 10_000] for start in range(0, len(texts), 10_000)]
+    path = ArtifactPaths(directory).lexical
+    lexical, build_seconds = timed(LexicalIndex.build, chunks, path, repeat=repeat)
+    result = {"build_seconds": build_seconds, "memory_bytes": lexical.nbytes}
+    result.update(latencies_ms(lambda title: lexical.search([title], k), titles))
+    return result
+
+
+def write_artifacts(directory: Path, tidy, embeddings: np.ndarray, index) -> Path:
+    """Minimal artifact set ``RecommenderState`` can load (plus any lexical index already there)."""
+
+    paths = ArtifactPaths(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = [column for column in METADATA_COLUMNS if column in tidy.columns]
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    table = pa.Table.from_pandas(tidy[columns], schema=schema, preserve_index=False)
+    with MetadataWriter(paths.metadata, paths.metadata_arrow) as writer:
+        writer.write(table)
+    np.save(paths.embeddings, embeddings)
+    index.save(paths.index)
+    return directory
+
+
+def bench_serving(
+    directory: Path, embedder: HashingEmbedder, titles: List[str], ids: List[str], k: int
+) -> Dict[str, Dict[str, float]]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from arxiv_rec.api.server import DEFAULT_TUNING, NO_FILTERS, RecommenderState
+
+    state, load_seconds = timed(RecommenderState, directory, embedder=embedder)
+    # Row numbers make every query distinct, so the result and embedding caches never hit.
+    queries = [f"{title} {row}" for row, title in enumerate(titles)]
+    # Response bodies for k=50 full results: FastAPI's dict + jsonable_encoder + json path
+    # against the pre-encoded fragments the endpoints use.
+    hits = state.search_batch(
+        [(query, 50, NO_FILTERS, "vector", DEFAULT_TUNING) for query in queries]
+    )
+    return {
+        "serialize_dicts": latencies_ms(
+            lambda hit: JSONResponse(jsonable_encoder({"results": state.format_results(*hit)})),
+            hits,
+        ),
+        "serialize_fragments": latencies_ms(lambda hit: state.encode_results(*hit), hits),
+        "load": {"seconds": load_seconds},
+        "search": latencies_ms(lambda query: state.search(query, k=k), queries),
+        # A different text than "search" so hybrid queries also pay for encoding.
+        "hybrid": latencies_ms(
+            lambda query: state.search(f"{query} hybrid", k=k, mode="hybrid"), queries
+        ),
+        "recommend": latencies_ms(lambda item_id: state.recommend(item_id, k=k), ids),
+    }
+
+
+def run_size(rows: int, args: argparse.Namespace, work_dir: Path) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    snapshot = write_snapshot(work_dir / f"snapshot-{rows}.jsonl", rows, args.seed)
+
+    frame, seconds = timed(load_metadata, snapshot, repeat=args.repeat)
+    results["load_metadata"] = throughput(len(frame), seconds)
+    tidy, seconds = timed(prepare_corpus, frame, repeat=args.repeat)
+    results["prepare_corpus"] = throughput(len(tidy), seconds)
+
+    embedder = HashingEmbedder()
+    texts = tidy["text"].tolist()
+    embeddings, seconds = timed(embedder.encode_texts, texts, repeat=args.repeat)
+    results["encode"] = throughput(len(texts), seconds)
+
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(tidy), size=min(args.queries, len(tidy)), replace=False)
+    titles = tidy["title"].iloc[sample].tolist()
+    queries = embedder.encode_texts(titles)
+    _, exact_ids = exact_search(embeddings, queries, args.k)
+
+    results["index"] = {}
+    served = None
+    for index_type in args.index_types.split(","):
+        index, results["index"][index_type] = bench_index(
+            index_type, embeddings, queries, exact_ids, args.k, args.repeat
+        )
+        if served is None:
+            served = index
+    directory = work_dir / f"artifacts-{rows}"
+    results["lexical"] = bench_lexical(directory, texts, titles, args.k, args.repeat)
+    write_artifacts(directory, tidy, embeddings, served)
+    item_ids = tidy["id"].iloc[sample].tolist()
+    results["serve"] = bench_serving(directory, embedder, titles, item_ids, args.k)
+    return results
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for key, value in results.items():
+        name = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics that moved the wrong way by more than ``tolerance`` (relative)."""
+
+    now, before = flatten(current["results"]), flatten(baseline["results"])
+    regressions = []
+    for name in sorted(set(now) & set(before)):
+        metric = name.rsplit("/", 1)[-1]
+        if before[name] == 0:
+            continue
+        change = now[name] / before[name] - 1
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {before[name]:.4g} -> {now[name]:.4g} ({change:+.1%})")
+    return regressions
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "faiss": faiss.__version__,
+        "pyarrow": pa.__version__,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    report: Dict[str, Any] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "config": {key: str(value) for key, value in vars(args).items()},
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as scratch:
+        work_dir = args.work_dir or Path(scratch)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        for rows in [int(value) for value in args.sizes.split(",")]:
+            print(f"Benchmarking {rows} rows...")
+            report["results"][str(rows)] = run_size(rows, args, work_dir)
+            for name, value in flatten(report["results"][str(rows)]).items():
+                print(f"  {name:<32} {value:>14.4f}")
+
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.output}")
+    if args.compare is not None:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
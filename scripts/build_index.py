@@ -3,14 +3,49 @@
 from __future__ import annotations
 
 import argparse
+import shutil
+import time
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
+from typing import Dict, Iterator
 
 import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from arxiv_rec.data.clean import prepare_corpus
-from arxiv_rec.data.ingest import load_metadata
+from arxiv_rec.data.clean import prepare_corpus, submission_dates
+from arxiv_rec.data.ingest import DEFAULT_CHUNK_SIZE, iter_metadata
+from arxiv_rec.data.metadata import DATE_COLUMN, METADATA_COLUMNS, MetadataWriter
+from arxiv_rec.models.artifacts import (
+    ArtifactManifest,
+    ArtifactPaths,
+    current_directory,
+    link_tree,
+    new_version_directory,
+    prune_versions,
+    publish,
+)
+from arxiv_rec.models.cache import EmbeddingCache, content_hash
+from arxiv_rec.models.categories import CategoryBitmaps
 from arxiv_rec.models.embed import EmbeddingService
-from arxiv_rec.models.index import VectorIndex
+from arxiv_rec.models.index import (
+    INDEX_TYPES,
+    IndexConfig,
+    VectorIndex,
+    exact_search,
+    recall_at_k,
+)
+from arxiv_rec.models.lexical import DEFAULT_FEATURES, LexicalIndex
+from arxiv_rec.models.neighbors import NeighborGraph
+from arxiv_rec.models.partitions import (
+    PARTITION_GRANULARITIES,
+    PartitionedIndex,
+    dates_from_column,
+)
+from arxiv_rec.models.sharded import ShardedIndex, build_index
+from arxiv_rec.models.store import VECTOR_DTYPES, EmbeddingShardWriter, VectorStore
 
 DEFAULT_DATA_PATH = Path("data/arxiv-metadata-oai-snapshot.json")
 DEFAULT_ARTIFACTS = Path("artifacts")
@@ -22,40 +57,453 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--artifacts-dir", type=Path, default=DEFAULT_ARTIFACTS)
     parser.add_argument("--limit", type=int, default=None, help="Optional row limit for quick runs")
     parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows read from the snapshot per chunk; bounds peak memory during the build.",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=8192,
+        help="Rows encoded between checkpoints; an interrupted build resumes from the last one.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Encoder processes; each loads its own copy of the model.",
+    )
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="Torch threads per encoder process (defaults to cores / workers).",
+    )
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument(
+        "--vector-dtype",
+        choices=VECTOR_DTYPES,
+        default="float32",
+        help="Precision of embeddings.npy and of the vectors stored inside the index (not ivf_pq).",
+    )
+    parser.add_argument("--nlist", type=int, default=IndexConfig.nlist, help="IVF lists")
+    parser.add_argument("--pq-m", type=int, default=IndexConfig.pq_m, help="PQ sub-quantizers")
+    parser.add_argument("--pq-nbits", type=int, default=IndexConfig.pq_nbits)
+    parser.add_argument("--hnsw-m", type=int, default=IndexConfig.hnsw_m)
+    parser.add_argument("--ef-construction", type=int, default=IndexConfig.ef_construction)
+    parser.add_argument("--nprobe", type=int, default=IndexConfig.nprobe, help="Default IVF nprobe")
+    parser.add_argument(
+        "--ef-search", type=int, default=IndexConfig.ef_search, help="Default HNSW efSearch"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split the index into N hash shards searched in parallel (1 keeps a single index).",
+    )
+    parser.add_argument(
+        "--train-size",
+        type=int,
+        default=IndexConfig.train_size,
+        help="Vectors sampled to train IVF layouts.",
+    )
+    parser.add_argument(
+        "--eval-queries",
+        type=int,
+        default=1000,
+        help="Sampled queries used to report recall@k against the flat baseline (0 disables).",
+    )
+    parser.add_argument("--eval-k", type=int, default=10)
+    parser.add_argument(
+        "--partition-by",
+        choices=("none",) + PARTITION_GRANULARITIES,
+        default="none",
+        help="Also build one index per submission period for since/until searches.",
+    )
+    parser.add_argument(
+        "--neighbors-k",
+        type=int,
+        default=20,
+        help="Neighbours precomputed per paper for /recommend (0 disables the graph).",
+    )
+    parser.add_argument(
+        "--search-threads",
+        type=int,
+        default=None,
+        help="FAISS threads used to precompute neighbours (defaults to all cores).",
+    )
+    parser.add_argument(
+        "--no-lexical",
+        action="store_true",
+        help="Skip the BM25 index behind /search?mode=hybrid.",
+    )
+    parser.add_argument(
+        "--lexical-features",
+        type=int,
+        default=DEFAULT_FEATURES,
+        help="Hashed term buckets of the BM25 index (fewer buckets, more collisions).",
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=2,
+        help="Artifact versions kept under <artifacts-dir>/versions after publishing.",
+    )
+    parser.add_argument(
+        "--no-versions",
+        action="store_true",
+        help="Write artifacts directly into --artifacts-dir instead of a new version.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Embedding cache location (defaults to <artifacts-dir>/embedding_cache).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-encode every paper instead of reusing cached embeddings.",
+    )
     return parser.parse_args()
 
 
-def main() -> None:
-    args = parse_args()
+class StageTimings:
+    """Wall time per build stage, summarized with rows/sec at the end of the build."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def report(self, rows: int) -> None:
+        total = sum(self.seconds.values())
+        print(f"{'stage':<12} {'seconds':>9} {'share':>6} {'rows/sec':>11}")
+        for name, seconds in self.seconds.items():
+            rate = f"{rows / seconds:>11.0f}" if seconds > 0 else f"{'-':>11}"
+            print(f"{name:<12} {seconds:>9.2f} {seconds / max(total, 1e-9):>6.1%} {rate}")
+        print(f"{'total':<12} {total:>9.2f} {1:>6.1%} {rows / max(total, 1e-9):>11.0f}")
+
+
+def build_fingerprint(args: argparse.Namespace, model_name: str) -> dict:
+    """Identify the inputs of a build so checkpoints are only reused for the same run."""
+
+    stat = args.data_path.stat()
+    return {
+        "data_path": str(args.data_path.resolve()),
+        "data_size": stat.st_size,
+        "data_mtime": stat.st_mtime_ns,
+        "chunk_size": args.chunk_size,
+        "limit": args.limit,
+        "model_name": model_name,
+        "cache": not args.no_cache,
+    }
+
+
+def embed_chunk(
+    chunk_no: int,
+    tidy_df: pd.DataFrame,
+    embedder: EmbeddingService,
+    cache: EmbeddingCache | None,
+    writer: EmbeddingShardWriter,
+    args: argparse.Namespace,
+) -> int:
+    """Embed one cleaned chunk into its shard, encoding only rows the cache cannot serve.
+
+    Returns the number of texts that went through the encoder.
+    """
+
+    texts = tidy_df["text"].to_numpy(dtype=object)
+    shard = writer.open_shard(chunk_no, len(texts), embedder.dimension)
+    todo = np.arange(len(texts))
+    if cache is not None:
+        ids = tidy_df["id"].to_numpy(dtype=object)
+        hashes = content_hash(tidy_df["text"])
+        hit, cached = cache.lookup(ids, hashes)
+        if cached is not None:
+            shard[hit] = cached
+        todo = np.flatnonzero(~hit)
+
+    done = resumed_from = writer.rows_done(chunk_no)
+    if done:
+        print(f"Chunk {chunk_no}: resuming after {done} encoded rows")
+    blocks = embedder.iter_encode(
+        (texts[row] for row in todo[done:]),
+        batch_size=args.batch_size,
+        block_size=args.checkpoint_every,
+    )
+    for block in blocks:
+        shard[todo[done : done + len(block)]] = block
+        done += len(block)
+        writer.checkpoint(chunk_no, shard, done)
+    writer.finish_shard(chunk_no, shard)
+
+    if cache is not None:
+        cache.stage(ids, hashes, shard)
+    return done - resumed_from
+
+
+def write_metadata(writer: EmbeddingShardWriter, metadata_path: Path, arrow_path: Path) -> None:
+    """Concatenate the per-chunk metadata shards into the Parquet and Arrow artifacts."""
+
+    with MetadataWriter(metadata_path, arrow_path) as metadata_writer:
+        for chunk_no, _ in writer.iter_shards():
+            metadata_writer.write(pq.read_table(writer.shard_path(chunk_no, ".parquet")))
+
+
+def report_recall(
+    index: VectorIndex | ShardedIndex, embeddings: np.ndarray, queries: int, k: int
+) -> None:
+    """Print recall@k of ``index`` against exact search on a sample of corpus vectors."""
+
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(len(embeddings), size=min(queries, len(embeddings)), replace=False))
+    sample = np.asarray(embeddings[rows])
+    _, exact_ids = exact_search(embeddings, sample, k)
+    started = time.perf_counter()
+    _, approx_ids = index.search(sample, k=k)
+    elapsed = time.perf_counter() - started
+    print(
+        f"recall@{k} vs flat: {recall_at_k(approx_ids, exact_ids):.4f} "
+        f"over {len(rows)} queries ({elapsed / len(rows) * 1000:.3f} ms/query)"
+    )
+
+
+def build(args: argparse.Namespace, embedder: EmbeddingService, output_dir: Path) -> None:
+    """Run the chunked build and write metadata, embeddings and the index to ``output_dir``.
+
+    Working state (checkpoints, embedding cache) stays in ``--artifacts-dir`` so it is shared
+    across versions.
+    """
+
     data_path = args.data_path
     artifacts_dir = args.artifacts_dir
-    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    paths = ArtifactPaths(output_dir)
+    metadata_path = paths.metadata
+    metadata_arrow_path = paths.metadata_arrow
+    embeddings_path = paths.embeddings
+    index_path = paths.index
+    neighbors_path = paths.neighbors
+    categories_path = paths.categories
+    dates_path = paths.dates
+    partitions_dir = paths.partitions
+
+    cache = None
+    if not args.no_cache:
+        cache = EmbeddingCache(
+            args.cache_dir or artifacts_dir / "embedding_cache", embedder.model_name
+        )
+        print(f"Embedding cache at {cache.directory} holds {cache.size} papers")
+
+    writer = EmbeddingShardWriter(
+        artifacts_dir / ".build", build_fingerprint(args, embedder.model_name)
+    )
+    if writer.resumed:
+        print(f"Resuming interrupted build from {writer.work_dir}")
 
-    print(f"Loading metadata from {data_path}...")
-    df = load_metadata(data_path)
-    if args.limit:
-        df = df.head(args.limit)
+    timings = StageTimings()
+    encoded = 0
+    encode_seconds = 0.0
+    loop_started = time.perf_counter()
+    print(f"Streaming metadata from {data_path} in chunks of {args.chunk_size} rows...")
+    for chunk_no, chunk in enumerate(
+        iter_metadata(data_path, chunk_size=args.chunk_size, limit=args.limit)
+    ):
+        if writer.is_complete(chunk_no):
+            if cache is not None:
+                table = pq.read_table(
+                    writer.shard_path(chunk_no, ".parquet"), columns=["id", "text"]
+                )
+                ids = table.column("id").to_numpy()
+                hashes = content_hash(table.column("text").to_pandas())
+                cache.stage(ids, hashes, np.load(writer.shard_path(chunk_no), mmap_mode="r"))
+            print(f"Chunk {chunk_no}: already embedded, skipping")
+            continue
 
-    tidy_df = prepare_corpus(df)
-    texts = tidy_df["text"].tolist()
+        tidy_df = prepare_corpus(chunk)
+        if tidy_df.empty:
+            continue
 
-    print("Computing embeddings with SentenceTransformer...")
-    embedder = EmbeddingService()
-    embeddings = embedder.encode_texts(texts, batch_size=args.batch_size)
+        metadata_cols = [col for col in METADATA_COLUMNS if col in tidy_df.columns]
+        schema = pa.schema([(col, pa.string()) for col in metadata_cols])
+        table = pa.Table.from_pandas(tidy_df[metadata_cols], schema=schema, preserve_index=False)
+        table = table.append_column(
+            pa.field(DATE_COLUMN, pa.date32()),
+            pa.array(submission_dates(tidy_df), type=pa.timestamp("us")).cast(pa.date32()),
+        )
+        pq.write_table(table, writer.shard_path(chunk_no, ".parquet"))
 
-    metadata_cols = [col for col in ("id", "title", "abstract", "categories", "text") if col in tidy_df.columns]
-    metadata_path = artifacts_dir / "metadata.parquet"
-    tidy_df[metadata_cols].to_parquet(metadata_path, index=False)
-    print(f"Saved metadata to {metadata_path}")
+        print(f"Chunk {chunk_no}: computing embeddings for {len(tidy_df)} papers...")
+        started = time.perf_counter()
+        encoded += embed_chunk(chunk_no, tidy_df, embedder, cache, writer, args)
+        encode_seconds += time.perf_counter() - started
+    timings.add("ingest", time.perf_counter() - loop_started - encode_seconds)
+    timings.add("encode", encode_seconds)
 
-    embeddings_path = artifacts_dir / "embeddings.npy"
-    np.save(embeddings_path, embeddings)
+    with timings.stage("metadata"):
+        write_metadata(writer, metadata_path, metadata_arrow_path)
+    print(f"Saved metadata to {metadata_path} and {metadata_arrow_path}")
+
+    with timings.stage("filters"):
+        columns = pq.read_table(metadata_path, columns=["categories", DATE_COLUMN])
+        dates = dates_from_column(columns.column(DATE_COLUMN))
+        np.save(dates_path, dates)
+        categories = CategoryBitmaps.from_column(columns.column("categories"))
+        categories.save(categories_path)
+    print(
+        f"Saved {len(categories.names)} category bitmaps to {categories_path} "
+        f"({categories.bitmaps.nbytes / 2**20:.1f} MiB)"
+    )
+
+    with timings.stage("consolidate"):
+        embeddings = writer.consolidate(embeddings_path)
     print(f"Saved embeddings to {embeddings_path}")
 
-    index = VectorIndex.from_embeddings(embeddings)
-    index_path = artifacts_dir / "index.faiss"
-    index.save(index_path)
-    print(f"FAISS index with {index.size} items saved to {index_path}")
+    config = IndexConfig(
+        index_type=args.index_type,
+        # IVF-PQ has its own codes; --vector-dtype then only shrinks embeddings.npy.
+        storage="float32" if args.index_type == "ivf_pq" else args.vector_dtype,
+        nlist=args.nlist,
+        pq_m=args.pq_m,
+        pq_nbits=args.pq_nbits,
+        hnsw_m=args.hnsw_m,
+        ef_construction=args.ef_construction,
+        nprobe=args.nprobe,
+        ef_search=args.ef_search,
+        train_size=args.train_size,
+        shards=args.shards,
+    )
+    partition_config = replace(config, shards=1)
+    with timings.stage("index"):
+        started = time.perf_counter()
+        index = build_index(embeddings, config)
+        build_seconds = time.perf_counter() - started
+        index.save(index_path)
+    print(
+        f"FAISS {index.config.factory_string()} index with {index.size} items in "
+        f"{config.shards} shard(s) saved to {index_path} "
+        f"(built in {build_seconds:.1f}s, {index.memory_bytes() / 2**20:.1f} MiB)"
+    )
+    if args.eval_queries and not config.is_exact:
+        with timings.stage("recall"):
+            report_recall(index, embeddings, args.eval_queries, args.eval_k)
+
+    if args.partition_by != "none":
+        started = time.perf_counter()
+        previous = ArtifactPaths(current_directory(artifacts_dir)).partitions
+        if previous.is_dir() and previous != partitions_dir:
+            link_tree(previous, partitions_dir)  # lets unchanged periods be reused
+        partitions, reused = PartitionedIndex.build(
+            partitions_dir, embeddings, dates, partition_config, args.partition_by
+        )
+        timings.add("partitions", time.perf_counter() - started)
+        print(
+            f"{len(partitions)} {args.partition_by} partitions in {partitions_dir} "
+            f"({reused} reused, {time.perf_counter() - started:.1f}s)"
+        )
+    else:
+        shutil.rmtree(partitions_dir, ignore_errors=True)
+
+    if args.neighbors_k > 0:
+        started = time.perf_counter()
+        graph = NeighborGraph.build(
+            index, embeddings, args.neighbors_k, neighbors_path, threads=args.search_threads
+        )
+        timings.add("neighbors", time.perf_counter() - started)
+        print(
+            f"Precomputed {graph.k} neighbours for {len(graph)} papers in "
+            f"{time.perf_counter() - started:.1f}s ({graph.nbytes / 2**20:.1f} MiB) "
+            f"at {neighbors_path}"
+        )
+    else:
+        NeighborGraph.remove(neighbors_path)
+
+    if not args.no_lexical:
+        with timings.stage("lexical"):
+            started = time.perf_counter()
+            texts = (
+                batch.column("text").to_pylist()
+                for batch in pq.ParquetFile(metadata_path).iter_batches(
+                    batch_size=args.chunk_size, columns=["text"]
+                )
+            )
+            lexical = LexicalIndex.build(texts, paths.lexical, n_features=args.lexical_features)
+        print(
+            f"BM25 index over {lexical.size} papers at {paths.lexical} "
+            f"({lexical.postings.nnz} postings, {lexical.nbytes / 2**20:.1f} MiB, "
+            f"{time.perf_counter() - started:.1f}s)"
+        )
+    else:
+        LexicalIndex.remove(paths.lexical)
+
+    if args.vector_dtype != "float32":
+        float32_bytes = embeddings.nbytes
+        del embeddings
+        with timings.stage("quantize"):
+            store = VectorStore.write(
+                embeddings_path, np.load(embeddings_path, mmap_mode="r"), args.vector_dtype
+            )
+        print(
+            f"Stored embeddings as {store.dtype}: {store.nbytes / 2**20:.1f} MiB "
+            f"(float32: {float32_bytes / 2**20:.1f} MiB)"
+        )
+
+    if cache is not None:
+        # A --limit build only saw part of the snapshot: keep the rows it did not reach.
+        cache.commit(drop_missing=args.limit is None)
+        print(f"Embedding cache: {cache.hits} reused, {cache.misses} encoded, {cache.size} stored")
+    writer.cleanup()
+
+    with timings.stage("manifest"):
+        manifest = ArtifactManifest.create(
+            output_dir, index.size, index.dimension, embedder.model_name, index.config.to_dict()
+        )
+        manifest.save(output_dir)
+    print(f"Wrote {paths.manifest} ({len(manifest.files)} files)")
+
+    if encoded:
+        print(
+            f"Encoded {encoded} texts in {encode_seconds:.1f}s "
+            f"({encoded / encode_seconds:.1f} texts/sec) with {embedder.workers} worker(s)"
+        )
+    timings.report(index.size)
+
+
+def main() -> None:
+    args = parse_args()
+    args.artifacts_dir.mkdir(parents=True, exist_ok=True)
+
+    output_dir = (
+        args.artifacts_dir if args.no_versions else new_version_directory(args.artifacts_dir)
+    )
+    embedder = EmbeddingService(workers=args.workers, threads_per_worker=args.threads_per_worker)
+    try:
+        build(args, embedder, output_dir)
+    except BaseException:
+        if not args.no_versions:
+            shutil.rmtree(output_dir, ignore_errors=True)
+        raise
+    finally:
+        embedder.close()
+
+    if not args.no_versions:
+        publish(args.artifacts_dir, output_dir.name)
+        removed = prune_versions(args.artifacts_dir, keep=args.keep_versions)
+        print(
+            f"Published version {output_dir.name}"
+            + (f"; removed {', '.join(removed)}" if removed else "")
+        )
 
 
 if __name__ == "__main__":
@@ -12,12 +12,15 @@ import zipfile
 from pathlib import Path
 from typing import Iterable
 
-import requests
 from requests.auth import HTTPBasicAuth
 
+from arxiv_rec.data.convert import convert_to_parquet
+from arxiv_rec.data.download import DEFAULT_SEGMENTS, download
+
 DATASET_SLUG = "cornell-university/arxiv"
 TARGET_FILENAME = "arxiv-metadata-oai-snapshot.json"
 CSV_FILENAME = "arxiv-metadata-oai-snapshot.csv"
+PARQUET_DIRNAME = "arxiv-metadata-oai-snapshot.parquet"
 DOWNLOAD_URL = (
     f"https://www.kaggle.com/api/v1/datasets/download/{DATASET_SLUG}?fileName={TARGET_FILENAME}"
 )
@@ -46,16 +49,43 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Also convert the JSON lines file into CSV.",
     )
+    parser.add_argument(
+        "--convert-parquet",
+        action="store_true",
+        help="Also convert the JSON lines file into a Parquet dataset (read by build_index.py).",
+    )
+    parser.add_argument(
+        "--partition-by-year",
+        action="store_true",
+        help="Partition the Parquet dataset into year=YYYY directories.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes used for the Parquet conversion (defaults to all CPUs).",
+    )
     parser.add_argument(
         "--remove-json",
         action="store_true",
-        help="Delete the JSON file after finishing (implies you only rely on CSV).",
+        help="Delete the JSON file after finishing (implies you only rely on CSV/Parquet).",
     )
     parser.add_argument(
         "--force",
         action="store_true",
         help="Force redownload and re-extraction even if files already exist.",
     )
+    parser.add_argument(
+        "--segments",
+        type=int,
+        default=DEFAULT_SEGMENTS,
+        help="Parallel HTTP range requests used for the download.",
+    )
+    parser.add_argument(
+        "--sha256",
+        default=None,
+        help="Expected SHA-256 of the archive; checked before it replaces the old one.",
+    )
     parser.add_argument(
         "--limit",
         type=int,
@@ -75,33 +105,40 @@ def require_kaggle_auth() -> HTTPBasicAuth:
     return HTTPBasicAuth(username, key)
 
 
-def download_archive(archive_path: Path, auth: HTTPBasicAuth, force: bool) -> Path:
+def download_archive(
+    archive_path: Path,
+    auth: HTTPBasicAuth,
+    force: bool,
+    segments: int = DEFAULT_SEGMENTS,
+    sha256: str | None = None,
+) -> Path:
     archive_path.parent.mkdir(parents=True, exist_ok=True)
     if archive_path.exists() and not force:
         print(f"Archive already exists at {archive_path}, skipping download.")
         return archive_path
-
-    tmp_path = archive_path.with_suffix(archive_path.suffix + ".partial")
-    if tmp_path.exists():
-        tmp_path.unlink()
-
-    print("Downloading snapshot from Kaggle...")
-    with requests.get(DOWNLOAD_URL, stream=True, auth=auth, timeout=60) as response:
-        response.raise_for_status()
-        total_size = int(response.headers.get("Content-Length", 0))
-        downloaded = 0
-        with tmp_path.open("wb") as fh:
-            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-                if chunk:
-                    fh.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size:
-                        percent = downloaded / total_size * 100
-                        sys.stdout.write(f"\r  -> {downloaded / (1024 * 1024):.2f} MiB / {total_size / (1024 * 1024):.2f} MiB ({percent:5.1f}%)")
-                        sys.stdout.flush()
-        if total_size:
-            sys.stdout.write("\n")
-    tmp_path.replace(archive_path)
+    if force:
+        for suffix in (".partial", ".partial.json"):
+            safe_remove(archive_path.with_name(archive_path.name + suffix))
+
+    def report(downloaded: int, total: int) -> None:
+        if total:
+            percent = downloaded / total * 100
+            sys.stdout.write(
+                f"\r  -> {downloaded / (1024 * 1024):.2f} MiB / "
+                f"{total / (1024 * 1024):.2f} MiB ({percent:5.1f}%)"
+            )
+            sys.stdout.flush()
+
+    print("Downloading snapshot from Kaggle (resumes an interrupted download)...")
+    download(
+        DOWNLOAD_URL,
+        archive_path,
+        auth=auth,
+        segments=segments,
+        expected_sha256=sha256,
+        progress=report,
+    )
+    sys.stdout.write("\n")
     print(f"Download complete: {archive_path}")
     return archive_path
 
@@ -137,9 +174,10 @@ def convert_to_csv(json_path: Path, csv_path: Path, limit: int | None = None) ->
         tmp_path.unlink()
 
     print("Converting JSON to CSV (this can take a while)...")
-    with json_path.open("r", encoding="utf-8") as src, tmp_path.open(
-        "w", newline="", encoding="utf-8"
-    ) as dst:
+    with (
+        json_path.open("r", encoding="utf-8") as src,
+        tmp_path.open("w", newline="", encoding="utf-8") as dst,
+    ):
         writer = csv.DictWriter(dst, fieldnames=list(CSV_COLUMNS))
         writer.writeheader()
         for idx, line in enumerate(src, start=1):
@@ -171,12 +209,24 @@ def main() -> None:
 
     auth = require_kaggle_auth()
 
-    download_archive(archive_path, auth=auth, force=args.force)
+    download_archive(
+        archive_path, auth=auth, force=args.force, segments=args.segments, sha256=args.sha256
+    )
     extract_json(archive_path, json_path, force=args.force)
 
     if args.convert_csv:
         convert_to_csv(json_path, csv_path, limit=args.limit)
 
+    if args.convert_parquet:
+        print("Converting JSON to Parquet...")
+        parquet_dir = convert_to_parquet(
+            json_path,
+            output_dir / PARQUET_DIRNAME,
+            partition_by_year=args.partition_by_year,
+            workers=args.workers,
+        )
+        print(f"Parquet dataset available at {parquet_dir}")
+
     if args.remove_json:
         safe_remove(json_path)
 
@@ -0,0 +1,113 @@
+"""Export the query encoder to ONNX (float32 + int8) and check it against the torch model."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from arxiv_rec.models.artifacts import ArtifactPaths, current_directory
+from arxiv_rec.models.embed import DEFAULT_MODEL_NAME, EmbeddingService
+from arxiv_rec.models.onnx_encoder import export_onnx
+
+DEFAULT_ARTIFACTS = Path("artifacts")
+SAMPLE_QUERIES = [
+    "graph neural networks for molecule property prediction",
+    "dark matter constraints from galaxy rotation curves",
+    "quantum error correction with surface codes",
+    "transformers",
+    "stochastic gradient descent convergence for non-convex objectives",
+    "topological insulators",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-name", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--artifacts-dir", type=Path, default=DEFAULT_ARTIFACTS)
+    parser.add_argument(
+        "--output-dir", type=Path, default=None, help="Defaults to <artifacts-dir>/onnx."
+    )
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 model.")
+    parser.add_argument("--samples", type=int, default=256, help="Texts used for the check.")
+    parser.add_argument(
+        "--min-cosine",
+        type=float,
+        default=0.99,
+        help="Fail when any sample's cosine to the torch embedding is below this.",
+    )
+    parser.add_argument("--threads", type=int, default=None, help="ONNX Runtime threads.")
+    return parser.parse_args()
+
+
+def sample_texts(artifacts_dir: Path, limit: int) -> List[str]:
+    """Titles/abstracts from the published metadata, padded with short query-like strings."""
+
+    texts = []
+    metadata_path = ArtifactPaths(current_directory(artifacts_dir)).metadata
+    if metadata_path.exists():
+        table = pq.read_table(metadata_path, columns=["title", "abstract"]).slice(0, limit)
+        texts = table.column("title").to_pylist() + table.column("abstract").to_pylist()
+    texts = [text for text in texts if text]
+    if not texts:
+        print(
+            f"Warning: no titles or abstracts in {metadata_path}; checking only the "
+            f"{len(SAMPLE_QUERIES)} built-in queries",
+            file=sys.stderr,
+        )
+    return (SAMPLE_QUERIES + texts)[:limit]
+
+
+def per_query_ms(encode, texts: List[str]) -> float:
+    encode(texts[:1])
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        encode([text])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return float(np.percentile(latencies, 50))
+
+
+def main() -> None:
+    args = parse_args()
+    output_dir = args.output_dir or args.artifacts_dir / "onnx"
+    export_onnx(args.model_name, output_dir, quantize=not args.no_quantize)
+    print(f"Exported {args.model_name} to {output_dir}")
+
+    texts = sample_texts(args.artifacts_dir, args.samples)
+    reference = EmbeddingService(args.model_name)
+    expected = reference.encode_texts(texts, show_progress_bar=False)
+    backends = ["onnx"] if args.no_quantize else ["onnx", "onnx-int8"]
+    torch_ms = per_query_ms(
+        lambda batch: reference.encode_texts(batch, show_progress_bar=False), texts
+    )
+    rows = [("torch", 1.0, 1.0, torch_ms)]
+    for backend in backends:
+        service = EmbeddingService(
+            args.model_name,
+            backend=backend,
+            onnx_dir=output_dir,
+            threads_per_worker=args.threads,
+        )
+        cosine = np.sum(service.encode_texts(texts) * expected, axis=1)
+        rows.append(
+            (backend, cosine.min(), cosine.mean(), per_query_ms(service.encode_texts, texts))
+        )
+
+    print(f"{len(texts)} texts")
+    print(f"{'backend':>10} {'min cos':>8} {'mean cos':>9} {'p50 ms':>8}")
+    for backend, low, mean, p50 in rows:
+        print(f"{backend:>10} {low:>8.4f} {mean:>9.4f} {p50:>8.2f}")
+    failed = [backend for backend, low, _, _ in rows if low < args.min_cosine]
+    if failed:
+        print(f"Parity check failed for {', '.join(failed)} (min cosine < {args.min_cosine})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
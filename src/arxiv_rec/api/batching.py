@@ -0,0 +1,100 @@
+"""Dynamic micro-batching of concurrent requests."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Generic, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesce concurrent ``submit`` calls into batched calls of ``process``.
+
+    The first item of a batch waits at most ``max_wait_ms`` for companions; the batch goes out
+    as soon as ``max_batch_size`` items have arrived or that deadline passes. ``process``
+    receives the list of items and must return one result per item, in order; it runs in the
+    loop's default executor so the event loop keeps accepting requests while FAISS / the
+    encoder work. At most ``max_inflight`` batches run at the same time.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        max_inflight: int = 2,
+    ) -> None:
+        self.process = process
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_inflight = max(1, max_inflight)
+        self.batches = 0
+        self.items = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[Tuple[T, asyncio.Future]] | None = None
+        self._worker: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._start(loop)
+        future: asyncio.Future = loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def _start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._collect())
+
+    async def _collect(self) -> None:
+        inflight = asyncio.Semaphore(self.max_inflight)
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await inflight.acquire()
+            task = loop.create_task(self._run(batch, inflight))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, batch: List[Tuple[T, asyncio.Future]], inflight: asyncio.Semaphore
+    ) -> None:
+        try:
+            items = [item for item, _ in batch]
+            self.batches += 1
+            self.items += len(items)
+            try:
+                results: Sequence[Any] = await asyncio.get_running_loop().run_in_executor(
+                    None, self.process, items
+                )
+            except Exception as exc:  # propagate to every waiting caller
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            inflight.release()
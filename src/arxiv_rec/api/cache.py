@@ -0,0 +1,102 @@
+"""Bounded in-process caches for the API hot path."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Tuple
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace so trivially different spellings share a cache entry."""
+
+    return " ".join(text.split())
+
+
+def artifact_version(*paths: str | Path) -> Tuple[Tuple[str, int, int], ...]:
+    """Cheap fingerprint (path, size, mtime) of the artifacts a state was loaded from."""
+
+    version = []
+    for path in paths:
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            version.append((str(path), -1, -1))
+        else:
+            version.append((str(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(version)
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional time-to-live and hit/miss counters.
+
+    ``bind`` ties the contents to a version token (e.g. ``artifact_version``); binding a
+    different version drops every entry, so results never outlive the index they came from.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl if ttl else None
+        self.version: Hashable | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl is not None and entry[0] < time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def bind(self, version: Hashable) -> bool:
+        """Attach the cache to ``version``; returns True when stale entries were dropped."""
+
+        with self._lock:
+            if version == self.version:
+                return False
+            self.version = version
+            self._data.clear()
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
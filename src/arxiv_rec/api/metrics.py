@@ -0,0 +1,213 @@
+"""Minimal thread-safe Prometheus metrics (counters, histograms, scrape-time collectors)."""
+
+from __future__ import annotations
+
+import bisect
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+Labels = Tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+# Seconds; spans cache hits (~10 µs) to a cold encoder call on a large batch.
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def _labels(self, values: Labels, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{self._labels(labels)} {_number(value)}" for labels, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; ``observe`` is one bisect and three adds under a lock."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}  # bucket counts..., +Inf count, sum
+
+    def observe(self, value: float, *labels: str) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[position] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        lines = self.header()
+        for labels, values in series:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                bucket = self._labels(labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {values[-1]!r}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {_number(cumulative)}")
+        return lines
+
+
+class Collected(_Metric):
+    """Gauge or counter whose samples are read at scrape time from ``collect``.
+
+    ``collect`` yields ``(label values, value)`` pairs, so existing stats (cache hit counts,
+    index size) are exported without instrumenting the code that maintains them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], Iterable[Tuple[Labels, float]]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{self._labels(labels)} {_number(value)}"
+            for labels, value in self.collect()
+        ]
+
+
+class RequestMetrics:
+    """ASGI middleware counting requests by route template and status, and timing them.
+
+    Plain ASGI rather than ``BaseHTTPMiddleware`` so it adds no extra task per request.
+    """
+
+    def __init__(self, app, latency: Histogram, requests: Counter) -> None:
+        self.app = app
+        self.latency = latency
+        self.requests = requests
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            self.latency.observe(time.perf_counter() - started, endpoint)
+            self.requests.inc(endpoint, str(status[0]))
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def resident_memory_bytes() -> int:
+    """Current RSS from ``/proc`` (peak RSS where ``/proc`` is unavailable)."""
+
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -2,106 +2,1096 @@
 
 from __future__ import annotations
 
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, List
+from typing import Annotated, Any, AsyncIterator, Callable, Dict, List, NamedTuple, Sequence, Tuple
 
 import numpy as np
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
+from arxiv_rec.api.batching import MicroBatcher
+from arxiv_rec.api.cache import LRUCache, artifact_version, normalize_query
+from arxiv_rec.api.compression import CompressionMiddleware
+from arxiv_rec.api.metrics import (
+    SIZE_BUCKETS,
+    Collected,
+    Counter,
+    Histogram,
+    Registry,
+    RequestMetrics,
+    resident_memory_bytes,
+)
+from arxiv_rec.api.serialize import (
+    EncodedJSONResponse,
+    dumps,
+    encode_hits,
+    json_array,
+    json_object,
+)
+from arxiv_rec.data.metadata import DATE_COLUMN, read_metadata_table
+from arxiv_rec.models.artifacts import ArtifactManifest, ArtifactPaths, current_directory
+from arxiv_rec.models.categories import CategoryBitmaps
 from arxiv_rec.models.embed import EmbeddingService
 from arxiv_rec.models.index import VectorIndex
+from arxiv_rec.models.lexical import CONFIG_FILENAME as LEXICAL_CONFIG
+from arxiv_rec.models.lexical import LexicalIndex, reciprocal_rank_fusion
+from arxiv_rec.models.neighbors import NeighborGraph
+from arxiv_rec.models.partitions import (
+    MANIFEST_FILENAME,
+    PartitionedIndex,
+    dates_from_column,
+    parse_date_bound,
+)
+from arxiv_rec.models.sharded import load_index
+from arxiv_rec.models.store import VectorStore
 
-ARTIFACTS_DIR = Path(__file__).resolve().parents[2] / "artifacts"
-METADATA_PATH = ARTIFACTS_DIR / "metadata.parquet"
-EMBEDDINGS_PATH = ARTIFACTS_DIR / "embeddings.npy"
-INDEX_PATH = ARTIFACTS_DIR / "index.faiss"
+# Either a flat build or a root whose CURRENT file names the published version under versions/.
+ARTIFACTS_DIR = Path(
+    os.getenv("ARXIV_REC_ARTIFACTS_DIR", str(Path(__file__).resolve().parents[2] / "artifacts"))
+)
+# Seconds between checks for a newly published version (0 disables; POST /reload still works).
+RELOAD_INTERVAL = float(os.getenv("ARXIV_REC_RELOAD_INTERVAL", "0"))
+# Hash every file against the manifest before swapping a version in, not just compare sizes.
+VERIFY_CHECKSUMS = os.getenv("ARXIV_REC_VERIFY_CHECKSUMS", "0") not in {"0", "false", "no"}
+# Memory-map artifacts read-only so every uvicorn worker shares one page-cache copy.
+USE_MMAP = os.getenv("ARXIV_REC_MMAP", "1") not in {"0", "false", "no"}
+RESULT_FIELDS: Sequence[str] = ("id", "title", "abstract", "categories")
+CACHE_TTL = float(os.getenv("ARXIV_REC_CACHE_TTL", "0")) or None
 
-app = FastAPI(title="arXiv Recommender", version="0.1.0")
+# Normalized query -> embedding, and (query, k, ...) -> (row ids, scores) for /search.
+query_cache = LRUCache(int(os.getenv("ARXIV_REC_QUERY_CACHE_SIZE", "10000")), ttl=CACHE_TTL)
+result_cache = LRUCache(int(os.getenv("ARXIV_REC_RESULT_CACHE_SIZE", "10000")), ttl=CACHE_TTL)
+# (row, fields, abstract length) -> the paper's encoded JSON fields, reused across responses.
+fragment_cache = LRUCache(int(os.getenv("ARXIV_REC_FRAGMENT_CACHE_SIZE", "50000")))
+# Responses of at least this many bytes are sent gzip/brotli-compressed when the client asks;
+# larger ones are compressed in the threadpool, and those above the cap are sent as they are.
+COMPRESS_MIN_BYTES = int(os.getenv("ARXIV_REC_COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_MAX_BYTES = int(os.getenv("ARXIV_REC_COMPRESS_MAX_BYTES", str(16 * 2**20)))
+
+# Concurrent requests arriving within the window share one encoder call and one FAISS call.
+BATCH_MAX_SIZE = int(os.getenv("ARXIV_REC_BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("ARXIV_REC_BATCH_WAIT_MS", "2"))
+
+# Upper bound on the number of queries / item ids accepted by the batch endpoints.
+MAX_BATCH_ITEMS = int(os.getenv("ARXIV_REC_MAX_BATCH_ITEMS", "1000"))
+# Upper bounds on the per-request nprobe / ef_search, which buy recall with latency.
+MAX_NPROBE = int(os.getenv("ARXIV_REC_MAX_NPROBE", "1024"))
+MAX_EF_SEARCH = int(os.getenv("ARXIV_REC_MAX_EF_SEARCH", "1024"))
+QUERY_ENCODE_BATCH = 64
+
+# Query encoder: "torch", or "onnx"/"onnx-int8" with an export from scripts/export_onnx.py.
+ENCODER_BACKEND = os.getenv("ARXIV_REC_ENCODER", "torch")
+ONNX_DIR = Path(os.getenv("ARXIV_REC_ONNX_DIR", str(ARTIFACTS_DIR / "onnx")))
+
+# Load artifacts and push one query through the encoder and FAISS at startup, so the first
+# request after a deploy does not pay for it; /readyz reports 200 once this has finished.
+WARMUP = os.getenv("ARXIV_REC_WARMUP", "1") not in {"0", "false", "no"}
+WARMUP_QUERY = "warm up"
+
+# "hybrid" searches also query the BM25 index and merges both rankings by reciprocal rank;
+# each leg contributes its top HYBRID_DEPTH hits (at least k) to the fusion.
+SEARCH_MODES = ("vector", "hybrid")
+HYBRID_DEPTH = int(os.getenv("ARXIV_REC_HYBRID_DEPTH", "50"))
+# Runs the BM25 leg while the calling thread is inside FAISS (which releases the GIL).
+lexical_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lexical")
+
+logger = logging.getLogger(__name__)
+_generations = itertools.count()
+
+Hits = Tuple[np.ndarray, np.ndarray]
+
+# Hot-path instrumentation exported on /metrics; stages are timed inside the batch workers.
+metrics = Registry()
+REQUEST_LATENCY = metrics.register(
+    Histogram("arxiv_rec_request_duration_seconds", "HTTP request latency.", ("endpoint",))
+)
+REQUESTS = metrics.register(
+    Counter("arxiv_rec_requests_total", "HTTP requests by status.", ("endpoint", "status"))
+)
+STAGE_LATENCY = metrics.register(
+    Histogram(
+        "arxiv_rec_stage_duration_seconds",
+        "Latency of one hot-path stage (encode, search, lexical, graph, reconstruct, format).",
+        ("stage",),
+    )
+)
+BATCH_SIZE = metrics.register(
+    Histogram("arxiv_rec_batch_size", "Requests per micro-batch.", ("batcher",), SIZE_BUCKETS)
+)
+
+
+class Filters(NamedTuple):
+    """Result filters: any of ``categories``, submitted between ``since`` and ``until`` (days)."""
+
+    categories: Tuple[str, ...] = ()
+    since: int | None = None
+    until: int | None = None
+
+    @property
+    def dated(self) -> bool:
+        return self.since is not None or self.until is not None
+
+
+class Tuning(NamedTuple):
+    """Per-request IVF ``nprobe`` / HNSW ``ef_search``; ``None`` keeps the index default.
+
+    Layouts without the knob (flat, or HNSW for ``nprobe``) ignore it.
+    """
+
+    nprobe: int | None = None
+    ef_search: int | None = None
+
+
+NO_FILTERS = Filters()
+DEFAULT_TUNING = Tuning()
+# (normalized query, k, filters, mode, tuning) and (row index, k, filters, tuning).
+SearchRequest = Tuple[str, int, Filters, str, Tuning]
+RecommendRequest = Tuple[int, int, Filters, Tuning]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Loading runs in the background so /healthz answers while the artifacts are read.
+    tasks = []
+    if WARMUP:
+        tasks.append(asyncio.create_task(run_in_threadpool(warm_up)))
+    if RELOAD_INTERVAL > 0:
+        tasks.append(asyncio.create_task(watch_versions(RELOAD_INTERVAL)))
+    yield
+    for task in tasks:
+        task.cancel()
+
+
+app = FastAPI(title="arXiv Recommender", version="0.1.0", lifespan=lifespan)
+app.add_middleware(
+    CompressionMiddleware, minimum_size=COMPRESS_MIN_BYTES, maximum_size=COMPRESS_MAX_BYTES
+)
+app.add_middleware(RequestMetrics, latency=REQUEST_LATENCY, requests=REQUESTS)
 
 
 class RecommenderState:
-    def __init__(self) -> None:
-        if not METADATA_PATH.exists() or not EMBEDDINGS_PATH.exists():
-            raise RuntimeError("Artifacts missing. Run `make embed` first.")
-
-        self.metadata = pd.read_parquet(METADATA_PATH)
-        self.embeddings = np.load(EMBEDDINGS_PATH)
-        if INDEX_PATH.exists():
-            self.index = VectorIndex.load(INDEX_PATH)
+    """Everything loaded from one artifacts directory; swapped as a whole on reload.
+
+    ``embedder`` lets a reload reuse the already loaded query encoder.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        mmap: bool = USE_MMAP,
+        embedder: EmbeddingService | None = None,
+    ) -> None:
+        self.directory = Path(directory or current_directory(ARTIFACTS_DIR))
+        paths = ArtifactPaths(self.directory)
+        if not paths.metadata.exists() or not paths.embeddings.exists():
+            raise RuntimeError(f"Artifacts missing in {self.directory}. Run `make embed` first.")
+        self.manifest: ArtifactManifest | None = None
+        if paths.manifest.exists():
+            self.manifest = ArtifactManifest.load(self.directory)
+            self.manifest.verify(self.directory, checksums=VERIFY_CHECKSUMS)
+
+        self.metadata = read_metadata_table(paths.metadata, paths.metadata_arrow, mmap=mmap)
+        # Item vectors come from a single source: the index itself when it can reconstruct
+        # them, otherwise the (possibly float16/int8) embeddings store.
+        self.vectors: VectorStore | None = None
+        if paths.index.exists():
+            self.index = load_index(paths.index, mmap=mmap)
+        else:
+            self.vectors = VectorStore.load(paths.embeddings, mmap=mmap)
+            self.index = VectorIndex.from_embeddings(self.vectors)
+        if self.vectors is None and not self.index.config.supports_reconstruct:
+            self.vectors = VectorStore.load(paths.embeddings, mmap=mmap)
+        if hasattr(self.index, "close"):  # stop shard threads once a reload drops this state
+            weakref.finalize(self, self.index.close)
+
+        # Precomputed top-K neighbours turn /recommend into an array lookup when k <= K.
+        self.neighbors: NeighborGraph | None = None
+        if paths.neighbors.exists():
+            self.neighbors = NeighborGraph.load(paths.neighbors, mmap=mmap)
+            if len(self.neighbors) != self.index.size:
+                raise RuntimeError("Neighbour graph size does not match the index.")
+
+        # Per-category bitmaps restrict FAISS searches to the requested categories.
+        if paths.categories.exists():
+            self.categories = CategoryBitmaps.load(paths.categories, mmap=mmap)
         else:
-            self.index = VectorIndex.from_embeddings(self.embeddings)
+            self.categories = CategoryBitmaps.from_column(self.metadata.column("categories"))
+        if self.categories.size != self.index.size:
+            raise RuntimeError("Category bitmaps size does not match the index.")
 
-        self.embedder = EmbeddingService()
+        # Submission days per row, plus optional per-period shards for since/until searches.
+        self.dates: np.ndarray | None = None
+        if paths.dates.exists():
+            self.dates = np.load(paths.dates, mmap_mode="r" if mmap else None)
+        elif DATE_COLUMN in self.metadata.column_names:
+            self.dates = dates_from_column(self.metadata.column(DATE_COLUMN))
+        self.partitions: PartitionedIndex | None = None
+        if self.dates is not None and (paths.partitions / MANIFEST_FILENAME).exists():
+            self.partitions = PartitionedIndex.load(paths.partitions, self.dates, mmap=mmap)
+
+        # BM25 postings for mode=hybrid; searches stay vector-only when it was not built.
+        self.lexical: LexicalIndex | None = None
+        if LexicalIndex.exists(paths.lexical):
+            self.lexical = LexicalIndex.load(paths.lexical, mmap=mmap)
+            if self.lexical.size != self.index.size:
+                raise RuntimeError("Lexical index size does not match the index.")
+
+        self.embedder = embedder or EmbeddingService(backend=ENCODER_BACKEND, onnx_dir=ONNX_DIR)
         self.row_lookup = {
-            str(item_id): idx for idx, item_id in enumerate(self.metadata["id"].astype(str))
+            str(item_id): idx for idx, item_id in enumerate(self.metadata.column("id").to_pylist())
         }
-        if self.index.size != len(self.metadata):
+        if self.index.size != self.metadata.num_rows:
             raise RuntimeError("Index size does not match metadata length.")
 
-    def _format_results(self, indices: np.ndarray, scores: np.ndarray) -> List[Dict[str, str]]:
-        results: List[Dict[str, str]] = []
-        for idx, score in zip(indices, scores):
-            if idx < 0 or idx >= len(self.metadata):
-                continue
-            record = self.metadata.iloc[int(idx)]
-            results.append(
-                {
-                    "id": record.get("id", ""),
-                    "title": record.get("title", ""),
-                    "abstract": record.get("abstract", ""),
-                    "categories": record.get("categories", ""),
-                    "score": float(score),
-                }
+        self.version = artifact_version(
+            paths.metadata,
+            paths.metadata_arrow,
+            paths.embeddings,
+            paths.index,
+            paths.neighbors,
+            paths.categories,
+            paths.dates,
+            paths.partitions / MANIFEST_FILENAME,
+            paths.lexical / LEXICAL_CONFIG,
+        )
+        # Prefixes result cache keys, so hits of a replaced state are never served by a new one.
+        self.generation = next(_generations)
+
+    @property
+    def label(self) -> str:
+        return self.manifest.version if self.manifest is not None else self.directory.name
+
+    def validate(self) -> None:
+        """Check the loaded artifacts against the manifest and the encoder, then smoke-test."""
+
+        if self.manifest is not None:
+            expected = (self.manifest.rows, self.manifest.dimension, self.manifest.model_name)
+            found = (self.index.size, self.index.dimension, self.embedder.model_name)
+            if expected != found:
+                raise RuntimeError(
+                    f"Manifest expects (rows, dimension, model) {expected}, loaded {found}"
+                )
+        if self.embedder.dimension != self.index.dimension:
+            raise RuntimeError(
+                f"Encoder dimension {self.embedder.dimension} does not match "
+                f"index dimension {self.index.dimension}"
             )
+        self.warm_up()
+
+    def activate(self) -> None:
+        """Point the shared caches at this state."""
+
+        query_cache.bind((self.embedder.model_name, self.embedder.backend))
+        result_cache.bind(self.version)
+        fragment_cache.bind(self.version)
+
+    def warm_up(self) -> None:
+        """Run one query through the encoder and the index outside the caches."""
+
+        embedding = self.embedder.encode_texts([WARMUP_QUERY], show_progress_bar=False)
+        _, ids = self.index.search(embedding, k=1)
+        if not 0 <= ids[0, 0] < self.index.size:
+            raise RuntimeError(f"Warm-up query returned no valid row: {ids[0, 0]}")
+        if self.neighbors is not None:
+            self.neighbors.lookup(0, 1)
+        if self.lexical is not None:
+            self.lexical.search([WARMUP_QUERY], k=1)
+
+    def cached(self, request: SearchRequest) -> Hits | None:
+        return result_cache.get((self.generation, *request))
+
+    def format_results(
+        self,
+        indices: np.ndarray,
+        scores: np.ndarray,
+        fields: Sequence[str] = RESULT_FIELDS,
+    ) -> List[Dict[str, str]]:
+        """Materialize hits with one vectorized ``take`` per requested metadata column.
+
+        Missing columns and null values come out as ``""``.
+        """
+
+        started = time.perf_counter()
+        indices = np.asarray(indices)
+        valid = (indices >= 0) & (indices < self.metadata.num_rows)
+        rows = pa.array(indices[valid], type=pa.int64())
+        columns: Dict[str, list] = {}
+        for field in fields:
+            if field in self.metadata.column_names:
+                column = self.metadata.column(field).take(rows)
+                columns[field] = pc.fill_null(column, "").to_pylist()
+            else:
+                columns[field] = [""] * len(rows)
+        columns["score"] = np.asarray(scores)[valid].astype(float).tolist()
+        names = list(columns)
+        results = [dict(zip(names, values)) for values in zip(*columns.values())]
+        STAGE_LATENCY.observe(time.perf_counter() - started, "format")
         return results
 
-    def search(self, query: str, k: int = 5) -> List[Dict[str, str]]:
-        query_emb = self.embedder.encode_query(query)
-        scores, indices = self.index.search(query_emb, k=k)
-        return self._format_results(indices[0], scores[0])
+    def encode_results(
+        self,
+        indices: np.ndarray,
+        scores: np.ndarray,
+        fields: Sequence[str] = RESULT_FIELDS,
+        abstract_chars: int | None = None,
+    ) -> bytes:
+        """Hits as a JSON array, like ``format_results`` but from cached encoded fragments.
+
+        CPU-bound on cache misses, so the endpoints call it from the threadpool.
+        """
 
-    def recommend(self, item_id: str, k: int = 5) -> List[Dict[str, str]]:
+        with STAGE_LATENCY.time("format"):
+            return encode_hits(
+                self.metadata,
+                indices,
+                scores,
+                fields,
+                abstract_chars,
+                cache=fragment_cache,
+                namespace=self.generation,
+            )
+
+    def search_batch(self, requests: Sequence[SearchRequest]) -> List[Hits]:
+        """Resolve many ``(normalized query, k, filters, mode, tuning)`` requests in one batch.
+
+        Every distinct query is encoded once; requests sharing the same filters and tuning
+        share one FAISS call with their largest ``k``. Hybrid requests also share one BM25
+        search, run concurrently with FAISS, and are fused by reciprocal rank. Hits are cached.
+        """
+
+        queries = list(dict.fromkeys(request[0] for request in requests))
+        embeddings = self._encode_queries(queries)
+        rows = {query: row for row, query in enumerate(queries)}
+        hits: List[Hits | None] = [None] * len(requests)
+        for (filters, tuning), positions in self._group_by_search(requests).items():
+            group = list(dict.fromkeys(rows[requests[pos][0]] for pos in positions))
+            k_max = max(self._depth(requests[pos]) for pos in positions)
+            hybrid = list(
+                dict.fromkeys(requests[pos][0] for pos in positions if requests[pos][3] == "hybrid")
+            )
+            lexical = None
+            if hybrid:
+                lexical = lexical_executor.submit(self._lexical_search, hybrid, k_max, filters)
+            scores, indices = self._search(embeddings[group], k_max, filters, tuning)
+            lexical_ids = dict(zip(hybrid, lexical.result()[1])) if lexical is not None else {}
+            offsets = {row: offset for offset, row in enumerate(group)}
+            for pos in positions:
+                query, k, _, mode, _ = requests[pos]
+                offset = offsets[rows[query]]
+                if mode == "hybrid":
+                    hits[pos] = reciprocal_rank_fusion([indices[offset], lexical_ids[query]], k)
+                else:
+                    hits[pos] = (indices[offset, :k].copy(), scores[offset, :k].copy())
+                result_cache.put((self.generation, *requests[pos]), hits[pos])
+        return hits
+
+    @staticmethod
+    def _depth(request: SearchRequest) -> int:
+        """Hits needed from each leg: ``k``, or the fusion depth for hybrid requests."""
+
+        _, k, _, mode, _ = request
+        return max(k, HYBRID_DEPTH) if mode == "hybrid" else k
+
+    def _lexical_search(self, queries: List[str], k: int, filters: Filters) -> Hits:
+        """BM25 ``(scores, ids)`` for ``queries`` with ``filters`` applied to the candidates."""
+
+        if self.lexical is None:
+            raise RuntimeError("mode=hybrid needs a lexical index; rebuild the artifacts.")
+        accept = None if filters == NO_FILTERS else lambda rows: self._accepts(rows, filters)
+        with STAGE_LATENCY.time("lexical"):
+            return self.lexical.search(queries, k, accept)
+
+    def _search(
+        self, vectors: np.ndarray, k: int, filters: Filters, tuning: Tuning = DEFAULT_TUNING
+    ) -> Hits:
+        """FAISS search with the filters applied inside the index scan.
+
+        Date ranges go to the overlapping time partitions when they were built; otherwise
+        they become part of the row bitmap handed to the main index.
+        """
+
+        with STAGE_LATENCY.time("search"):
+            return self._filtered_search(vectors, k, filters, tuning)
+
+    def _filtered_search(
+        self, vectors: np.ndarray, k: int, filters: Filters, tuning: Tuning
+    ) -> Hits:
+        mask = self.categories.mask(filters.categories) if filters.categories else None
+        if filters.dated and self.partitions is not None:
+            return self.partitions.search(vectors, k, filters.since, filters.until, mask, *tuning)
+        if filters.dated:
+            in_range = np.packbits(self._in_date_range(slice(None), filters), bitorder="little")
+            mask = in_range if mask is None else in_range & mask
+        selector = self.categories.selector(mask) if mask is not None else None
+        return self.index.search(
+            vectors, k=k, nprobe=tuning.nprobe, ef_search=tuning.ef_search, selector=selector
+        )
+
+    def _in_date_range(self, rows: Any, filters: Filters) -> np.ndarray:
+        dates = np.asarray(self.dates[rows])
+        keep = np.ones(len(dates), dtype=bool)
+        if filters.since is not None:
+            keep &= dates >= filters.since
+        if filters.until is not None:
+            keep &= dates <= filters.until
+        return keep
+
+    def _accepts(self, rows: np.ndarray, filters: Filters) -> np.ndarray:
+        """Which ``rows`` pass ``filters``."""
+
+        keep = np.ones(len(rows), dtype=bool)
+        if filters.categories:
+            keep &= self.categories.contains(self.categories.mask(filters.categories), rows)
+        if filters.dated:
+            keep &= self._in_date_range(rows, filters)
+        return keep
+
+    @staticmethod
+    def _group_by_search(
+        requests: Sequence[Tuple[Any, ...]],
+    ) -> Dict[Tuple[Filters, Tuning], List[int]]:
+        """Positions of the requests that can share one FAISS call: same filters and tuning."""
+
+        groups: Dict[Tuple[Filters, Tuning], List[int]] = {}
+        for pos, request in enumerate(requests):
+            groups.setdefault((request[2], request[-1]), []).append(pos)
+        return groups
+
+    def _encode_queries(self, queries: Sequence[str]) -> np.ndarray:
+        embeddings = [query_cache.get(query) for query in queries]
+        missing = [pos for pos, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            with STAGE_LATENCY.time("encode"):
+                fresh = self.embedder.encode_texts(
+                    [queries[pos] for pos in missing],
+                    batch_size=min(len(missing), QUERY_ENCODE_BATCH),
+                    show_progress_bar=False,
+                )
+            for pos, embedding in zip(missing, fresh):
+                embedding.setflags(write=False)
+                query_cache.put(queries[pos], embedding)
+                embeddings[pos] = embedding
+        return np.vstack(embeddings)
+
+    def recommend_batch(self, requests: Sequence[RecommendRequest]) -> List[Hits]:
+        """Neighbours for many ``(row index, k, filters, tuning)`` requests, excluding each item.
+
+        Requests the precomputed graph can answer are array lookups; the rest share one
+        FAISS search per distinct filter and tuning with the largest requested ``k``.
+        """
+
+        hits: List[Hits | None] = [self.graph_hit(*request[:3]) for request in requests]
+        pending = [request for request, hit in zip(requests, hits) if hit is None]
+        fresh: List[Hits | None] = [None] * len(pending)
+        for (filters, tuning), positions in self._group_by_search(pending).items():
+            rows = np.array([pending[pos][0] for pos in positions], dtype=np.int64)
+            k_max = max(pending[pos][1] for pos in positions)
+            vectors = self._item_vectors(rows)
+            scores, indices = self._search(vectors, k_max + 1, filters, tuning)
+            for offset, pos in enumerate(positions):
+                row, k, _, _ = pending[pos]
+                keep = (indices[offset] != row) & (indices[offset] != -1)
+                fresh[pos] = (indices[offset][keep][:k], scores[offset][keep][:k])
+        remaining = iter(fresh)
+        return [hit if hit is not None else next(remaining) for hit in hits]
+
+    def graph_hit(self, row: int, k: int, filters: Filters = NO_FILTERS) -> Hits | None:
+        """Answer from the precomputed neighbour graph, or ``None`` when it cannot.
+
+        With filters the graph only helps if enough of the stored neighbours pass them.
+        """
+
+        with STAGE_LATENCY.time("graph"):
+            return self._graph_lookup(row, k, filters)
+
+    def _graph_lookup(self, row: int, k: int, filters: Filters) -> Hits | None:
+        if self.neighbors is None or (filters == NO_FILTERS and k > self.neighbors.k):
+            return None
+        if filters == NO_FILTERS:
+            return self.neighbors.lookup(row, k)
+        indices, scores = self.neighbors.lookup(row, self.neighbors.k)
+        valid = indices >= 0
+        keep = np.zeros_like(valid)
+        keep[valid] = self._accepts(indices[valid], filters)
+        if keep.sum() < k:
+            return None
+        return indices[keep][:k], scores[keep][:k]
+
+    def _item_vectors(self, rows: np.ndarray) -> np.ndarray:
+        with STAGE_LATENCY.time("reconstruct"):
+            if self.vectors is not None:
+                return self.vectors[rows]
+            return self.index.reconstruct_batch(rows)
+
+    def row_for(self, item_id: str) -> int:
         if item_id not in self.row_lookup:
             raise KeyError(f"Item id {item_id} not found")
-        row_idx = self.row_lookup[item_id]
-        item_emb = self.embeddings[row_idx]
-        scores, indices = self.index.search(item_emb, k=k + 1)
-        flat_indices = indices[0]
-        flat_scores = scores[0]
-        filtered = [
-            (idx, score)
-            for idx, score in zip(flat_indices, flat_scores)
-            if idx != row_idx and idx != -1
-        ][:k]
-        formatted = self._format_results(
-            np.array([idx for idx, _ in filtered], dtype=int),
-            np.array([score for _, score in filtered], dtype=float),
-        )
-        return formatted
+        return self.row_lookup[item_id]
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        fields: Sequence[str] = RESULT_FIELDS,
+        filters: Filters = NO_FILTERS,
+        mode: str = "vector",
+        tuning: Tuning = DEFAULT_TUNING,
+    ) -> List[Dict[str, str]]:
+        request = (normalize_query(query), k, filters, mode, tuning)
+        hit = self.cached(request)
+        indices, scores = hit if hit is not None else self.search_batch([request])[0]
+        return self.format_results(indices, scores, fields)
+
+    def recommend(
+        self,
+        item_id: str,
+        k: int = 5,
+        fields: Sequence[str] = RESULT_FIELDS,
+        filters: Filters = NO_FILTERS,
+        tuning: Tuning = DEFAULT_TUNING,
+    ) -> List[Dict[str, str]]:
+        request = (self.row_for(item_id), k, filters, tuning)
+        indices, scores = self.recommend_batch([request])[0]
+        return self.format_results(indices, scores, fields)
 
 
 _state: RecommenderState | None = None
+_state_lock = threading.Lock()
+_reload_lock = threading.Lock()
+# Cold-start timings and the last loading error, reported by /readyz.
+startup: Dict[str, Any] = {
+    "warming": False,
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "error": None,
+}
+# Hot reloads done so far and the last rejected version, also reported by /readyz.
+reloads: Dict[str, Any] = {"count": 0, "rejected": None, "error": None}
 
 
 def get_state() -> RecommenderState:
     global _state
     if _state is None:
-        _state = RecommenderState()
+        with _state_lock:
+            if _state is None:
+                started = time.perf_counter()
+                state = RecommenderState()
+                state.validate()  # the same checks a reload has to pass
+                state.activate()
+                _state = state
+                startup.update(load_seconds=round(time.perf_counter() - started, 3), error=None)
     return _state
 
 
-@app.get("/search")
-def search(q: str = Query(..., min_length=3), k: int = Query(5, ge=1, le=50)):
-    state = get_state()
-    return {"results": state.search(q, k=k)}
+def reload_state(directory: str | Path | None = None) -> RecommenderState:
+    """Load a version next to the live one, validate it and swap it in atomically.
+
+    Requests already holding the previous state finish on it; it is freed (and its shard
+    threads stopped) when the last of them lets go. The query encoder is reused, so switching
+    models still needs a restart. On failure the live state keeps serving.
+    """
+
+    global _state
+    with _reload_lock:
+        started = time.perf_counter()
+        directory = Path(directory or current_directory(ARTIFACTS_DIR))
+        previous = _state
+        try:
+            state = RecommenderState(
+                directory, embedder=previous.embedder if previous is not None else None
+            )
+            state.validate()
+        except Exception as exc:
+            reloads.update(rejected=directory.name, error=f"{type(exc).__name__}: {exc}")
+            raise
+        with _state_lock:
+            state.activate()
+            _state = state
+        # A good version also clears a failed cold start: /readyz reports this load instead.
+        startup.update(load_seconds=round(time.perf_counter() - started, 3), error=None)
+        reloads["count"] += 1
+        reloads.update(rejected=None, error=None)
+        logger.info(
+            "Swapped artifacts %s -> %s",
+            previous.label if previous is not None else None,
+            state.label,
+        )
+        return state
+
+
+async def watch_versions(interval: float) -> None:
+    """Reload whenever ``ARTIFACTS_DIR/CURRENT`` points at a version not yet served.
+
+    With nothing served yet (a failed or lazy cold start) the published version is loaded as
+    the first one, unless the warm-up is still busy loading it.
+    """
+
+    while True:
+        await asyncio.sleep(interval)
+        directory = current_directory(ARTIFACTS_DIR)
+        if _state is None and startup["warming"]:
+            continue
+        if _state is not None and directory == _state.directory:
+            continue
+        if directory.name == reloads["rejected"]:
+            continue
+        try:
+            await run_in_threadpool(reload_state, directory)
+        except Exception:
+            logger.exception("Rejected artifacts version %s", directory.name)
+
 
+def warm_up() -> None:
+    """Load the state and run the warm-up query; failures are kept for /readyz."""
 
-@app.get("/recommend")
-def recommend(item_id: str = Query(...), k: int = Query(5, ge=1, le=50)):
-    state = get_state()
+    startup.update(warming=True, error=None)
     try:
-        results = state.recommend(item_id, k=k)
+        state = get_state()
+        started = time.perf_counter()
+        state.warm_up()
+        startup["warmup_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            "Loaded artifacts in %.2fs, warm-up query took %.2fs",
+            startup["load_seconds"],
+            startup["warmup_seconds"],
+        )
+    except Exception as exc:
+        startup["error"] = f"{type(exc).__name__}: {exc}"
+        logger.exception("Loading artifacts failed")
+    finally:
+        startup["warming"] = False
+
+
+async def get_state_async() -> RecommenderState:
+    """``get_state`` that keeps the event loop free while artifacts are being loaded."""
+
+    if _state is not None:
+        return _state
+    return await run_in_threadpool(get_state)
+
+
+def per_state(
+    process: Callable[[RecommenderState, List[Any]], List[Hits]], name: str
+) -> Callable[[List[Tuple[RecommenderState, Any]]], List[Hits]]:
+    """Batch function that runs each request on the state it was validated against.
+
+    Row numbers differ between artifact versions, so a batch straddling a reload is split
+    by state instead of being resolved on whichever state is live.
+    """
+
+    def run(items: List[Tuple[RecommenderState, Any]]) -> List[Hits]:
+        BATCH_SIZE.observe(len(items), name)
+        groups: Dict[int, List[int]] = {}
+        for pos, (state, _) in enumerate(items):
+            groups.setdefault(id(state), []).append(pos)
+        results: List[Hits | None] = [None] * len(items)
+        for positions in groups.values():
+            state = items[positions[0]][0]
+            hits = process(state, [items[pos][1] for pos in positions])
+            for pos, hit in zip(positions, hits):
+                results[pos] = hit
+        return results
+
+    return run
+
+
+search_batcher: MicroBatcher[Tuple[RecommenderState, SearchRequest], Hits] = MicroBatcher(
+    per_state(RecommenderState.search_batch, "search"), BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+)
+recommend_batcher: MicroBatcher[Tuple[RecommenderState, RecommendRequest], Hits] = MicroBatcher(
+    per_state(RecommenderState.recommend_batch, "recommend"), BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+)
+
+
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    return {
+        "query_embeddings": query_cache.stats(),
+        "search_results": result_cache.stats(),
+        "result_fragments": fragment_cache.stats(),
+    }
+
+
+def batch_stats() -> Dict[str, Dict[str, float]]:
+    return {
+        name: {
+            "batches": batcher.batches,
+            "items": batcher.items,
+            "mean_batch_size": batcher.mean_batch_size,
+        }
+        for name, batcher in (("search", search_batcher), ("recommend", recommend_batcher))
+    }
+
+
+def _register_scrape_metrics() -> None:
+    """Export cache, index and process stats that are read only when /metrics is scraped."""
+
+    caches = (
+        ("query_embeddings", query_cache),
+        ("search_results", result_cache),
+        ("result_fragments", fragment_cache),
+    )
+    for name, key, kind, description in (
+        ("arxiv_rec_cache_hits_total", "hits", "counter", "Cache hits."),
+        ("arxiv_rec_cache_misses_total", "misses", "counter", "Cache misses."),
+        ("arxiv_rec_cache_evictions_total", "evictions", "counter", "Cache evictions."),
+        ("arxiv_rec_cache_entries", "size", "gauge", "Entries held by the cache."),
+        ("arxiv_rec_cache_hit_ratio", "hit_rate", "gauge", "Hits over lookups since start."),
+    ):
+        metrics.register(
+            Collected(
+                name,
+                description,
+                lambda key=key: [((label,), cache.stats()[key]) for label, cache in caches],
+                ("cache",),
+                kind,
+            )
+        )
+    metrics.register(
+        Collected(
+            "arxiv_rec_index_items",
+            "Vectors in the served index.",
+            lambda: [((), _state.index.size)] if _state is not None else [],
+        )
+    )
+    metrics.register(
+        Collected(
+            "arxiv_rec_resident_memory_bytes",
+            "Resident set size of this process.",
+            lambda: [((), resident_memory_bytes())],
+        )
+    )
+    metrics.register(
+        Collected(
+            "arxiv_rec_reloads_total",
+            "Artifact versions swapped in since start.",
+            lambda: [((), reloads["count"])],
+            kind="counter",
+        )
+    )
+    metrics.register(
+        Collected(
+            "arxiv_rec_ready",
+            "1 once the artifacts are loaded.",
+            lambda: [((), float(_state is not None))],
+        )
+    )
+
+
+_register_scrape_metrics()
+
+
+def parse_fields(fields: str | None) -> Sequence[str]:
+    """Turn ``fields=title,abstract`` into the result columns to ship (``id`` is always kept)."""
+
+    if fields is None:
+        return RESULT_FIELDS
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(RESULT_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown fields {unknown}; choose from {list(RESULT_FIELDS)}"
+        )
+    return ["id"] + [field for field in RESULT_FIELDS if field in requested and field != "id"]
+
+
+def parse_filters(
+    state: RecommenderState,
+    categories: str | None,
+    since: str | None = None,
+    until: str | None = None,
+) -> Filters:
+    """Validate ``categories=cs.LG,hep-th`` (any of them) and a ``since``/``until`` range."""
+
+    names: Tuple[str, ...] = ()
+    if categories is not None:
+        names = tuple(sorted({name.strip() for name in categories.split(",") if name.strip()}))
+        unknown = [name for name in names if name not in state.categories]
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown categories {unknown}")
+    if since is None and until is None:
+        return Filters(names)
+    if state.dates is None:
+        raise HTTPException(
+            status_code=422, detail="Date filters need submission dates; rebuild the index."
+        )
+    try:
+        start = parse_date_bound(since) if since is not None else None
+        end = parse_date_bound(until, end=True) if until is not None else None
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=422, detail="since must not be later than until")
+    return Filters(names, start, end)
+
+
+def parse_mode(state: RecommenderState, mode: str) -> str:
+    """Validate ``mode=vector|hybrid``; hybrid needs artifacts built with a lexical index."""
+
+    if mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown mode {mode!r}; choose from {list(SEARCH_MODES)}"
+        )
+    if mode == "hybrid" and state.lexical is None:
+        raise HTTPException(
+            status_code=422, detail="mode=hybrid needs a lexical index; rebuild the artifacts."
+        )
+    return mode
+
+
+def answer_search_batch(
+    state: RecommenderState,
+    queries: Sequence[str],
+    requests: Sequence[SearchRequest],
+    fields: Sequence[str],
+    abstract_chars: int | None,
+) -> bytes:
+    """``/search/batch`` results: searching and encoding in one call, run in the threadpool."""
+
+    hits: List[Hits | None] = [state.cached(request) for request in requests]
+    pending = [request for request, hit in zip(requests, hits) if hit is None]
+    if pending:
+        fresh = iter(state.search_batch(pending))
+        hits = [hit if hit is not None else next(fresh) for hit in hits]
+    return json_array(
+        json_object(
+            [
+                ("query", dumps(query)),
+                ("results", state.encode_results(*hit, fields, abstract_chars)),
+            ]
+        )
+        for query, hit in zip(queries, hits)
+    )
+
+
+def answer_recommend_batch(
+    state: RecommenderState,
+    item_ids: Sequence[str],
+    k: int,
+    filters: Filters,
+    tuning: Tuning,
+    fields: Sequence[str],
+    abstract_chars: int | None,
+) -> bytes:
+    """``/recommend/batch`` results, with an ``error`` instead for ids the artifacts lack."""
+
+    known = [item_id for item_id in item_ids if item_id in state.row_lookup]
+    hits: Dict[str, Hits] = {}
+    if known:
+        requests = [(state.row_lookup[item_id], k, filters, tuning) for item_id in known]
+        hits = dict(zip(known, state.recommend_batch(requests)))
+    items: List[bytes] = []
+    for item_id in item_ids:
+        if item_id in hits:
+            results = state.encode_results(*hits[item_id], fields, abstract_chars)
+            items.append(json_object([("item_id", dumps(item_id)), ("results", results)]))
+        else:
+            error = dumps(f"Item id {item_id} not found")
+            items.append(json_object([("item_id", dumps(item_id)), ("error", error)]))
+    return json_array(items)
+
+
+FIELDS_QUERY = Query(
+    None, description="Comma-separated subset of id,title,abstract,categories (default: all)."
+)
+CATEGORIES_QUERY = Query(
+    None, description="Comma-separated arXiv categories to keep, e.g. cs.LG,hep-th."
+)
+SINCE_QUERY = Query(None, description="Earliest submission date: YYYY, YYYY-MM or YYYY-MM-DD.")
+UNTIL_QUERY = Query(None, description="Latest submission date (inclusive), same formats.")
+ABSTRACT_CHARS_QUERY = Query(
+    None, ge=0, description="Truncate abstracts to about this many characters (default: full)."
+)
+MODE_QUERY = Query(
+    "vector", description="vector, or hybrid to fuse BM25 keyword hits by reciprocal rank."
+)
+NPROBE_QUERY = Query(
+    None, ge=1, le=MAX_NPROBE, description="IVF lists probed (default: the index's nprobe)."
+)
+EF_SEARCH_QUERY = Query(
+    None, ge=1, le=MAX_EF_SEARCH, description="HNSW candidate list size (default: the index's)."
+)
+
+
+class SearchBatchRequest(BaseModel):
+    queries: List[Annotated[str, Field(min_length=3)]] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_ITEMS
+    )
+    k: int = Field(5, ge=1, le=50)
+    fields: str | None = None
+    categories: str | None = None
+    since: str | None = None
+    until: str | None = None
+    mode: str = "vector"
+    abstract_chars: int | None = Field(None, ge=0)
+    nprobe: int | None = Field(None, ge=1, le=MAX_NPROBE)
+    ef_search: int | None = Field(None, ge=1, le=MAX_EF_SEARCH)
+
+
+class RecommendBatchRequest(BaseModel):
+    item_ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+    k: int = Field(5, ge=1, le=50)
+    fields: str | None = None
+    categories: str | None = None
+    since: str | None = None
+    until: str | None = None
+    abstract_chars: int | None = Field(None, ge=0)
+    nprobe: int | None = Field(None, ge=1, le=MAX_NPROBE)
+    ef_search: int | None = Field(None, ge=1, le=MAX_EF_SEARCH)
+
+
+@app.get("/search", response_class=EncodedJSONResponse)
+async def search(
+    q: str = Query(..., min_length=3),
+    k: int = Query(5, ge=1, le=50),
+    fields: str | None = FIELDS_QUERY,
+    categories: str | None = CATEGORIES_QUERY,
+    since: str | None = SINCE_QUERY,
+    until: str | None = UNTIL_QUERY,
+    mode: str = MODE_QUERY,
+    abstract_chars: int | None = ABSTRACT_CHARS_QUERY,
+    nprobe: int | None = NPROBE_QUERY,
+    ef_search: int | None = EF_SEARCH_QUERY,
+):
+    state = await get_state_async()
+    selected = parse_fields(fields)
+    filters = parse_filters(state, categories, since, until)
+    mode = parse_mode(state, mode)
+    request = (normalize_query(q), k, filters, mode, Tuning(nprobe, ef_search))
+    hit = state.cached(request)
+    if hit is None:
+        hit = await search_batcher.submit((state, request))
+    results = await run_in_threadpool(state.encode_results, *hit, selected, abstract_chars)
+    return EncodedJSONResponse(json_object([("results", results)]))
+
+
+@app.get("/recommend", response_class=EncodedJSONResponse)
+async def recommend(
+    item_id: str = Query(...),
+    k: int = Query(5, ge=1, le=50),
+    fields: str | None = FIELDS_QUERY,
+    categories: str | None = CATEGORIES_QUERY,
+    since: str | None = SINCE_QUERY,
+    until: str | None = UNTIL_QUERY,
+    abstract_chars: int | None = ABSTRACT_CHARS_QUERY,
+    nprobe: int | None = NPROBE_QUERY,
+    ef_search: int | None = EF_SEARCH_QUERY,
+):
+    state = await get_state_async()
+    selected = parse_fields(fields)
+    filters = parse_filters(state, categories, since, until)
+    try:
+        row = state.row_for(item_id)
     except KeyError as exc:  # pragma: no cover - simple error translation
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return {"results": results}
+    hit = state.graph_hit(row, k, filters)
+    if hit is None:
+        request = (row, k, filters, Tuning(nprobe, ef_search))
+        hit = await recommend_batcher.submit((state, request))
+    results = await run_in_threadpool(state.encode_results, *hit, selected, abstract_chars)
+    return EncodedJSONResponse(json_object([("results", results)]))
+
+
+@app.post("/search/batch", response_class=EncodedJSONResponse)
+async def search_batch(body: SearchBatchRequest):
+    """Run many queries with one batched encode and one FAISS search."""
+
+    state = await get_state_async()
+    selected = parse_fields(body.fields)
+    filters = parse_filters(state, body.categories, body.since, body.until)
+    mode = parse_mode(state, body.mode)
+    tuning = Tuning(body.nprobe, body.ef_search)
+    requests = [(normalize_query(query), body.k, filters, mode, tuning) for query in body.queries]
+    results = await run_in_threadpool(
+        answer_search_batch, state, body.queries, requests, selected, body.abstract_chars
+    )
+    return EncodedJSONResponse(json_object([("results", results)]))
+
+
+@app.post("/recommend/batch", response_class=EncodedJSONResponse)
+async def recommend_batch(body: RecommendBatchRequest):
+    """Neighbours for many item ids in one FAISS search; unknown ids are reported per item."""
+
+    state = await get_state_async()
+    selected = parse_fields(body.fields)
+    filters = parse_filters(state, body.categories, body.since, body.until)
+    results = await run_in_threadpool(
+        answer_recommend_batch,
+        state,
+        body.item_ids,
+        body.k,
+        filters,
+        Tuning(body.nprobe, body.ef_search),
+        selected,
+        body.abstract_chars,
+    )
+    return EncodedJSONResponse(json_object([("results", results)]))
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up, whether or not the artifacts are loaded yet."""
+
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 200 once the artifacts are loaded and warmed up, 503 before or on failure."""
+
+    if startup["error"] is not None:
+        return JSONResponse({"status": "failed", "error": startup["error"]}, status_code=503)
+    if _state is None and not WARMUP:  # loads on the first request, which then pays for it
+        return JSONResponse({"status": "lazy"}, status_code=503)
+    if _state is None or startup["warming"]:
+        return JSONResponse({"status": "loading"}, status_code=503)
+    return {
+        "status": "ready",
+        "artifacts": _state.label,
+        "items": _state.index.size,
+        "load_seconds": startup["load_seconds"],
+        "warmup_seconds": startup["warmup_seconds"],
+        "reloads": reloads,
+    }
+
+
+@app.post("/reload")
+async def reload():
+    """Load the currently published artifacts version and swap it in without downtime."""
+
+    try:
+        state = await run_in_threadpool(reload_state)
+    except Exception as exc:
+        raise HTTPException(status_code=409, detail=f"{type(exc).__name__}: {exc}") from exc
+    return {"status": "reloaded", "artifacts": state.label, "items": state.index.size}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus scrape endpoint."""
+
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    return cache_stats()
+
+
+@app.get("/batch/stats")
+def get_batch_stats():
+    return batch_stats()
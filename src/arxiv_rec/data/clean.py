@@ -3,11 +3,35 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable
+from typing import Iterable, Sequence
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 TEXT_COLUMNS: Iterable[str] = ("id", "title", "abstract", "categories")
+# Submission date sources, in order of preference.
+DATE_COLUMNS: Iterable[str] = ("created", "updated")
+# Formats found in the snapshot (ISO days and RFC 2822 version stamps, always GMT). An
+# explicit format parses ~20x faster than format="mixed", which only handles the leftovers.
+DATE_FORMATS: Sequence[str] = ("%Y-%m-%d", "%a, %d %b %Y %H:%M:%S GMT")
+
+# Code points matched by Python's ``\s`` / ``str.isspace`` (and by Arrow's utf8 whitespace
+# kernels). RE2 only treats ASCII as ``\s``, so the pattern below spells the class out.
+_WHITESPACE = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+)
+
+
+def _char_class(chars: str) -> str:
+    return "[" + "".join(f"\\x{{{ord(char):x}}}" for char in chars) + "]"
+
+
+# Anything other than single spaces between words needs collapsing.
+_NEEDS_COLLAPSE = _char_class(_WHITESPACE) + "{2,}|" + _char_class(_WHITESPACE.replace(" ", ""))
+_STRING_DTYPE = pd.StringDtype("pyarrow")
 
 
 def _normalize(value: str | float | None) -> str:
@@ -18,23 +42,75 @@ def _normalize(value: str | float | None) -> str:
     return text
 
 
+def _normalize_series(series: pd.Series) -> pd.Series:
+    """Vectorized ``series.apply(_normalize)`` on Arrow-backed strings."""
+
+    values = series.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    text = series.astype(_STRING_DTYPE)
+    if missing.any():
+        # Match ``_normalize``: ``None`` becomes "" while other nulls keep their ``str()``.
+        filled = values[missing].astype(str)
+        filled[filled == "None"] = ""
+        text[missing] = filled
+
+    array = pc.utf8_trim_whitespace(pa.array(text.array))
+    needs_collapse = pc.match_substring_regex(array, _NEEDS_COLLAPSE)
+    if pc.any(needs_collapse).as_py():
+        words = pc.utf8_split_whitespace(pc.filter(array, needs_collapse))
+        array = pc.replace_with_mask(
+            array, needs_collapse, pc.binary_join(words, pa.scalar(" ", array.type))
+        )
+    return pd.Series(pd.arrays.ArrowStringArray(array), index=series.index, name=series.name)
+
+
 def prepare_corpus(df: pd.DataFrame) -> pd.DataFrame:
-    """Return a tidy DataFrame with combined text ready for embeddings."""
+    """Return a tidy DataFrame with combined text ready for embeddings.
+
+    Works on whole frames as well as on chunks from ``ingest.iter_metadata``; the input
+    frame is left untouched and its non-text columns are not copied.
+    """
 
     missing = [col for col in ("id", "title", "abstract") if col not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
-    tidy = df.copy()
+    tidy = df.copy(deep=False)
     for column in TEXT_COLUMNS:
         if column in tidy.columns:
-            tidy[column] = tidy[column].apply(_normalize)
+            tidy[column] = _normalize_series(tidy[column])
+
+    tidy["text"] = (tidy["title"] + ". " + tidy["abstract"]).str.strip(" .")
+
+    keep = (tidy["text"] != "").to_numpy(dtype=bool)
+    if not keep.all():
+        tidy = tidy[keep]
+    return tidy.reset_index(drop=True)
+
+
+def submission_dates(df: pd.DataFrame) -> pd.Series:
+    """Day each paper was submitted: ``created``, else ``updated``; NaT when neither parses."""
+
+    dates = pd.Series(pd.NaT, index=df.index, dtype="datetime64[us, UTC]")
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            dates = dates.fillna(_parse_dates(df[column]))
+    return dates.dt.tz_localize(None).dt.normalize()
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """``DATE_FORMATS`` in turn on the values still unparsed, then ``format="mixed"``.
 
-    tidy["text"] = (
-        tidy["title"].where(tidy["title"] != "", other="")
-        + ". "
-        + tidy["abstract"].where(tidy["abstract"] != "", other="")
-    ).str.strip(" .")
+    Empty strings count as missing, so ``updated`` fills in for an empty ``created``.
+    """
 
-    tidy = tidy[tidy["text"] != ""].reset_index(drop=True)
-    return tidy
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[us, UTC]")
+    pending = (values.notna() & (values != "")).to_numpy(copy=True)
+    for date_format in (*DATE_FORMATS, "mixed"):
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(
+            values[pending], errors="coerce", utc=True, format=date_format
+        )
+        pending &= parsed.isna().to_numpy()
+    return parsed
@@ -0,0 +1,156 @@
+"""Parallel conversion of the JSON-lines snapshot into a (year-partitioned) Parquet dataset.
+
+The file is cut into byte ranges that end on line boundaries; each range is parsed by
+Arrow's JSON reader in a worker process and written as its own compressed Parquet file, so
+neither parsing nor writing funnels through one process.
+"""
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.json as pj
+import pyarrow.parquet as pq
+
+from arxiv_rec.data.clean import DATE_COLUMNS, submission_dates
+from arxiv_rec.data.ingest import DEFAULT_COLUMNS, JSON_BLOCK_SIZE
+
+DEFAULT_RANGE_BYTES = 64 * 1024 * 1024
+DEFAULT_ROW_GROUP_SIZE = 50_000
+PARTITION_COLUMN = "year"
+
+
+def line_aligned_ranges(path: str | Path, range_bytes: int) -> List[Tuple[int, int]]:
+    """Split ``path`` into ``[start, end)`` byte ranges of about ``range_bytes`` on line ends."""
+
+    if range_bytes <= 0:
+        raise ValueError("range_bytes must be positive")
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as handle:
+        while start < size:
+            handle.seek(min(start + range_bytes, size))
+            handle.readline()  # finish the line the cut fell into
+            end = min(handle.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def convert_to_parquet(
+    json_path: str | Path,
+    output_dir: str | Path,
+    columns: Iterable[str] | None = None,
+    partition_by_year: bool = False,
+    workers: int | None = None,
+    range_bytes: int = DEFAULT_RANGE_BYTES,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = "zstd",
+) -> Path:
+    """Write the ``columns`` of a JSON-lines snapshot as a Parquet dataset in ``output_dir``.
+
+    With ``partition_by_year`` files go to hive-style ``year=YYYY/`` directories (taken from
+    ``created``, else ``updated``), so filters on ``year`` skip whole files. The dataset is
+    assembled next to ``output_dir`` and renamed into place once every range is written.
+    """
+
+    json_path, output_dir = Path(json_path), Path(output_dir)
+    if json_path.suffix not in {".json", ".jsonl"}:
+        raise ValueError(
+            f"Byte-range conversion needs an uncompressed JSON-lines file: {json_path}"
+        )
+    selected = list(columns) if columns is not None else list(DEFAULT_COLUMNS)
+    ranges = line_aligned_ranges(json_path, range_bytes)
+    tmp_dir = output_dir.with_name(output_dir.name + ".partial")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    tasks = [
+        (str(json_path), start, end, selected, str(tmp_dir), f"part-{number:05d}")
+        for number, (start, end) in enumerate(ranges)
+    ]
+    options = (partition_by_year, row_group_size, compression)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        for task in tasks:
+            _convert_range(*task, *options)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = [pool.submit(_convert_range, *task, *options) for task in tasks]
+            for future in futures:
+                future.result()
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    tmp_dir.replace(output_dir)
+    return output_dir
+
+
+def parse_range(path: str | Path, start: int, end: int, columns: Sequence[str]) -> pa.Table:
+    """Parse the JSON lines in ``[start, end)`` into a table of string ``columns``."""
+
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    table = pj.read_json(
+        io.BytesIO(data),
+        read_options=pj.ReadOptions(use_threads=False, block_size=JSON_BLOCK_SIZE),
+        parse_options=pj.ParseOptions(explicit_schema=schema, unexpected_field_behavior="ignore"),
+    )
+    # The explicit schema materializes keys absent from every line as null columns.
+    return table.select(list(columns))
+
+
+def _convert_range(
+    path: str,
+    start: int,
+    end: int,
+    columns: List[str],
+    output_dir: str,
+    name: str,
+    partition_by_year: bool,
+    row_group_size: int,
+    compression: str,
+) -> int:
+    table = parse_range(path, start, end, columns)
+    if not partition_by_year:
+        pq.write_table(
+            table,
+            Path(output_dir) / f"{name}.parquet",
+            row_group_size=row_group_size,
+            compression=compression,
+        )
+        return table.num_rows
+    table = table.append_column(PARTITION_COLUMN, _years(table))
+    ds.write_dataset(
+        table,
+        output_dir,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.int16())]), flavor="hive"),
+        basename_template=f"{name}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        max_rows_per_group=row_group_size,
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+    )
+    return table.num_rows
+
+
+def _years(table: pa.Table) -> pa.Array:
+    """Year of the submission date ``clean.submission_dates`` reads; null when none parses."""
+
+    columns = [column for column in DATE_COLUMNS if column in table.column_names]
+    if not columns:
+        raise ValueError("Partitioning by year needs a 'created' or 'updated' column")
+    years = submission_dates(table.select(columns).to_pandas()).dt.year
+    return pa.array(years, type=pa.int16(), from_pandas=True)
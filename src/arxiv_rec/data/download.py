@@ -0,0 +1,338 @@
+"""Segmented, resumable HTTP downloads verified before the final atomic rename.
+
+The file is split into byte ranges fetched in parallel over one pooled session and written in
+place into ``<destination>.partial``. Progress per segment is kept in a sidecar JSON file, so
+an interrupted download resumes the unfinished ranges instead of starting over.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+DEFAULT_SEGMENTS = 8
+MIN_SEGMENT_SIZE = 16 * 1024 * 1024
+STATE_SAVE_INTERVAL = 1.0  # seconds between sidecar updates while downloading
+
+Progress = Callable[[int, int], None]
+
+
+@dataclass(frozen=True)
+class RemoteFile:
+    """What a probe learned about ``url`` (the final URL after redirects)."""
+
+    url: str
+    size: int | None
+    accepts_ranges: bool
+    validator: str = ""  # ETag or Last-Modified; a change invalidates a partial download
+    md5: str | None = None
+
+
+@dataclass
+class Segment:
+    start: int
+    end: int  # exclusive
+    done: int = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.end - self.start - self.done
+
+
+@dataclass
+class DownloadState:
+    """Sidecar describing which bytes of the ``.partial`` file are already on disk."""
+
+    size: int
+    validator: str
+    segments: List[Segment] = field(default_factory=list)
+
+    @classmethod
+    def plan(
+        cls, size: int, validator: str, segments: int, min_segment_size: int = MIN_SEGMENT_SIZE
+    ) -> "DownloadState":
+        count = max(1, min(segments, math.ceil(size / max(1, min_segment_size))))
+        bounds = [size * part // count for part in range(count + 1)]
+        return cls(size, validator, [Segment(a, b) for a, b in zip(bounds, bounds[1:])])
+
+    @property
+    def done(self) -> int:
+        return sum(segment.done for segment in self.segments)
+
+    def save(self, path: Path) -> None:
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(asdict(self)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "DownloadState | None":
+        try:
+            payload = json.loads(path.read_text())
+            segments = [Segment(**segment) for segment in payload.pop("segments")]
+            return cls(segments=segments, **payload)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+
+def make_session(pool_size: int = DEFAULT_SEGMENTS, retries: int = 3) -> requests.Session:
+    """Session with a connection pool sized for ``pool_size`` concurrent segments."""
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def probe(session: requests.Session, url: str, auth=None, timeout: float = 60) -> RemoteFile:
+    """Follow redirects and ask for one byte to learn the size and whether ranges work."""
+
+    with session.get(
+        url, headers={"Range": "bytes=0-0"}, auth=auth, stream=True, timeout=timeout
+    ) as response:
+        response.raise_for_status()
+        headers = response.headers
+        validator = headers.get("ETag") or headers.get("Last-Modified") or ""
+        content_range = headers.get("Content-Range", "")
+        if response.status_code == 206 and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            size = int(total) if total.isdigit() else None
+            return RemoteFile(response.url, size, size is not None, validator, _md5(headers))
+        length = headers.get("Content-Length")
+        size = int(length) if length and length.isdigit() else None
+        md5 = _md5(headers) or _base64_hex(headers.get("Content-MD5"))
+        return RemoteFile(response.url, size, False, validator, md5)
+
+
+def download(
+    url: str,
+    destination: str | Path,
+    *,
+    session: requests.Session | None = None,
+    auth=None,
+    segments: int = DEFAULT_SEGMENTS,
+    min_segment_size: int = MIN_SEGMENT_SIZE,
+    expected_sha256: str | None = None,
+    retries: int = 3,
+    chunk_size: int = CHUNK_SIZE,
+    timeout: float = 60,
+    progress: Progress | None = None,
+) -> Path:
+    """Download ``url`` to ``destination``, resuming a previous ``.partial`` when possible.
+
+    Raises ``ValueError`` (and discards the partial file) if the result has the wrong size or
+    does not match ``expected_sha256`` or the server-advertised MD5.
+    """
+
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    partial = destination.with_name(destination.name + ".partial")
+    state_path = destination.with_name(destination.name + ".partial.json")
+    session = session or make_session(segments)
+    remote = probe(session, url, auth=auth, timeout=timeout)
+    # Redirect targets (signed storage URLs) must not receive the original credentials.
+    segment_auth = auth if remote.url == url else None
+
+    if remote.accepts_ranges and remote.size:
+        state = DownloadState.load(state_path) if partial.exists() else None
+        if state is None or (state.size, state.validator) != (remote.size, remote.validator):
+            state = DownloadState.plan(remote.size, remote.validator, segments, min_segment_size)
+            with partial.open("wb") as handle:
+                handle.truncate(remote.size)
+            state.save(state_path)
+        fetcher = _SegmentFetcher(
+            session, remote.url, segment_auth, partial, state, state_path, chunk_size, timeout
+        )
+        fetcher.run(retries, progress)
+    else:
+        _stream(session, remote.url, segment_auth, partial, chunk_size, timeout, progress)
+
+    try:
+        verify(partial, remote.size, expected_sha256=expected_sha256, expected_md5=remote.md5)
+    except ValueError:
+        partial.unlink(missing_ok=True)
+        state_path.unlink(missing_ok=True)
+        raise
+    os.replace(partial, destination)
+    state_path.unlink(missing_ok=True)
+    return destination
+
+
+def verify(
+    path: Path,
+    size: int | None,
+    expected_sha256: str | None = None,
+    expected_md5: str | None = None,
+) -> None:
+    """Raise ``ValueError`` unless ``path`` has ``size`` bytes and the expected digests."""
+
+    actual = path.stat().st_size
+    if size is not None and actual != size:
+        raise ValueError(f"{path} has {actual} bytes, expected {size}")
+    digests = {
+        name: (hashlib.new(name), expected.lower())
+        for name, expected in (("sha256", expected_sha256), ("md5", expected_md5))
+        if expected
+    }
+    if not digests:
+        return
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            for digest, _ in digests.values():
+                digest.update(block)
+    for name, (digest, expected) in digests.items():
+        if digest.hexdigest() != expected:
+            raise ValueError(f"{path} {name} is {digest.hexdigest()}, expected {expected}")
+
+
+class _SegmentFetcher:
+    """Fetches the unfinished segments of ``state`` concurrently, one thread per segment."""
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        auth,
+        partial: Path,
+        state: DownloadState,
+        state_path: Path,
+        chunk_size: int,
+        timeout: float,
+    ) -> None:
+        self.session = session
+        self.url = url
+        self.auth = auth
+        self.partial = partial
+        self.state = state
+        self.state_path = state_path
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._saved = time.monotonic()
+        self._progress: Progress | None = None
+
+    def run(self, retries: int, progress: Progress | None) -> None:
+        self._progress = progress
+        pending = [segment for segment in self.state.segments if segment.remaining]
+        try:
+            if pending:
+                with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                    futures = [pool.submit(self._fetch, segment, retries) for segment in pending]
+                    for future in futures:
+                        future.result()
+        finally:
+            with self._lock:
+                self.state.save(self.state_path)
+
+    def _fetch(self, segment: Segment, retries: int) -> None:
+        for attempt in range(retries + 1):
+            try:
+                self._fetch_once(segment)
+                return
+            except requests.RequestException:
+                if attempt == retries:
+                    raise
+                time.sleep(min(2.0**attempt, 10.0))
+
+    def _fetch_once(self, segment: Segment) -> None:
+        offset = segment.start + segment.done
+        headers = {"Range": f"bytes={offset}-{segment.end - 1}"}
+        with (
+            self.session.get(
+                self.url, headers=headers, auth=self.auth, stream=True, timeout=self.timeout
+            ) as response,
+            self.partial.open("r+b") as handle,
+        ):
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise requests.HTTPError(
+                    f"Expected 206 for {headers['Range']}, got {response.status_code}",
+                    response=response,
+                )
+            handle.seek(offset)
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                chunk = chunk[: segment.remaining]
+                if not chunk:
+                    continue
+                handle.write(chunk)
+                handle.flush()
+                self._advance(segment, len(chunk))
+        if segment.remaining:
+            raise requests.ConnectionError(f"Range {headers['Range']} ended early")
+
+    def _advance(self, segment: Segment, written: int) -> None:
+        with self._lock:
+            segment.done += written
+            now = time.monotonic()
+            if now - self._saved >= STATE_SAVE_INTERVAL:
+                self.state.save(self.state_path)
+                self._saved = now
+            if self._progress is not None:
+                self._progress(self.state.done, self.state.size)
+
+
+def _stream(
+    session: requests.Session,
+    url: str,
+    auth,
+    partial: Path,
+    chunk_size: int,
+    timeout: float,
+    progress: Progress | None,
+) -> None:
+    """Single-connection fallback for servers without range support (restarts from zero)."""
+
+    with session.get(url, auth=auth, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        total = int(response.headers.get("Content-Length", 0))
+        downloaded = 0
+        with partial.open("wb") as handle:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    handle.write(chunk)
+                    downloaded += len(chunk)
+                    if progress is not None:
+                        progress(downloaded, total)
+
+
+def _md5(headers) -> str | None:
+    """Whole-object hex MD5 from Google Cloud Storage's ``x-goog-hash``, if present.
+
+    ``Content-MD5`` only describes the body, so it is trusted for full (200) responses only.
+    """
+
+    values: Dict[str, str] = {}
+    for item in headers.get("x-goog-hash", "").split(","):
+        name, _, value = item.strip().partition("=")
+        if value:
+            values[name] = value
+    return _base64_hex(values.get("md5"))
+
+
+def _base64_hex(encoded: str | None) -> str | None:
+    if not encoded:
+        return None
+    try:
+        return base64.b64decode(encoded).hex()
+    except ValueError:
+        return None
@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
-import io
+import itertools
+import json
+import re
 import zipfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import IO, Iterable, Iterator, List, Sequence
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.json as pj
 
 DEFAULT_COLUMNS: Sequence[str] = (
     "id",
@@ -18,36 +24,169 @@ DEFAULT_COLUMNS: Sequence[str] = (
     "created",
     "updated",
 )
+DEFAULT_CHUNK_SIZE = 50_000
+# Arrow parses a block at a time; one block must hold the longest line of the snapshot.
+JSON_BLOCK_SIZE = 8 * 1024 * 1024
 
 
-def load_metadata(data_path: str | Path, columns: Iterable[str] | None = None) -> pd.DataFrame:
-    """Load the arXiv metadata snapshot from CSV or JSON (optionally zipped)."""
+@contextmanager
+def _open_json_lines(path: Path) -> Iterator[IO[bytes]]:
+    """Yield a binary stream of the JSON lines, unzipping on the fly."""
+
+    if path.suffix in {".json", ".jsonl"}:
+        with open(path, "rb") as fh:
+            yield fh
+        return
+
+    with zipfile.ZipFile(path) as zf:
+        json_members = [name for name in zf.namelist() if name.endswith(".json")]
+        if not json_members:
+            raise ValueError(f"No JSON file found inside {path}")
+        with zf.open(json_members[0]) as fh:
+            yield fh
+
+
+def iter_metadata(
+    data_path: str | Path,
+    columns: Iterable[str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    limit: int | None = None,
+    predicate: ds.Expression | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream the snapshot as DataFrames of at most ``chunk_size`` rows.
+
+    Only the requested columns are kept from each chunk, so peak memory is bounded by
+    ``chunk_size`` rather than by the size of the snapshot. Columns that are absent from a
+    given chunk are filled with nulls.
+
+    JSON lines are parsed by Arrow's streaming reader with the requested columns as an
+    explicit (string) schema, so other fields such as ``authors_parsed`` are skipped by the
+    parser instead of being materialized and dropped. A column found neither in the first
+    record nor in the first parsed block raises ``ValueError`` before anything is yielded,
+    as does a requested field holding a non-string value.
+
+    A Parquet file or dataset directory (see ``arxiv_rec.data.convert``) is read with column
+    projection, and ``predicate`` (a ``pyarrow.dataset`` expression such as
+    ``ds.field("year") >= 2020``) is pushed down to skip partitions and row groups. Other
+    formats do not support ``predicate``.
+    """
 
     path = Path(data_path)
     if not path.exists():
         raise FileNotFoundError(f"Metadata file not found at {path}")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
 
     selected_cols = list(columns) if columns is not None else list(DEFAULT_COLUMNS)
 
+    if path.is_dir() or path.suffix == ".parquet":
+        yield from _iter_parquet(path, selected_cols, chunk_size, limit, predicate)
+        return
+    if predicate is not None:
+        raise ValueError("predicate is only supported for Parquet metadata")
+
     if path.suffix == ".csv":
-        df = pd.read_csv(path, usecols=selected_cols)
-        return df
+        # dtype=str keeps arXiv ids such as "0704.0001" as strings, like the JSON reader.
+        with pd.read_csv(
+            path, usecols=selected_cols, dtype=str, chunksize=chunk_size, nrows=limit
+        ) as reader:
+            for chunk in reader:
+                yield chunk[selected_cols].reset_index(drop=True)
+        return
 
-    if path.suffix in {".json", ".jsonl"}:
-        df = pd.read_json(path, lines=True)
-    elif path.suffix == ".zip":
-        with zipfile.ZipFile(path) as zf:
-            json_members = [name for name in zf.namelist() if name.endswith(".json")]
-            if not json_members:
-                raise ValueError(f"No JSON file found inside {path}")
-            with zf.open(json_members[0]) as fh:
-                buffer = io.TextIOWrapper(fh, encoding="utf-8")
-                df = pd.read_json(buffer, lines=True)
-    else:
+    if path.suffix not in {".json", ".jsonl", ".zip"}:
         raise ValueError(f"Unsupported metadata format: {path.suffix}")
 
-    missing = [col for col in selected_cols if col not in df.columns]
+    with _open_json_lines(path) as source:
+        seen = set(json.loads(source.readline() or b"{}"))
+    with _open_json_lines(path) as source:
+        batches = _read_json_batches(source, selected_cols)
+        first = next(batches, None)
+        # The explicit schema turns absent keys into nulls; a key counts as present when it
+        # appears in the first record or holds a value in the first block.
+        if first is not None:
+            seen.update(col for col in selected_cols if first[col].null_count < first.num_rows)
+        missing = [col for col in selected_cols if col not in seen]
+        if missing:
+            raise ValueError(f"Columns missing in metadata: {missing}")
+        if first is None:
+            return
+        for table in _rechunk(itertools.chain([first], batches), chunk_size, limit):
+            yield table.to_pandas()
+
+
+def _read_json_batches(source: IO[bytes], columns: List[str]) -> Iterator[pa.RecordBatch]:
+    """Arrow's streaming JSON reader over ``columns`` as strings; other keys are skipped."""
+
+    try:
+        yield from pj.open_json(
+            source,
+            read_options=pj.ReadOptions(block_size=JSON_BLOCK_SIZE),
+            parse_options=pj.ParseOptions(
+                explicit_schema=pa.schema([(col, pa.string()) for col in columns]),
+                unexpected_field_behavior="ignore",
+            ),
+        )
+    except pa.ArrowInvalid as error:
+        # Arrow reports a type clash as "Column(/<name>) changed from string to <type> ...".
+        match = re.search(r"Column\(/([^)]*)\)", str(error))
+        column = repr(match.group(1)) if match else "a requested column"
+        raise ValueError(f"Metadata column {column} holds a non-string value: {error}") from error
+
+
+def _iter_parquet(
+    path: Path,
+    columns: List[str],
+    chunk_size: int,
+    limit: int | None,
+    predicate: ds.Expression | None,
+) -> Iterator[pd.DataFrame]:
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    missing = [col for col in columns if col not in dataset.schema.names]
     if missing:
         raise ValueError(f"Columns missing in metadata: {missing}")
+    batches = dataset.to_batches(columns=columns, filter=predicate, batch_size=chunk_size)
+    for table in _rechunk(batches, chunk_size, limit):
+        yield table.to_pandas()
+
+
+def _rechunk(
+    batches: Iterable[pa.RecordBatch], chunk_size: int, limit: int | None
+) -> Iterator[pa.Table]:
+    """Regroup ``batches`` into tables of ``chunk_size`` rows, stopping after ``limit`` rows.
 
-    return df[selected_cols]
+    Readers yield batches sized by bytes or by file fragment; slicing is zero-copy.
+    """
+
+    pending: List[pa.RecordBatch] = []
+    buffered = 0
+    remaining = limit
+    for batch in batches:
+        if remaining is not None:
+            batch = batch.slice(0, remaining)
+            remaining -= batch.num_rows
+        pending.append(batch)
+        buffered += batch.num_rows
+        while buffered >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending, buffered = rest.to_batches(), rest.num_rows
+        if remaining is not None and remaining <= 0:
+            break
+    if buffered:
+        yield pa.Table.from_batches(pending)
+
+
+def load_metadata(
+    data_path: str | Path,
+    columns: Iterable[str] | None = None,
+    predicate: ds.Expression | None = None,
+) -> pd.DataFrame:
+    """Load the arXiv metadata snapshot from CSV, JSON (optionally zipped) or Parquet."""
+
+    selected_cols = list(columns) if columns is not None else list(DEFAULT_COLUMNS)
+    chunks = list(iter_metadata(data_path, columns=selected_cols, predicate=predicate))
+    if not chunks:
+        return pd.DataFrame(columns=selected_cols)
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,71 @@
+"""Columnar metadata artifacts shared by the build script and the API."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+METADATA_COLUMNS: Sequence[str] = ("id", "title", "abstract", "categories", "text")
+# Submission day (Arrow date32) used for date-range filters and time partitions.
+DATE_COLUMN = "created"
+
+
+class MetadataWriter:
+    """Append metadata tables to ``metadata.parquet`` and an uncompressed Arrow IPC file.
+
+    The Parquet copy is the portable artifact; the Arrow file can be memory-mapped by every
+    API worker so they all share one page-cache copy instead of deserialising their own.
+    """
+
+    def __init__(self, parquet_path: str | Path, arrow_path: str | Path | None = None) -> None:
+        self.parquet_path = Path(parquet_path)
+        self.arrow_path = Path(arrow_path) if arrow_path is not None else None
+        self._parquet: pq.ParquetWriter | None = None
+        self._arrow: pa.ipc.RecordBatchFileWriter | None = None
+        self._sink: pa.OSFile | None = None
+        self.rows = 0
+
+    def __enter__(self) -> "MetadataWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def write(self, table: pa.Table) -> None:
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.parquet_path, table.schema)
+            if self.arrow_path is not None:
+                self._sink = pa.OSFile(str(self.arrow_path), "wb")
+                self._arrow = pa.ipc.new_file(self._sink, table.schema)
+        self._parquet.write_table(table)
+        if self._arrow is not None:
+            self._arrow.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._arrow is not None:
+            self._arrow.close()
+            self._sink.close()
+            self._arrow = None
+            self._sink = None
+
+
+def read_metadata_table(
+    parquet_path: str | Path,
+    arrow_path: str | Path | None = None,
+    mmap: bool = False,
+    columns: Iterable[str] | None = None,
+) -> pa.Table:
+    """Load the metadata as an Arrow table, zero-copy from the Arrow file when ``mmap``."""
+
+    if mmap and arrow_path is not None and Path(arrow_path).exists():
+        source = pa.memory_map(str(arrow_path), "r")
+        table = pa.ipc.open_file(source).read_all()
+        return table.select(list(columns)) if columns is not None else table
+    return pq.read_table(parquet_path, columns=list(columns) if columns is not None else None)
@@ -0,0 +1,219 @@
+"""Versioned artifact directories: file layout, manifest and the ``CURRENT`` pointer."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+MANIFEST_FILENAME = "manifest.json"
+CURRENT_FILENAME = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+
+
+@dataclass(frozen=True)
+class ArtifactPaths:
+    """Where each artifact of one build lives inside ``directory``."""
+
+    directory: Path
+
+    @property
+    def metadata(self) -> Path:
+        return self.directory / "metadata.parquet"
+
+    @property
+    def metadata_arrow(self) -> Path:
+        return self.directory / "metadata.arrow"
+
+    @property
+    def embeddings(self) -> Path:
+        return self.directory / "embeddings.npy"
+
+    @property
+    def index(self) -> Path:
+        return self.directory / "index.faiss"
+
+    @property
+    def neighbors(self) -> Path:
+        return self.directory / "neighbors.npy"
+
+    @property
+    def categories(self) -> Path:
+        return self.directory / "categories.npy"
+
+    @property
+    def dates(self) -> Path:
+        return self.directory / "dates.npy"
+
+    @property
+    def partitions(self) -> Path:
+        return self.directory / "partitions"
+
+    @property
+    def lexical(self) -> Path:
+        return self.directory / "lexical"
+
+    @property
+    def manifest(self) -> Path:
+        return self.directory / MANIFEST_FILENAME
+
+
+@dataclass
+class ArtifactManifest:
+    """What a build produced: sizes, model and a sha256 + byte count per file."""
+
+    version: str
+    rows: int
+    dimension: int
+    model_name: str
+    index: Dict[str, Any] = field(default_factory=dict)
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    created: str = ""
+
+    @classmethod
+    def create(
+        cls,
+        directory: str | Path,
+        rows: int,
+        dimension: int,
+        model_name: str,
+        index: Dict[str, Any] | None = None,
+    ) -> "ArtifactManifest":
+        """Describe (and checksum) every file currently in ``directory``."""
+
+        directory = Path(directory)
+        files = {
+            path.relative_to(directory).as_posix(): {
+                "bytes": path.stat().st_size,
+                "sha256": file_sha256(path),
+            }
+            for path in _artifact_files(directory)
+        }
+        return cls(
+            version=directory.name,
+            rows=rows,
+            dimension=dimension,
+            model_name=model_name,
+            index=dict(index or {}),
+            files=files,
+            created=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        )
+
+    def save(self, directory: str | Path) -> Path:
+        path = Path(directory) / MANIFEST_FILENAME
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(asdict(self), indent=2))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "ArtifactManifest":
+        return cls(**json.loads((Path(directory) / MANIFEST_FILENAME).read_text()))
+
+    def verify(self, directory: str | Path, checksums: bool = False) -> None:
+        """Raise ``ValueError`` if a listed file is missing, resized or (optionally) altered."""
+
+        directory = Path(directory)
+        problems = []
+        for name, expected in self.files.items():
+            path = directory / name
+            if not path.exists():
+                problems.append(f"{name} is missing")
+            elif path.stat().st_size != expected["bytes"]:
+                problems.append(f"{name} has {path.stat().st_size} bytes, not {expected['bytes']}")
+            elif checksums and file_sha256(path) != expected["sha256"]:
+                problems.append(f"{name} does not match its checksum")
+        if problems:
+            raise ValueError(f"Artifacts in {directory} do not match the manifest: {problems}")
+
+
+def file_sha256(path: str | Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def current_directory(root: str | Path) -> Path:
+    """Directory of the published version under ``root``, or ``root`` itself (flat layout)."""
+
+    root = Path(root)
+    pointer = root / CURRENT_FILENAME
+    if pointer.exists():
+        return root / VERSIONS_DIRNAME / pointer.read_text().strip()
+    return root
+
+
+def new_version_directory(root: str | Path) -> Path:
+    """Create an empty, timestamp-named version directory under ``root/versions``."""
+
+    versions = Path(root) / VERSIONS_DIRNAME
+    versions.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    directory, suffix = versions / stamp, 1
+    while directory.exists():
+        directory, suffix = versions / f"{stamp}-{suffix}", suffix + 1
+    directory.mkdir()
+    return directory
+
+
+def publish(root: str | Path, version: str) -> Path:
+    """Atomically point ``root/CURRENT`` at ``version``; servers pick it up on reload."""
+
+    root = Path(root)
+    if not (root / VERSIONS_DIRNAME / version / MANIFEST_FILENAME).exists():
+        raise FileNotFoundError(f"Version {version} has no {MANIFEST_FILENAME}")
+    tmp_path = root / (CURRENT_FILENAME + ".tmp")
+    tmp_path.write_text(version + "\n")
+    os.replace(tmp_path, root / CURRENT_FILENAME)
+    return root / VERSIONS_DIRNAME / version
+
+
+def prune_versions(root: str | Path, keep: int = 2) -> List[str]:
+    """Delete all but the ``keep`` newest versions (never the current one); returns their names.
+
+    Files still memory-mapped by a running server stay readable until it lets them go.
+    """
+
+    root = Path(root)
+    versions = root / VERSIONS_DIRNAME
+    if not versions.is_dir():
+        return []
+    names = sorted(path.name for path in versions.iterdir() if path.is_dir())
+    current = current_directory(root).name
+    removed = [name for name in names[: max(0, len(names) - keep)] if name != current]
+    for name in removed:
+        shutil.rmtree(versions / name, ignore_errors=True)
+    return removed
+
+
+def link_tree(source: str | Path, destination: str | Path) -> None:
+    """Copy a directory tree using hard links where possible (builds never rewrite in place)."""
+
+    def link_or_copy(src: str, dst: str) -> None:
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    shutil.copytree(source, destination, copy_function=link_or_copy, dirs_exist_ok=True)
+
+
+def _artifact_files(directory: Path) -> List[Path]:
+    """Files a manifest lists: everything but the top-level manifest and temp files.
+
+    Nested files sharing the name, like ``partitions/manifest.json``, are artifacts too.
+    """
+
+    own_manifest = directory / MANIFEST_FILENAME
+    return sorted(
+        path
+        for path in directory.rglob("*")
+        if path.is_file() and path != own_manifest and not path.name.endswith(".tmp")
+    )
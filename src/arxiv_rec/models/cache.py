@@ -0,0 +1,165 @@
+"""Persistent embedding cache so rebuilds only encode new or changed papers."""
+
+from __future__ import annotations
+
+import json
+import re
+import shutil
+from pathlib import Path
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+KEYS_FILENAME = "keys.parquet"
+VECTORS_FILENAME = "embeddings.npy"
+INFO_FILENAME = "cache.json"
+# Rows copied at a time when carrying unstaged entries over into a new cache.
+COPY_BLOCK_ROWS = 65_536
+
+
+def content_hash(texts: pd.Series | Sequence[str]) -> np.ndarray:
+    """Return a stable 64-bit hash per text (vectorized, independent of the row index)."""
+
+    series = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+def _model_slug(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+class EmbeddingCache:
+    """Embeddings keyed by ``(model name, paper id, hash of the cleaned text)``.
+
+    Each model gets its own sub-directory holding ``keys.parquet`` (id + hash per row) and a
+    row-aligned ``embeddings.npy`` that is memory-mapped on load. During a build, callers
+    ``lookup`` every chunk, encode the misses and ``stage`` the full chunk; ``commit`` then
+    replaces the cache with exactly the staged rows, so withdrawn ids are dropped. Builds that
+    only saw part of the snapshot commit with ``drop_missing=False`` to keep the other rows.
+    """
+
+    def __init__(self, cache_dir: str | Path, model_name: str) -> None:
+        self.model_name = model_name
+        self.directory = Path(cache_dir) / _model_slug(model_name)
+        self._staging_dir = self.directory.with_name(self.directory.name + ".staging")
+        self._staged_chunks = 0
+        self._staged_rows = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._ids = pd.Index([], dtype=object)
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._rows = np.empty(0, dtype=np.int64)
+        self._vectors: np.ndarray | None = None
+        self._load()
+
+    def _load(self) -> None:
+        keys_path = self.directory / KEYS_FILENAME
+        vectors_path = self.directory / VECTORS_FILENAME
+        info_path = self.directory / INFO_FILENAME
+        if not (keys_path.exists() and vectors_path.exists() and info_path.exists()):
+            return
+        info = json.loads(info_path.read_text(encoding="utf-8"))
+        if info.get("model_name") != self.model_name:
+            return
+
+        keys = pd.read_parquet(keys_path)
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if len(keys) != len(vectors):
+            return
+        keep = ~keys["id"].duplicated(keep="last").to_numpy()
+        self._ids = pd.Index(keys["id"].astype(str).to_numpy()[keep])
+        self._hashes = keys["hash"].to_numpy(dtype=np.uint64)[keep]
+        self._rows = np.flatnonzero(keep)
+        self._vectors = vectors
+
+    @property
+    def size(self) -> int:
+        return len(self._ids)
+
+    def lookup(
+        self, ids: Sequence[str], hashes: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray | None]:
+        """Return ``(hit_mask, vectors)`` where ``vectors`` holds the cached rows for hits."""
+
+        hit = np.zeros(len(hashes), dtype=bool)
+        if self._vectors is None or not len(hashes):
+            self.misses += len(hashes)
+            return hit, None
+
+        positions = self._ids.get_indexer(pd.Index(np.asarray(ids, dtype=object).astype(str)))
+        found = positions >= 0
+        hit[found] = self._hashes[positions[found]] == hashes[found]
+        self.hits += int(hit.sum())
+        self.misses += int((~hit).sum())
+        vectors = np.asarray(self._vectors[self._rows[positions[hit]]], dtype="float32")
+        return hit, vectors
+
+    def stage(self, ids: Sequence[str], hashes: np.ndarray, embeddings: np.ndarray) -> None:
+        """Record the final embeddings of one chunk for the next ``commit``."""
+
+        if self._staged_chunks == 0:
+            shutil.rmtree(self._staging_dir, ignore_errors=True)
+            self._staging_dir.mkdir(parents=True)
+        stem = self._staging_dir / f"chunk-{self._staged_chunks:06d}"
+        pd.DataFrame({"id": np.asarray(ids, dtype=object).astype(str), "hash": hashes}).to_parquet(
+            stem.with_suffix(".parquet"), index=False
+        )
+        np.save(stem.with_suffix(".npy"), np.asarray(embeddings, dtype="float32"))
+        self._staged_chunks += 1
+        self._staged_rows += len(hashes)
+
+    def commit(self, drop_missing: bool = True) -> Path:
+        """Replace the on-disk cache with everything staged since construction.
+
+        With ``drop_missing=False`` cached ids that were not staged are carried over instead
+        of being treated as withdrawn.
+        """
+
+        if self._staged_chunks == 0:
+            return self.directory
+
+        stems = [self._staging_dir / f"chunk-{idx:06d}" for idx in range(self._staged_chunks)]
+        keys = pd.concat(
+            [pd.read_parquet(stem.with_suffix(".parquet")) for stem in stems], ignore_index=True
+        )
+        carried = np.empty(0, dtype=np.int64)
+        if not drop_missing and self._vectors is not None:
+            carried = np.flatnonzero(~self._ids.isin(keys["id"]))
+            keys = pd.concat(
+                [keys, pd.DataFrame({"id": self._ids[carried], "hash": self._hashes[carried]})],
+                ignore_index=True,
+            )
+        rows = len(keys)
+        dimension = np.load(stems[0].with_suffix(".npy"), mmap_mode="r").shape[1]
+        vectors = np.lib.format.open_memmap(
+            self._staging_dir / VECTORS_FILENAME,
+            mode="w+",
+            dtype="float32",
+            shape=(rows, dimension),
+        )
+        offset = 0
+        for stem in stems:
+            block = np.load(stem.with_suffix(".npy"))
+            vectors[offset : offset + len(block)] = block
+            offset += len(block)
+            stem.with_suffix(".npy").unlink()
+            stem.with_suffix(".parquet").unlink()
+        for start in range(0, len(carried), COPY_BLOCK_ROWS):
+            block = self._rows[carried[start : start + COPY_BLOCK_ROWS]]
+            vectors[offset : offset + len(block)] = self._vectors[block]
+            offset += len(block)
+        vectors.flush()
+        del vectors
+        keys.to_parquet(self._staging_dir / KEYS_FILENAME, index=False)
+        info = {"model_name": self.model_name, "rows": rows, "dimension": dimension}
+        (self._staging_dir / INFO_FILENAME).write_text(json.dumps(info), encoding="utf-8")
+
+        self._vectors = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._staging_dir.replace(self.directory)
+        self._staged_chunks = 0
+        self._staged_rows = 0
+        self._load()
+        return self.directory
@@ -0,0 +1,105 @@
+"""Per-category row bitmaps used to filter FAISS searches by arXiv category."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import faiss
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from arxiv_rec.models.index import config_path_for
+
+
+class CategoryBitmaps:
+    """One packed bitmap of ``size`` bits per category (bit ``i`` set when row ``i`` has it).
+
+    Bits use FAISS' ``IDSelectorBitmap`` layout (little-endian within each byte), so a union
+    of bitmaps is handed to the index as-is and filtering happens inside the search.
+    """
+
+    def __init__(self, names: List[str], bitmaps: np.ndarray, size: int) -> None:
+        if bitmaps.shape != (len(names), -(-size // 8)):
+            raise ValueError(f"Bitmaps of shape {bitmaps.shape} do not fit {len(names)} x {size}")
+        self.names = names
+        self.bitmaps = bitmaps
+        self.size = size
+        self._positions: Dict[str, int] = {name: pos for pos, name in enumerate(names)}
+
+    def __contains__(self, category: str) -> bool:
+        return category in self._positions
+
+    @classmethod
+    def from_column(cls, categories: pa.Array | pa.ChunkedArray) -> "CategoryBitmaps":
+        """Build the bitmaps from a space-separated ``categories`` column (one row per item)."""
+
+        lists = pc.utf8_split_whitespace(categories)
+        if isinstance(lists, pa.ChunkedArray):
+            lists = lists.combine_chunks()
+        tokens = pc.list_flatten(lists)
+        rows = pc.list_parent_indices(lists).to_numpy()
+        keep = pc.not_equal(tokens, "").to_numpy(zero_copy_only=False)
+        encoded = pc.dictionary_encode(tokens.filter(pa.array(keep)))
+        codes = encoded.indices.to_numpy()
+        rows = rows[keep]
+
+        names = encoded.dictionary.to_pylist()
+        order = np.argsort(names, kind="stable")
+        remap = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        codes = remap[codes]
+
+        size = len(categories)
+        bitmaps = np.zeros((len(names), -(-size // 8)), dtype=np.uint8)
+        bits = np.zeros(size, dtype=bool)
+        by_code = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[by_code], np.arange(len(names) + 1))
+        for code in range(len(names)):
+            bits[:] = False
+            bits[rows[by_code[bounds[code] : bounds[code + 1]]]] = True
+            bitmaps[code] = np.packbits(bits, bitorder="little")
+        return cls([names[pos] for pos in order], bitmaps, size)
+
+    def mask(self, categories: Iterable[str]) -> np.ndarray:
+        """Packed bitmap of the rows belonging to any of ``categories``."""
+
+        unknown = sorted(set(categories) - set(self._positions))
+        if unknown:
+            raise KeyError(f"Unknown categories {unknown}")
+        positions = [self._positions[category] for category in categories]
+        return np.bitwise_or.reduce(self.bitmaps[positions], axis=0)
+
+    def selector(self, mask: np.ndarray) -> faiss.IDSelectorBitmap:
+        """FAISS selector over ``mask``; the caller must keep ``mask`` alive while searching."""
+
+        return faiss.IDSelectorBitmap(self.size, faiss.swig_ptr(mask))
+
+    @staticmethod
+    def contains(mask: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Boolean array telling which ``rows`` are set in ``mask``."""
+
+        rows = np.asarray(rows)
+        return ((mask[rows >> 3] >> (rows & 7)) & 1).astype(bool)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            name: int(np.unpackbits(bitmap).sum()) for name, bitmap in zip(self.names, self.bitmaps)
+        }
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".partial.npy")
+        np.save(tmp_path, self.bitmaps)
+        os.replace(tmp_path, path)
+        config_path_for(path).write_text(json.dumps({"size": self.size, "names": self.names}))
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = False) -> "CategoryBitmaps":
+        meta = json.loads(config_path_for(path).read_text())
+        bitmaps = np.load(path, mmap_mode="r" if mmap else None)
+        return cls(meta["names"], bitmaps, meta["size"])
@@ -2,20 +2,150 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Sequence
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+    from arxiv_rec.models.onnx_encoder import OnnxEncoder
 
 DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# "torch" runs the SentenceTransformer; the ONNX backends need an export (scripts/export_onnx.py).
+ENCODER_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+_worker_model: SentenceTransformer | None = None
+
+
+def _load_model(model_name: str, device: str | None) -> SentenceTransformer:
+    # Imported lazily so ONNX-only processes never load torch.
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device=device)
+
+
+def _init_worker(model_name: str, device: str | None, threads: int) -> None:
+    """Load the model once per worker process and cap its intra-op threads."""
+
+    global _worker_model
+    import torch
+
+    torch.set_num_threads(threads)
+    _worker_model = _load_model(model_name, device)
+
+
+def _worker_dimension() -> int:
+    return int(_worker_model.get_sentence_embedding_dimension())
+
+
+def _encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    embeddings = _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    return embeddings.astype("float32")
 
 
 class EmbeddingService:
-    """Lightweight wrapper around a SentenceTransformer model."""
+    """Lightweight wrapper around a SentenceTransformer model.
+
+    With ``workers > 1`` encoding is spread over a pool of processes that each hold their own
+    copy of the model and use at most ``threads_per_worker`` threads (defaults to an even
+    split of the available cores). Call ``close`` (or use the service as a context manager)
+    to shut the pool down.
+
+    ``backend="onnx"``/``"onnx-int8"`` encodes with ONNX Runtime from an export in
+    ``onnx_dir`` instead (single process, no torch); embeddings stay interchangeable with
+    the torch ones, so the index artifacts do not change.
+    """
 
-    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, device: str | None = None) -> None:
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        device: str | None = None,
+        workers: int = 1,
+        threads_per_worker: int | None = None,
+        backend: str = "torch",
+        onnx_dir: str | Path | None = None,
+    ) -> None:
+        if backend not in ENCODER_BACKENDS:
+            raise ValueError(f"Unknown encoder backend {backend!r}; expected {ENCODER_BACKENDS}")
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name, device=device)
+        self.device = device
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker or max(
+            1, (os.cpu_count() or 1) // self.workers
+        )
+        self._model: SentenceTransformer | None = None
+        self._pool: ProcessPoolExecutor | None = None
+        self._dimension: int | None = None
+        self._encoder: OnnxEncoder | None = None
+        if backend != "torch":
+            from arxiv_rec.models import onnx_encoder
+
+            if self.workers > 1:
+                raise ValueError("ONNX backends run in-process; use workers=1")
+            if onnx_dir is None:
+                raise ValueError(f"backend={backend!r} needs onnx_dir")
+            self._encoder = onnx_encoder.OnnxEncoder(
+                onnx_dir, quantized=backend == "onnx-int8", threads=threads_per_worker
+            )
+            if self._encoder.model_name != model_name:
+                raise ValueError(
+                    f"ONNX export in {onnx_dir} is for {self._encoder.model_name}, "
+                    f"not {model_name}"
+                )
+        elif self.workers == 1:
+            self._model = _load_model(model_name, device)
+
+    def __enter__(self) -> "EmbeddingService":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def model(self) -> SentenceTransformer:
+        if self._model is None:
+            self._model = _load_model(self.model_name, self.device)
+        return self._model
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.device, self.threads_per_worker),
+            )
+        return self._pool
+
+    @property
+    def dimension(self) -> int:
+        if self._encoder is not None:
+            return self._encoder.dimension
+        if self._dimension is None:
+            if self.workers > 1:
+                self._dimension = self.pool.submit(_worker_dimension).result()
+            else:
+                self._dimension = int(self.model.get_sentence_embedding_dimension())
+        return self._dimension
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
     def encode_texts(
         self,
@@ -23,8 +153,14 @@ class EmbeddingService:
         batch_size: int = 64,
         show_progress_bar: bool = True,
     ) -> np.ndarray:
+        texts = texts if isinstance(texts, list) else list(texts)
+        if self._encoder is not None:
+            return self._encoder.encode(texts, batch_size=batch_size)
+        if self.workers > 1:  # even small calls: the main process never loads the model
+            return self._encode_parallel(texts, batch_size)
+
         embeddings = self.model.encode(
-            list(texts),
+            texts,
             batch_size=batch_size,
             show_progress_bar=show_progress_bar,
             convert_to_numpy=True,
@@ -32,5 +168,27 @@ class EmbeddingService:
         )
         return embeddings.astype("float32")
 
+    def _encode_parallel(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Split ``texts`` into one contiguous shard per worker and keep the input order."""
+
+        shard_size = max(batch_size, -(-len(texts) // self.workers))
+        shards = [texts[start : start + shard_size] for start in range(0, len(texts), shard_size)]
+        if not shards:
+            return np.empty((0, self.dimension), dtype="float32")
+        results = self.pool.map(_encode_shard, shards, [batch_size] * len(shards))
+        return np.concatenate(list(results), axis=0)
+
+    def iter_encode(
+        self,
+        texts: Iterable[str],
+        batch_size: int = 64,
+        block_size: int = 8192,
+    ) -> Iterator[np.ndarray]:
+        """Lazily encode ``texts`` and yield one float32 block per ``block_size`` inputs."""
+
+        iterator = iter(texts)
+        while block := list(islice(iterator, block_size)):
+            yield self.encode_texts(block, batch_size=batch_size, show_progress_bar=False)
+
     def encode_query(self, text: str) -> np.ndarray:
         return self.encode_texts([text], batch_size=1, show_progress_bar=False)[0]
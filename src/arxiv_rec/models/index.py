@@ -2,54 +2,271 @@
 
 from __future__ import annotations
 
+import json
+import shutil
+from dataclasses import asdict, dataclass, fields, replace
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Dict, Sequence, Tuple
 
 import faiss
 import numpy as np
 
+from arxiv_rec.models.store import VECTOR_DTYPES
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+# FAISS codec used for the stored vectors of flat / IVF-Flat / HNSW layouts.
+_STORAGE_CODECS = {"float32": "Flat", "float16": "SQfp16", "int8": "SQ8"}
+
+
+@dataclass
+class IndexConfig:
+    """Index layout plus the default runtime knobs, persisted next to the index file."""
+
+    index_type: str = "flat"
+    storage: str = "float32"
+    nlist: int = 1024
+    pq_m: int = 16
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    nprobe: int = 16
+    ef_search: int = 64
+    train_size: int = 100_000
+    shards: int = 1
+
+    def __post_init__(self) -> None:
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(
+                f"Unknown index type {self.index_type!r}; expected one of {INDEX_TYPES}"
+            )
+        if self.storage not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown storage {self.storage!r}; expected one of {VECTOR_DTYPES}")
+        if self.index_type == "ivf_pq" and self.storage != "float32":
+            raise ValueError("ivf_pq stores PQ codes; storage only applies to the other layouts")
+
+    @property
+    def is_ivf(self) -> bool:
+        return self.index_type in {"ivf_flat", "ivf_pq"}
+
+    @property
+    def is_exact(self) -> bool:
+        return self.index_type == "flat" and self.storage == "float32"
+
+    @property
+    def supports_reconstruct(self) -> bool:
+        """Whether stored vectors can be read back cheaply (and close to losslessly)."""
+
+        return self.index_type in {"flat", "hnsw"}
+
+    def factory_string(self) -> str:
+        codec = _STORAGE_CODECS[self.storage]
+        if self.index_type == "ivf_flat":
+            return f"IVF{self.nlist},{codec}"
+        if self.index_type == "ivf_pq":
+            return f"IVF{self.nlist},PQ{self.pq_m}x{self.pq_nbits}"
+        if self.index_type == "hnsw":
+            return f"HNSW{self.hnsw_m},{codec}"
+        return codec
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndexConfig":
+        known = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+def config_path_for(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".json")
+
 
 class VectorIndex:
-    def __init__(self, dimension: int) -> None:
+    def __init__(self, dimension: int, config: IndexConfig | None = None) -> None:
         self.dimension = dimension
-        self.index = faiss.IndexFlatIP(dimension)
+        self.config = config or IndexConfig()
+        self.index = faiss.index_factory(
+            dimension, self.config.factory_string(), faiss.METRIC_INNER_PRODUCT
+        )
+        if self.config.index_type == "hnsw":
+            self.index.hnsw.efConstruction = self.config.ef_construction
+        self._apply_runtime_defaults()
+
+    @classmethod
+    def from_embeddings(
+        cls,
+        embeddings: np.ndarray,
+        config: IndexConfig | None = None,
+        block_size: int = 65_536,
+        seed: int = 0,
+    ) -> "VectorIndex":
+        """Build an index, training on a random sample first when the layout requires it.
+
+        ``embeddings`` may be a memory-mapped array; vectors are added ``block_size`` rows at a
+        time. For IVF layouts ``nlist`` is capped so every list gets enough training points, and
+        IVF-PQ falls back to a flat layout when the sample cannot train its codebooks.
+        """
+
+        instance = cls.trained(embeddings, config, seed)
+        for start in range(0, len(embeddings), block_size):
+            instance.add(embeddings[start : start + block_size])
+        return instance
 
     @classmethod
-    def from_embeddings(cls, embeddings: np.ndarray) -> "VectorIndex":
-        instance = cls(embeddings.shape[1])
-        instance.add(embeddings)
+    def trained(
+        cls, embeddings: np.ndarray, config: IndexConfig | None = None, seed: int = 0
+    ) -> "VectorIndex":
+        """Empty index, trained on a random sample of ``embeddings`` if the layout needs it.
+
+        The layout actually built is ``instance.config``; ``config`` itself is left untouched.
+        """
+
+        config = config or IndexConfig()
+        sample_size = min(config.train_size, len(embeddings))
+        if config.index_type == "ivf_pq" and sample_size < 2**config.pq_nbits:
+            # Each PQ codebook needs 2**pq_nbits training points; below that (tiny corpora,
+            # small time partitions) an exact flat index is both possible and cheap.
+            config = replace(config, index_type="flat")
+        if config.is_ivf:
+            config = replace(config, nlist=max(1, min(config.nlist, sample_size // 39)))
+        instance = cls(embeddings.shape[1], config)
+        if not instance.is_trained:
+            rng = np.random.default_rng(seed)
+            rows = np.sort(rng.choice(len(embeddings), size=sample_size, replace=False))
+            instance.train(embeddings[rows])
         return instance
 
     @property
     def size(self) -> int:
         return self.index.ntotal
 
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.index.is_trained)
+
+    def train(self, sample: np.ndarray) -> None:
+        self.index.train(self._normalize(sample))
+
     def add(self, embeddings: np.ndarray) -> None:
         vectors = self._normalize(embeddings)
         self.index.add(vectors)
 
-    def search(self, query_embeddings: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    def search(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 5,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+        selector: faiss.IDSelector | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the index; ``nprobe``/``ef_search`` override the defaults for this call.
+
+        ``selector`` restricts the hits to the rows it accepts, inside the index scan.
+        """
+
         queries = self._normalize(query_embeddings)
-        scores, indices = self.index.search(queries, k)
+        params = self._search_params(nprobe, ef_search, selector)
+        if params is None:
+            scores, indices = self.index.search(queries, k)
+        else:
+            scores, indices = self.index.search(queries, k, params=params)
         return scores, indices
 
     def save(self, path: str | Path) -> Path:
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
+        if path.is_dir():  # previously saved as a sharded index
+            shutil.rmtree(path)
         faiss.write_index(self.index, str(path))
+        config_path_for(path).write_text(json.dumps(self.config.to_dict(), indent=2))
         return path
 
     @classmethod
-    def load(cls, path: str | Path) -> "VectorIndex":
+    def load(cls, path: str | Path, mmap: bool = False) -> "VectorIndex":
+        """Load a saved index; ``mmap`` maps it read-only so processes share the page cache.
+
+        ``IO_FLAG_MMAP`` only maps IVF inverted lists: flat and HNSW codes would still be
+        copied into private memory, so those layouts are read with ``IO_FLAG_MMAP_IFC``.
+        """
+
         path = Path(path)
         if not path.exists():
             raise FileNotFoundError(f"FAISS index not found at {path}")
         instance = cls.__new__(cls)
-        index = faiss.read_index(str(path))
+        config_path = config_path_for(path)
+        if config_path.exists():
+            instance.config = IndexConfig.from_dict(json.loads(config_path.read_text()))
+        else:
+            instance.config = IndexConfig()
+        flags = 0
+        if mmap:
+            mapping = faiss.IO_FLAG_MMAP if instance.config.is_ivf else faiss.IO_FLAG_MMAP_IFC
+            flags = mapping | faiss.IO_FLAG_READ_ONLY
+        index = faiss.read_index(str(path), flags)
         instance.index = index
         instance.dimension = index.d
+        instance._apply_runtime_defaults()
+        return instance
+
+    def clone(self) -> "VectorIndex":
+        """Independent copy, e.g. of a trained but empty index used as a shard template."""
+
+        instance = self.__class__.__new__(self.__class__)
+        instance.index = faiss.clone_index(self.index)
+        instance.dimension = self.dimension
+        instance.config = replace(self.config)
+        instance._apply_runtime_defaults()
         return instance
 
+    def reconstruct(self, row: int) -> np.ndarray:
+        """Return the stored vector for ``row`` (see ``IndexConfig.supports_reconstruct``)."""
+
+        return self.index.reconstruct(int(row))
+
+    def reconstruct_batch(self, rows: np.ndarray) -> np.ndarray:
+        return self.index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+
+    def memory_bytes(self) -> int:
+        """Size of the serialized index, a close proxy for its resident footprint.
+
+        Bytes are counted as FAISS streams them out, so no serialized copy is held.
+        """
+
+        written = 0
+
+        def count(chunk: bytes) -> int:
+            nonlocal written
+            written += len(chunk)
+            return len(chunk)
+
+        faiss.write_index(self.index, faiss.PyCallbackIOWriter(count))
+        return written
+
+    def _apply_runtime_defaults(self) -> None:
+        if self.config.is_ivf:
+            faiss.extract_index_ivf(self.index).nprobe = self.config.nprobe
+        elif self.config.index_type == "hnsw":
+            self.index.hnsw.efSearch = self.config.ef_search
+
+    def _search_params(
+        self,
+        nprobe: int | None,
+        ef_search: int | None,
+        selector: faiss.IDSelector | None = None,
+    ) -> faiss.SearchParameters | None:
+        if self.config.is_ivf and (nprobe is not None or selector is not None):
+            return faiss.SearchParametersIVF(
+                nprobe=nprobe or faiss.extract_index_ivf(self.index).nprobe, sel=selector
+            )
+        if self.config.index_type == "hnsw" and (ef_search is not None or selector is not None):
+            return faiss.SearchParametersHNSW(
+                efSearch=ef_search or self.index.hnsw.efSearch, sel=selector
+            )
+        if selector is not None:
+            return faiss.SearchParameters(sel=selector)
+        return None
+
     @staticmethod
     def _normalize(array: np.ndarray) -> np.ndarray:
         vectors = np.asarray(array).astype("float32")
@@ -57,3 +274,46 @@ class VectorIndex:
             vectors = np.expand_dims(vectors, axis=0)
         faiss.normalize_L2(vectors)
         return vectors
+
+
+def exact_search(
+    embeddings: np.ndarray, queries: np.ndarray, k: int, block_size: int = 65_536
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Brute-force inner-product top-k over (possibly memory-mapped) embeddings, block by block."""
+
+    queries = VectorIndex._normalize(queries)
+    best_scores = np.full((len(queries), k), -np.inf, dtype="float32")
+    best_ids = np.full((len(queries), k), -1, dtype="int64")
+    for start in range(0, len(embeddings), block_size):
+        block = VectorIndex._normalize(embeddings[start : start + block_size])
+        scores, ids = faiss.knn(
+            queries, block, min(k, len(block)), metric=faiss.METRIC_INNER_PRODUCT
+        )
+        best_scores, best_ids = merge_topk([best_scores, scores], [best_ids, ids + start], k)
+    return best_scores, best_ids
+
+
+def merge_topk(
+    scores: Sequence[np.ndarray], ids: Sequence[np.ndarray], k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge per-part ``(n, k_i)`` hit lists into the overall top-``k`` (ids ``-1`` sort last)."""
+
+    merged_scores = np.concatenate(scores, axis=1)
+    merged_ids = np.concatenate(ids, axis=1)
+    merged_scores = np.where(merged_ids >= 0, merged_scores, -np.inf)
+    order = np.argsort(-merged_scores, axis=1, kind="stable")[:, :k]
+    return (
+        np.take_along_axis(merged_scores, order, axis=1),
+        np.take_along_axis(merged_ids, order, axis=1),
+    )
+
+
+def recall_at_k(approx_ids: np.ndarray, exact_ids: np.ndarray) -> float:
+    """Fraction of the exact top-k ids that the approximate search also returned."""
+
+    hits = sum(
+        len(np.intersect1d(approx[approx >= 0], exact[exact >= 0]))
+        for approx, exact in zip(approx_ids, exact_ids)
+    )
+    total = int((exact_ids >= 0).sum())
+    return hits / total if total else 1.0
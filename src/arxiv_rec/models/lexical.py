@@ -0,0 +1,232 @@
+"""Sparse BM25 inverted index for exact-term search, fused with vector hits by RRF."""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+
+CONFIG_FILENAME = "lexical.json"
+DEFAULT_FEATURES = 2**22
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+# Terms in more than this share of papers carry almost no BM25 weight but the longest
+# posting lists; dropping them bounds query latency and index size.
+DEFAULT_MAX_DF = 0.5
+# Reciprocal-rank fusion constant from Cormack et al. (2009).
+RRF_CONSTANT = 60
+
+
+def make_vectorizer(n_features: int, binary: bool = False) -> HashingVectorizer:
+    """Stateless tokenizer + term hasher shared by the build and the queries (no vocabulary)."""
+
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words="english",
+        alternate_sign=False,
+        norm=None,
+        binary=binary,
+        dtype=np.float32,
+    )
+
+
+class LexicalIndex:
+    """BM25 weights as a term-by-document CSR matrix (one posting list per hashed term).
+
+    Weights are precomputed at build time, so scoring a query is the sum of the posting lists
+    of its terms, i.e. one sparse product that only touches papers containing a query term.
+    The three CSR arrays are plain ``.npy`` files memory-mapped when served.
+    """
+
+    def __init__(self, postings: sp.csr_matrix, config: dict) -> None:
+        self.postings = postings
+        self.config = config
+        self.vectorizer = make_vectorizer(config["n_features"], binary=True)
+
+    @property
+    def size(self) -> int:
+        return int(self.postings.shape[1])
+
+    @property
+    def nbytes(self) -> int:
+        postings = self.postings
+        return int(postings.data.nbytes + postings.indices.nbytes + postings.indptr.nbytes)
+
+    def search(
+        self,
+        queries: Sequence[str],
+        k: int,
+        accept: Callable[[np.ndarray], np.ndarray] | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-``k`` ``(scores, ids)`` per query, padded with ``-1`` like a FAISS search.
+
+        ``accept`` maps candidate rows to a keep mask and is applied before ranking.
+        """
+
+        scores = np.zeros((len(queries), k), dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        matches = (self.vectorizer.transform(queries) @ self.postings).tocsr()
+        for row in range(len(queries)):
+            start, end = matches.indptr[row], matches.indptr[row + 1]
+            candidates, weights = matches.indices[start:end], matches.data[start:end]
+            if accept is not None and len(candidates):
+                keep = accept(candidates)
+                candidates, weights = candidates[keep], weights[keep]
+            if len(candidates) > k:
+                top = np.argpartition(-weights, k - 1)[:k]
+                candidates, weights = candidates[top], weights[top]
+            order = np.lexsort((candidates, -weights))
+            ids[row, : len(order)] = candidates[order]
+            scores[row, : len(order)] = weights[order]
+        return scores, ids
+
+    @classmethod
+    def build(
+        cls,
+        chunks: Iterable[Sequence[str]],
+        directory: str | Path,
+        n_features: int = DEFAULT_FEATURES,
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+        max_df: float = DEFAULT_MAX_DF,
+    ) -> "LexicalIndex":
+        """Index the texts of ``chunks`` (in row order) and save the matrix to ``directory``.
+
+        BM25 needs corpus-wide document frequencies and the mean length, so the first pass
+        hashes term counts per chunk, accumulates those and spills each chunk's counts to
+        disk. The frequencies fix every posting list's length up front, and the second pass
+        weights one chunk at a time and scatters it into memory-mapped postings, so memory
+        stays bounded by a chunk rather than the corpus.
+        """
+
+        directory = Path(directory)
+        tmp_dir = directory.with_name(directory.name + ".partial")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        vectorizer = make_vectorizer(n_features)
+        spilled: List[Path] = []
+        frequencies = np.zeros(n_features, dtype=np.int64)
+        total_length = 0.0
+        rows = 0
+        for chunk in chunks:
+            matrix = vectorizer.transform(list(chunk)).tocsr()
+            matrix.sum_duplicates()
+            frequencies += np.bincount(matrix.indices, minlength=n_features)
+            total_length += float(matrix.data.sum())
+            rows += matrix.shape[0]
+            spilled.append(tmp_dir / f"counts-{len(spilled):06d}.npz")
+            sp.save_npz(spilled[-1], matrix, compressed=False)
+        mean_length = total_length / rows if rows and total_length else 1.0
+        idf = np.log1p((rows - frequencies + 0.5) / (frequencies + 0.5)).astype(np.float32)
+        idf[frequencies > max_df * rows] = 0.0
+
+        # Terms with a zero idf get empty posting lists; every other one lists all its papers.
+        lengths_per_term = np.where(idf > 0, frequencies, 0)
+        nnz = int(lengths_per_term.sum())
+        index_dtype = np.int32 if max(nnz, rows) < 2**31 else np.int64
+        indptr = np.zeros(n_features + 1, dtype=index_dtype)
+        np.cumsum(lengths_per_term, out=indptr[1:])
+        indices = _open_array(tmp_dir / "indices.npy", nnz, index_dtype)
+        data = _open_array(tmp_dir / "data.npy", nnz, np.float32)
+        cursor = indptr[:-1].astype(np.int64)
+        offset = 0
+        for path in spilled:
+            matrix = sp.load_npz(path).tocsr()
+            path.unlink()
+            lengths = np.asarray(matrix.sum(axis=1), dtype=np.float32).ravel()
+            norms = k1 * (1 - b + b * lengths / mean_length)
+            documents = np.repeat(
+                np.arange(offset, offset + matrix.shape[0]), np.diff(matrix.indptr)
+            )
+            offset += matrix.shape[0]
+            terms, tf = matrix.indices, matrix.data
+            keep = idf[terms] > 0
+            documents, terms, tf = documents[keep], terms[keep], tf[keep]
+            tf_norm = np.repeat(norms, np.diff(matrix.indptr))[keep]
+            weights = idf[terms] * tf * (k1 + 1) / (tf + tf_norm)
+            # A stable sort by term keeps papers in row order inside each posting list.
+            order = np.argsort(terms, kind="stable")
+            terms = terms[order]
+            first = np.flatnonzero(np.r_[True, terms[1:] != terms[:-1]])
+            counts = np.diff(np.r_[first, len(terms)])
+            rank = np.arange(len(terms)) - np.repeat(first, counts)
+            positions = cursor[terms] + rank
+            indices[positions] = documents[order]
+            data[positions] = weights[order]
+            cursor[terms[first]] += counts
+        for array in (indices, data):
+            if isinstance(array, np.memmap):
+                array.flush()
+        del indices, data
+
+        config = {
+            "rows": rows,
+            "n_features": n_features,
+            "k1": k1,
+            "b": b,
+            "max_df": max_df,
+            "mean_length": mean_length,
+        }
+        np.save(tmp_dir / "indptr.npy", indptr)
+        (tmp_dir / CONFIG_FILENAME).write_text(json.dumps(config, indent=2))
+        cls.remove(directory)
+        tmp_dir.replace(directory)
+        return cls.load(directory, mmap=True)
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = False) -> "LexicalIndex":
+        directory = Path(directory)
+        mode = "r" if mmap else None
+        config = json.loads((directory / CONFIG_FILENAME).read_text())
+        arrays = [
+            np.load(directory / f"{name}.npy", mmap_mode=mode)
+            for name in ("data", "indices", "indptr")
+        ]
+        postings = sp.csr_matrix(
+            tuple(arrays), shape=(config["n_features"], config["rows"]), copy=False
+        )
+        return cls(postings, config)
+
+    @staticmethod
+    def exists(directory: str | Path) -> bool:
+        return (Path(directory) / CONFIG_FILENAME).exists()
+
+    @staticmethod
+    def remove(directory: str | Path) -> None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _open_array(path: Path, length: int, dtype) -> np.ndarray:
+    """Writable ``.npy`` of ``length`` items, memory-mapped unless empty (which cannot be)."""
+
+    if length == 0:
+        array = np.zeros(0, dtype=dtype)
+        np.save(path, array)
+        return array
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(length,))
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[np.ndarray], k: int, constant: int = RRF_CONSTANT
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge ranked id lists (``-1`` = padding) into the top-``k`` ``(ids, scores)``.
+
+    Each list adds ``1 / (constant + rank)`` to the ids it contains, so a paper ranked well
+    by either leg surfaces without calibrating BM25 scores against cosine similarities.
+    """
+
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(np.asarray(ranking).tolist(), start=1):
+            if item >= 0:
+                fused[item] = fused.get(item, 0.0) + 1.0 / (constant + rank)
+    best = sorted(fused.items(), key=lambda pair: (-pair[1], pair[0]))[:k]
+    ids = np.array([item for item, _ in best], dtype=np.int64)
+    scores = np.array([score for _, score in best], dtype=np.float32)
+    return ids, scores
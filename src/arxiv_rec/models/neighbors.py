@@ -0,0 +1,102 @@
+"""Precomputed item-to-item neighbour graph served by ``/recommend``."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Tuple
+
+import faiss
+import numpy as np
+
+from arxiv_rec.models.index import VectorIndex
+
+
+def scores_path_for(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.stem + ".scores.npy")
+
+
+class NeighborGraph:
+    """Top-``k`` neighbours of every item as an ``(n, k)`` int32 id matrix plus float16 scores.
+
+    Rows are ordered by decreasing score, never contain the item itself and are padded with
+    ``-1`` when the index returned fewer hits. Both arrays are memory-mapped when served.
+    """
+
+    def __init__(self, ids: np.ndarray, scores: np.ndarray) -> None:
+        if ids.shape != scores.shape:
+            raise ValueError(f"Neighbour ids {ids.shape} and scores {scores.shape} differ")
+        self.ids = ids
+        self.scores = scores
+
+    @property
+    def k(self) -> int:
+        return int(self.ids.shape[1])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.ids.nbytes + self.scores.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def lookup(self, row: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(ids, scores)`` of the first ``k`` neighbours of ``row``."""
+
+        if k > self.k:
+            raise ValueError(f"Only {self.k} neighbours were precomputed, asked for {k}")
+        return (
+            self.ids[row, :k].astype(np.int64),
+            self.scores[row, :k].astype(np.float32),
+        )
+
+    @classmethod
+    def build(
+        cls,
+        index: VectorIndex,
+        embeddings: np.ndarray,
+        k: int,
+        path: str | Path,
+        block_size: int = 16_384,
+        threads: int | None = None,
+    ) -> "NeighborGraph":
+        """Search every (possibly memory-mapped) embedding against ``index`` and save the graph.
+
+        Queries go to FAISS ``block_size`` rows at a time so its OpenMP threads (``threads``,
+        all cores by default) stay busy; each block asks for ``k + 1`` hits to drop the item.
+        """
+
+        if threads:
+            faiss.omp_set_num_threads(threads)
+        path = Path(path)
+        score_path = scores_path_for(path)
+        tmp_ids = path.with_name(path.name + ".partial.npy")
+        tmp_scores = score_path.with_name(score_path.name + ".partial.npy")
+        shape = (len(embeddings), k)
+        ids = np.lib.format.open_memmap(tmp_ids, mode="w+", dtype="int32", shape=shape)
+        scores = np.lib.format.open_memmap(tmp_scores, mode="w+", dtype="float16", shape=shape)
+        for start in range(0, len(embeddings), block_size):
+            block = np.asarray(embeddings[start : start + block_size])
+            block_scores, block_ids = index.search(block, k=k + 1)
+            rows = np.arange(start, start + len(block))[:, None]
+            # Stable sort moves the item itself (or, if absent, nothing) past the k-th column.
+            order = np.argsort(block_ids == rows, axis=1, kind="stable")[:, :k]
+            ids[start : start + len(block)] = np.take_along_axis(block_ids, order, axis=1)
+            scores[start : start + len(block)] = np.take_along_axis(block_scores, order, axis=1)
+        ids.flush()
+        scores.flush()
+        del ids, scores
+        os.replace(tmp_ids, path)
+        os.replace(tmp_scores, score_path)
+        return cls.load(path, mmap=True)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = False) -> "NeighborGraph":
+        mode = "r" if mmap else None
+        return cls(np.load(path, mmap_mode=mode), np.load(scores_path_for(path), mmap_mode=mode))
+
+    @staticmethod
+    def remove(path: str | Path) -> None:
+        for stale in (Path(path), scores_path_for(path)):
+            stale.unlink(missing_ok=True)
@@ -0,0 +1,178 @@
+"""Torch-free query encoding with an ONNX export of the sentence-transformers model."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+ENCODER_CONFIG = "encoder.json"
+MODEL_FILENAME = "model.onnx"
+QUANTIZED_FILENAME = "model.int8.onnx"
+TOKENIZER_FILENAME = "tokenizer.json"
+OUTPUT_NAME = "token_embeddings"
+
+
+def export_onnx(
+    model_name: str, output_dir: str | Path, quantize: bool = True, opset: int = 17
+) -> Path:
+    """Export the transformer of ``model_name`` plus its tokenizer and pooling settings.
+
+    Needs torch, sentence-transformers and onnxscript (torch's default exporter since 2.9);
+    build time only. Large weights may land in ``model.onnx.data`` next to the model. With
+    ``quantize`` an int8 dynamically quantized copy is written next to the float32 model.
+    """
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling = next(module for module in model if type(module).__name__ == "Pooling")
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, auto_model: torch.nn.Module) -> None:
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(
+            self,
+            input_ids: torch.Tensor,
+            attention_mask: torch.Tensor,
+            token_type_ids: torch.Tensor | None = None,
+        ) -> torch.Tensor:
+            inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if token_type_ids is not None:
+                inputs["token_type_ids"] = token_type_ids
+            return self.auto_model(**inputs).last_hidden_state
+
+    sample = transformer.tokenizer(["export sample"], return_tensors="pt")
+    input_names = [
+        name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample
+    ]
+    axes = {name: {0: "batch", 1: "sequence"} for name in input_names + [OUTPUT_NAME]}
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer.auto_model.eval()),
+            tuple(sample[name] for name in input_names),
+            str(output_dir / MODEL_FILENAME),
+            input_names=input_names,
+            output_names=[OUTPUT_NAME],
+            dynamic_axes=axes,
+            opset_version=opset,
+        )
+    transformer.tokenizer.backend_tokenizer.save(str(output_dir / TOKENIZER_FILENAME))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            str(output_dir / MODEL_FILENAME),
+            str(output_dir / QUANTIZED_FILENAME),
+            weight_type=QuantType.QInt8,
+        )
+
+    config = {
+        "model_name": model_name,
+        "inputs": input_names,
+        "pooling": pooling_mode(pooling.get_config_dict()),
+        "max_seq_length": int(model.max_seq_length),
+        "dimension": int(model.get_sentence_embedding_dimension()),
+    }
+    (output_dir / ENCODER_CONFIG).write_text(json.dumps(config, indent=2))
+    return output_dir
+
+
+def pooling_mode(settings: Dict[str, Any]) -> str:
+    """``"cls"`` or ``"mean"`` from a sentence-transformers ``Pooling`` config.
+
+    Releases before 6.0 store one boolean per mode; later ones a single ``pooling_mode``.
+    """
+
+    mode = settings.get("pooling_mode")
+    if mode is None:
+        if settings.get("pooling_mode_cls_token"):
+            mode = "cls"
+        elif settings.get("pooling_mode_mean_tokens"):
+            mode = "mean"
+    if mode not in ("cls", "mean"):
+        raise ValueError(f"Only CLS and mean pooling can be exported, not {settings}")
+    return mode
+
+
+class OnnxEncoder:
+    """Tokenize with HF ``tokenizers`` and run the exported model under ONNX Runtime.
+
+    Pooling matches the sentence-transformers pipeline (mean over real tokens or CLS) and
+    embeddings are L2-normalized like ``EmbeddingService.encode_texts``.
+    """
+
+    def __init__(
+        self, model_dir: str | Path, quantized: bool = False, threads: int | None = None
+    ) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        config_path = model_dir / ENCODER_CONFIG
+        if not config_path.exists():
+            raise FileNotFoundError(
+                f"No ONNX encoder at {model_dir}; run scripts/export_onnx.py first."
+            )
+        self.config: Dict[str, object] = json.loads(config_path.read_text())
+        self.model_name = str(self.config["model_name"])
+        self.inputs: List[str] = list(self.config["inputs"])
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILENAME))
+        self.tokenizer.enable_truncation(int(self.config["max_seq_length"]))
+        if self.tokenizer.padding is None:
+            self.tokenizer.enable_padding()
+        else:  # pad to the longest text of each batch, not to a fixed length
+            self.tokenizer.enable_padding(
+                pad_id=self.tokenizer.padding["pad_id"],
+                pad_token=self.tokenizer.padding["pad_token"],
+            )
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        model_path = model_dir / (QUANTIZED_FILENAME if quantized else MODEL_FILENAME)
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+
+    @property
+    def dimension(self) -> int:
+        return int(self.config["dimension"])
+
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        blocks = [
+            self._encode_batch(texts[start : start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]
+        if not blocks:
+            return np.empty((0, self.dimension), dtype="float32")
+        return np.concatenate(blocks, axis=0)
+
+    def _encode_batch(self, texts: Sequence[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"attention_mask": mask}
+        if "input_ids" in self.inputs:
+            feeds["input_ids"] = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        if "token_type_ids" in self.inputs:
+            feeds["token_type_ids"] = np.array(
+                [encoding.type_ids for encoding in encodings], dtype=np.int64
+            )
+        tokens = self.session.run([OUTPUT_NAME], {name: feeds[name] for name in self.inputs})[0]
+        if self.config["pooling"] == "cls":
+            pooled = tokens[:, 0]
+        else:
+            weights = mask[:, :, None].astype(tokens.dtype)
+            pooled = (tokens * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype("float32")
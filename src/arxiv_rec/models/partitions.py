@@ -0,0 +1,231 @@
+"""Time-partitioned index shards so date-range searches only scan the periods they need."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import faiss
+import numpy as np
+import pyarrow as pa
+
+from arxiv_rec.models.categories import CategoryBitmaps
+from arxiv_rec.models.index import IndexConfig, VectorIndex, merge_topk
+
+PARTITION_GRANULARITIES = ("year", "month")
+MANIFEST_FILENAME = "partitions.json"
+# Day number stored for papers without a usable submission date; never matches a range.
+DATE_UNKNOWN = int(np.iinfo(np.int32).min)
+_PERIOD_UNITS = {"year": "datetime64[Y]", "month": "datetime64[M]"}
+
+
+def dates_from_column(column: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    """int32 days since 1970-01-01 for an Arrow ``date32`` column (nulls -> ``DATE_UNKNOWN``)."""
+
+    days = column.cast(pa.int32()).fill_null(DATE_UNKNOWN)
+    return np.asarray(days.to_numpy(), dtype=np.int32)
+
+
+def parse_date_bound(value: str, end: bool = False) -> int:
+    """Day number of ``YYYY``, ``YYYY-MM`` or ``YYYY-MM-DD``; ``end`` picks the last day."""
+
+    try:
+        moment = np.datetime64(value.strip())
+    except ValueError as exc:
+        raise ValueError(f"Invalid date {value!r}; use YYYY, YYYY-MM or YYYY-MM-DD") from exc
+    if np.datetime_data(moment.dtype)[0] not in {"Y", "M", "D"}:
+        raise ValueError(f"Invalid date {value!r}; use YYYY, YYYY-MM or YYYY-MM-DD")
+    day = (moment + 1).astype("datetime64[D]") - 1 if end else moment.astype("datetime64[D]")
+    return int(day.astype(np.int64))
+
+
+def period_labels(dates: np.ndarray, granularity: str) -> np.ndarray:
+    """Partition label (``2021`` or ``2021-03``) for every day number; ``unknown`` if undated."""
+
+    if granularity not in _PERIOD_UNITS:
+        raise ValueError(
+            f"Unknown granularity {granularity!r}; expected one of {PARTITION_GRANULARITIES}"
+        )
+    days = np.asarray(dates, dtype=np.int64).astype("datetime64[D]")
+    labels = days.astype(_PERIOD_UNITS[granularity]).astype(str).astype(object)
+    labels[np.asarray(dates) == DATE_UNKNOWN] = "unknown"
+    return labels
+
+
+@dataclass
+class Partition:
+    name: str
+    start: int
+    end: int
+    rows: np.ndarray
+    index: VectorIndex
+
+
+class PartitionedIndex:
+    """One ``VectorIndex`` per submission period over global metadata rows.
+
+    Each partition keeps the sorted global rows it covers (``rows.npy``) and the first and last
+    submission day it contains, so a ``since``/``until`` search only touches overlapping
+    partitions. Rows of partially covered partitions are filtered inside FAISS.
+    """
+
+    def __init__(self, directory: str | Path, partitions: List[Partition], dates: np.ndarray):
+        self.directory = Path(directory)
+        self.partitions = sorted(partitions, key=lambda part: part.start)
+        self.dates = dates
+
+    def __len__(self) -> int:
+        return len(self.partitions)
+
+    @classmethod
+    def build(
+        cls,
+        directory: str | Path,
+        embeddings: np.ndarray,
+        dates: np.ndarray,
+        config: IndexConfig,
+        granularity: str = "year",
+    ) -> Tuple["PartitionedIndex", int]:
+        """Build (or reuse unchanged) partitions; returns the index and how many were reused.
+
+        A partition is reused when its rows, their vectors and the index config hash to the
+        fingerprint saved by the previous build, so appending a new period leaves old ones alone.
+        """
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        previous = cls._read_manifest(directory)
+        labels = period_labels(dates, granularity)
+        names, inverse = np.unique(labels, return_inverse=True)
+
+        entries: List[Dict[str, object]] = []
+        reused = 0
+        for position, name in enumerate(names):
+            if name == "unknown":
+                continue
+            rows = np.flatnonzero(inverse == position)
+            fingerprint = _fingerprint(embeddings, rows, config)
+            part_dir = directory / name
+            if (
+                previous.get(name, {}).get("fingerprint") == fingerprint
+                and (part_dir / "index.faiss").exists()
+            ):
+                reused += 1
+            else:
+                shutil.rmtree(part_dir, ignore_errors=True)
+                index = VectorIndex.from_embeddings(np.asarray(embeddings[rows]), replace(config))
+                index.save(part_dir / "index.faiss")
+                np.save(part_dir / "rows.npy", rows)
+            part_dates = dates[rows]
+            entries.append(
+                {
+                    "name": name,
+                    "start": int(part_dates.min()),
+                    "end": int(part_dates.max()),
+                    "size": len(rows),
+                    "fingerprint": fingerprint,
+                }
+            )
+
+        for stale in set(previous) - {entry["name"] for entry in entries}:
+            shutil.rmtree(directory / stale, ignore_errors=True)
+        manifest = {"granularity": granularity, "partitions": entries}
+        tmp_path = directory / (MANIFEST_FILENAME + ".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, directory / MANIFEST_FILENAME)
+        return cls.load(directory, dates, mmap=True), reused
+
+    @classmethod
+    def load(
+        cls, directory: str | Path, dates: np.ndarray, mmap: bool = False
+    ) -> "PartitionedIndex":
+        directory = Path(directory)
+        partitions = []
+        for name, entry in cls._read_manifest(directory).items():
+            part_dir = directory / name
+            partitions.append(
+                Partition(
+                    name,
+                    int(entry["start"]),
+                    int(entry["end"]),
+                    np.load(part_dir / "rows.npy", mmap_mode="r" if mmap else None),
+                    VectorIndex.load(part_dir / "index.faiss", mmap=mmap),
+                )
+            )
+        return cls(directory, partitions, dates)
+
+    def overlapping(self, since: int | None = None, until: int | None = None) -> List[Partition]:
+        return [
+            part
+            for part in self.partitions
+            if (since is None or part.end >= since) and (until is None or part.start <= until)
+        ]
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        since: int | None = None,
+        until: int | None = None,
+        mask: np.ndarray | None = None,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-``k`` global rows submitted in ``[since, until]`` (and set in ``mask``, if given).
+
+        Overlapping partitions are searched one after another and merged exactly; FAISS
+        parallelizes each search internally. ``nprobe``/``ef_search`` apply to every partition.
+        """
+
+        queries = np.atleast_2d(queries)
+        all_scores = [np.full((len(queries), k), -np.inf, dtype="float32")]
+        all_ids = [np.full((len(queries), k), -1, dtype="int64")]
+        for part in self.overlapping(since, until):
+            covered = (since is None or since <= part.start) and (
+                until is None or part.end <= until
+            )
+            selector = bitmap = None
+            if not covered or mask is not None:
+                keep = np.ones(len(part.rows), dtype=bool)
+                if not covered:
+                    part_dates = self.dates[part.rows]
+                    if since is not None:
+                        keep &= part_dates >= since
+                    if until is not None:
+                        keep &= part_dates <= until
+                if mask is not None:
+                    keep &= CategoryBitmaps.contains(mask, part.rows)
+                if not keep.any():
+                    continue
+                bitmap = np.packbits(keep, bitorder="little")
+                selector = faiss.IDSelectorBitmap(len(keep), faiss.swig_ptr(bitmap))
+            scores, ids = part.index.search(
+                queries, k=k, nprobe=nprobe, ef_search=ef_search, selector=selector
+            )
+            all_scores.append(scores)
+            all_ids.append(np.where(ids >= 0, np.asarray(part.rows)[np.maximum(ids, 0)], -1))
+        return merge_topk(all_scores, all_ids, k)
+
+    @staticmethod
+    def _read_manifest(directory: Path) -> Dict[str, Dict[str, object]]:
+        path = directory / MANIFEST_FILENAME
+        if not path.exists():
+            return {}
+        manifest = json.loads(path.read_text())
+        return {entry["name"]: entry for entry in manifest["partitions"]}
+
+
+def _fingerprint(
+    embeddings: np.ndarray, rows: np.ndarray, config: IndexConfig, block_size: int = 65_536
+) -> str:
+    digest = hashlib.sha1(json.dumps(config.to_dict(), sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(rows, dtype=np.int64).tobytes())
+    for start in range(0, len(rows), block_size):
+        block = np.asarray(embeddings[rows[start : start + block_size]], dtype="float32")
+        digest.update(block.tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,185 @@
+"""Hash-sharded FAISS index searched with a parallel fan-out and an exact top-k merge."""
+
+from __future__ import annotations
+
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Tuple
+
+import faiss
+import numpy as np
+
+from arxiv_rec.models.index import IndexConfig, VectorIndex, config_path_for, merge_topk
+
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def shard_of(rows: np.ndarray, shards: int) -> np.ndarray:
+    """Shard number of every global row (Fibonacci hashing, so ranges spread evenly)."""
+
+    mixed = np.asarray(rows, dtype=np.uint64) * _HASH_MULTIPLIER
+    return ((mixed >> np.uint64(32)) % np.uint64(shards)).astype(np.int64)
+
+
+class ShardedIndex:
+    """``VectorIndex``-compatible index split into ``config.shards`` independent shards.
+
+    Rows are assigned to shards by hashing their global row number; each shard keeps the
+    sorted global rows it holds. ``search`` queries all shards on a thread pool (FAISS
+    releases the GIL while searching) and merges their top-k lists exactly. On disk the
+    index is a directory with one ``shard-NNN.faiss`` + ``shard-NNN.rows.npy`` pair per shard.
+    """
+
+    def __init__(self, shards: List[VectorIndex], rows: List[np.ndarray], config: IndexConfig):
+        self.shards = shards
+        self.rows = [np.ascontiguousarray(shard_rows, dtype=np.int64) for shard_rows in rows]
+        self.config = config
+        self.dimension = shards[0].dimension
+        self._pool: ThreadPoolExecutor | None = None
+        # Per-shard local -> global id maps, kept alive for ``IDSelectorTranslated``.
+        self._id_maps = [self._id_map(shard_rows) for shard_rows in self.rows]
+
+    @classmethod
+    def from_embeddings(
+        cls,
+        embeddings: np.ndarray,
+        config: IndexConfig,
+        block_size: int = 65_536,
+        seed: int = 0,
+    ) -> "ShardedIndex":
+        """Train one template on a sample of all vectors, clone it per shard and fill them."""
+
+        template = VectorIndex.trained(embeddings, replace(config, shards=1), seed)
+        config = replace(template.config, shards=config.shards)
+        instance = cls(
+            [template.clone() for _ in range(config.shards)],
+            [np.empty(0, dtype=np.int64) for _ in range(config.shards)],
+            config,
+        )
+        for start in range(0, len(embeddings), block_size):
+            instance.add(embeddings[start : start + block_size])
+        return instance
+
+    @property
+    def size(self) -> int:
+        return sum(shard.size for shard in self.shards)
+
+    @property
+    def is_trained(self) -> bool:
+        return all(shard.is_trained for shard in self.shards)
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=len(self.shards))
+        return self._pool
+
+    def add(self, embeddings: np.ndarray) -> None:
+        """Append vectors; they get the next global row numbers, as with ``VectorIndex``."""
+
+        embeddings = np.asarray(embeddings)
+        rows = np.arange(self.size, self.size + len(embeddings), dtype=np.int64)
+        assignment = shard_of(rows, len(self.shards))
+        for number, shard in enumerate(self.shards):
+            selected = assignment == number
+            if selected.any():
+                shard.add(embeddings[selected])
+                self.rows[number] = np.concatenate([self.rows[number], rows[selected]])
+                self._id_maps[number] = self._id_map(self.rows[number])
+
+    def search(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 5,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+        selector: faiss.IDSelector | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Fan the search out to every shard in parallel and merge the global top-``k``."""
+
+        queries = VectorIndex._normalize(query_embeddings)
+
+        def search_shard(number: int) -> Tuple[np.ndarray, np.ndarray]:
+            shard_selector = None
+            if selector is not None:
+                shard_selector = faiss.IDSelectorTranslated(self._id_maps[number], selector)
+            scores, ids = self.shards[number].search(
+                queries, k=k, nprobe=nprobe, ef_search=ef_search, selector=shard_selector
+            )
+            return scores, np.where(ids >= 0, self.rows[number][np.maximum(ids, 0)], -1)
+
+        results = list(self.pool.map(search_shard, range(len(self.shards))))
+        return merge_topk([scores for scores, _ in results], [ids for _, ids in results], k)
+
+    def reconstruct(self, row: int) -> np.ndarray:
+        number = int(shard_of(np.array([row]), len(self.shards))[0])
+        local = int(np.searchsorted(self.rows[number], row))
+        return self.shards[number].reconstruct(local)
+
+    def reconstruct_batch(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        vectors = np.empty((len(rows), self.dimension), dtype="float32")
+        assignment = shard_of(rows, len(self.shards))
+        for number in np.unique(assignment):
+            selected = assignment == number
+            local = np.searchsorted(self.rows[number], rows[selected])
+            vectors[selected] = self.shards[number].reconstruct_batch(local)
+        return vectors
+
+    def memory_bytes(self) -> int:
+        return sum(shard.memory_bytes() for shard in self.shards)
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        if path.is_file():
+            path.unlink()
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        for number, shard in enumerate(self.shards):
+            shard.save(path / f"shard-{number:03d}.faiss")
+            np.save(path / f"shard-{number:03d}.rows.npy", self.rows[number])
+        config_path_for(path).write_text(json.dumps(self.config.to_dict(), indent=2))
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = False) -> "ShardedIndex":
+        path = Path(path)
+        config = IndexConfig.from_dict(json.loads(config_path_for(path).read_text()))
+        shards, rows = [], []
+        for number in range(config.shards):
+            shards.append(VectorIndex.load(path / f"shard-{number:03d}.faiss", mmap=mmap))
+            rows.append(np.load(path / f"shard-{number:03d}.rows.npy"))
+        return cls(shards, rows, config)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    @staticmethod
+    def _id_map(rows: np.ndarray) -> faiss.Int64Vector:
+        id_map = faiss.Int64Vector()
+        faiss.copy_array_to_vector(rows, id_map)
+        return id_map
+
+
+def build_index(
+    embeddings: np.ndarray, config: IndexConfig | None = None
+) -> VectorIndex | ShardedIndex:
+    """Build a plain or sharded index depending on ``config.shards``."""
+
+    config = config or IndexConfig()
+    if config.shards > 1:
+        return ShardedIndex.from_embeddings(embeddings, config)
+    return VectorIndex.from_embeddings(embeddings, config)
+
+
+def load_index(path: str | Path, mmap: bool = False) -> VectorIndex | ShardedIndex:
+    """Load whatever ``build_index(...).save(path)`` wrote."""
+
+    if Path(path).is_dir():
+        return ShardedIndex.load(path, mmap=mmap)
+    return VectorIndex.load(path, mmap=mmap)
@@ -0,0 +1,200 @@
+"""On-disk embedding storage shared by the build script and the API."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+import numpy as np
+
+STATE_FILENAME = "state.json"
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+
+class EmbeddingShardWriter:
+    """Resumable, out-of-core writer for per-chunk embedding shards.
+
+    Every snapshot chunk gets a preallocated, memory-mapped ``.npy`` shard that is filled
+    batch by batch. After each batch the shard is flushed and ``state.json`` records how far
+    the chunk got, so an interrupted build picks up at the last completed batch. The state is
+    tied to a ``fingerprint`` of the build inputs; a mismatch discards the stale shards.
+    """
+
+    def __init__(self, work_dir: str | Path, fingerprint: Dict[str, Any]) -> None:
+        self.work_dir = Path(work_dir)
+        self.fingerprint = fingerprint
+        self._state: Dict[str, Any] = {"fingerprint": fingerprint, "complete": [], "partial": {}}
+
+        state_path = self.work_dir / STATE_FILENAME
+        if state_path.exists():
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+            if state.get("fingerprint") == fingerprint:
+                self._state = state
+        if self._state["complete"] or self._state["partial"]:
+            return
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._write_state()
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self._state["complete"] or self._state["partial"])
+
+    def shard_path(self, chunk_no: int, suffix: str = ".npy") -> Path:
+        return self.work_dir / f"shard-{chunk_no:06d}{suffix}"
+
+    def is_complete(self, chunk_no: int) -> bool:
+        return chunk_no in self._state["complete"]
+
+    def rows_done(self, chunk_no: int) -> int:
+        return int(self._state["partial"].get(str(chunk_no), 0))
+
+    def open_shard(self, chunk_no: int, rows: int, dimension: int) -> np.memmap:
+        """Return the writable shard for ``chunk_no``, reusing a partially written one."""
+
+        path = self.shard_path(chunk_no)
+        if path.exists() and self.rows_done(chunk_no):
+            shard = np.load(path, mmap_mode="r+")
+            if shard.shape == (rows, dimension):
+                return shard
+        self._state["partial"].pop(str(chunk_no), None)
+        return np.lib.format.open_memmap(path, mode="w+", dtype="float32", shape=(rows, dimension))
+
+    def checkpoint(self, chunk_no: int, shard: np.memmap, rows_done: int) -> None:
+        shard.flush()
+        self._state["partial"][str(chunk_no)] = int(rows_done)
+        self._write_state()
+
+    def finish_shard(self, chunk_no: int, shard: np.memmap) -> None:
+        shard.flush()
+        self._state["partial"].pop(str(chunk_no), None)
+        self._state["complete"].append(chunk_no)
+        self._write_state()
+
+    def iter_shards(self) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield ``(chunk_no, embeddings)`` for completed shards in chunk order."""
+
+        for chunk_no in sorted(self._state["complete"]):
+            yield chunk_no, np.load(self.shard_path(chunk_no), mmap_mode="r")
+
+    def consolidate(self, output_path: str | Path) -> np.ndarray:
+        """Concatenate the completed shards into one ``.npy`` without loading them at once."""
+
+        shards = [shard for _, shard in self.iter_shards()]
+        if not shards:
+            raise RuntimeError(f"No completed embedding shards in {self.work_dir}")
+        rows = sum(len(shard) for shard in shards)
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + ".partial.npy")
+        stored = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype="float32", shape=(rows, shards[0].shape[1])
+        )
+        offset = 0
+        for shard in shards:
+            stored[offset : offset + len(shard)] = shard
+            offset += len(shard)
+        stored.flush()
+        del stored
+        os.replace(tmp_path, output_path)
+        return np.load(output_path, mmap_mode="r")
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _write_state(self) -> None:
+        tmp_path = self.work_dir / (STATE_FILENAME + ".tmp")
+        tmp_path.write_text(json.dumps(self._state), encoding="utf-8")
+        os.replace(tmp_path, self.work_dir / STATE_FILENAME)
+
+
+class VectorStore:
+    """Row-addressable embeddings kept as float32, float16 or scalar-quantized int8.
+
+    int8 codes use a symmetric per-dimension scale (``max(|x|) / 127``) saved next to the
+    codes as ``<name>.scale.npy``; rows are dequantized to float32 on access.
+    """
+
+    def __init__(self, codes: np.ndarray, scale: np.ndarray | None = None) -> None:
+        if codes.dtype == np.int8 and scale is None:
+            raise ValueError("int8 vectors need their scale factors")
+        self.codes = codes
+        self.scale = scale
+
+    @staticmethod
+    def scale_path_for(path: str | Path) -> Path:
+        path = Path(path)
+        return path.with_name(path.stem + ".scale.npy")
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.codes.shape
+
+    @property
+    def dtype(self) -> str:
+        return self.codes.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + (self.scale.nbytes if self.scale is not None else 0))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, rows: Any) -> np.ndarray:
+        block = np.asarray(self.codes[rows], dtype="float32")
+        if self.scale is not None:
+            block *= self.scale
+        return block
+
+    @classmethod
+    def write(
+        cls,
+        path: str | Path,
+        embeddings: np.ndarray,
+        dtype: str = "float32",
+        block_size: int = 65_536,
+    ) -> "VectorStore":
+        """Store (possibly memory-mapped) float32 ``embeddings`` as ``dtype``, block by block."""
+
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype {dtype!r}; expected one of {VECTOR_DTYPES}")
+        path = Path(path)
+        scale = None
+        if dtype == "int8":
+            max_abs = np.zeros(embeddings.shape[1], dtype="float32")
+            for start in range(0, len(embeddings), block_size):
+                block = np.abs(np.asarray(embeddings[start : start + block_size]))
+                np.maximum(max_abs, block.max(axis=0), out=max_abs)
+            scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype("float32")
+
+        tmp_path = path.with_name(path.name + ".partial.npy")
+        codes = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=embeddings.shape)
+        for start in range(0, len(embeddings), block_size):
+            block = np.asarray(embeddings[start : start + block_size], dtype="float32")
+            if scale is not None:
+                block = np.clip(np.rint(block / scale), -127, 127)
+            codes[start : start + len(block)] = block.astype(dtype)
+        codes.flush()
+        del codes
+
+        # The scale lands first, so int8 codes are never visible without their factors.
+        scale_path = cls.scale_path_for(path)
+        if scale is not None:
+            tmp_scale_path = scale_path.with_name(scale_path.name + ".partial.npy")
+            np.save(tmp_scale_path, scale)
+            os.replace(tmp_scale_path, scale_path)
+        os.replace(tmp_path, path)
+        if scale is None and scale_path.exists():
+            scale_path.unlink()
+        return cls.load(path, mmap=True)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = False) -> "VectorStore":
+        path = Path(path)
+        codes = np.load(path, mmap_mode="r" if mmap else None)
+        scale_path = cls.scale_path_for(path)
+        scale = np.load(scale_path) if codes.dtype == np.int8 and scale_path.exists() else None
+        return cls(codes, scale)
@@ -0,0 +1,52 @@
+import pyarrow as pa
+import pytest
+from starlette.testclient import TestClient
+
+from arxiv_rec.api import server
+from arxiv_rec.data.clean import prepare_corpus
+from arxiv_rec.data.ingest import load_metadata
+from arxiv_rec.data.metadata import METADATA_COLUMNS, MetadataWriter
+from arxiv_rec.data.synthetic import HashingEmbedder, write_snapshot
+from arxiv_rec.models.artifacts import ArtifactPaths
+from arxiv_rec.models.index import IndexConfig, VectorIndex
+from arxiv_rec.models.store import VectorStore
+
+
+@pytest.fixture
+def make_artifacts(tmp_path):
+    """Build a small artifacts directory from the synthetic corpus and the hashing encoder."""
+
+    def make(rows=120, index_type="flat", storage="float32", name="artifacts"):
+        tidy = prepare_corpus(load_metadata(write_snapshot(tmp_path / f"{name}.jsonl", rows)))
+        directory = tmp_path / name
+        directory.mkdir()
+        paths = ArtifactPaths(directory)
+        columns = [column for column in METADATA_COLUMNS if column in tidy.columns]
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        with MetadataWriter(paths.metadata, paths.metadata_arrow) as writer:
+            writer.write(pa.Table.from_pandas(tidy[columns], schema=schema, preserve_index=False))
+        embeddings = HashingEmbedder().encode_texts(tidy["text"].tolist())
+        store = VectorStore.write(paths.embeddings, embeddings, storage)
+        config = IndexConfig(index_type=index_type, storage=storage, nlist=8, hnsw_m=8)
+        VectorIndex.from_embeddings(store, config).save(paths.index)
+        return directory, tidy, embeddings
+
+    return make
+
+
+@pytest.fixture
+def served(make_artifacts, monkeypatch):
+    """A state loaded from ``make_artifacts`` and installed as the live one."""
+
+    directory, _, _ = make_artifacts()
+    state = server.RecommenderState(directory, embedder=HashingEmbedder())
+    state.activate()
+    monkeypatch.setattr(server, "_state", state)
+    return state
+
+
+@pytest.fixture
+def client(served):
+    """TestClient over the served state (no lifespan, so no warm-up or reload watcher)."""
+
+    return TestClient(server.app)
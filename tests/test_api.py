@@ -0,0 +1,176 @@
+import asyncio
+
+import httpx
+import pyarrow as pa
+import pytest
+from fastapi import HTTPException
+from starlette.testclient import TestClient
+
+from arxiv_rec.api import server
+from arxiv_rec.api.batching import MicroBatcher
+from arxiv_rec.api.server import MAX_BATCH_ITEMS, RESULT_FIELDS, parse_fields
+from arxiv_rec.data.synthetic import HashingEmbedder
+from arxiv_rec.models.artifacts import ArtifactManifest
+
+
+def test_parse_fields_keeps_id_and_canonical_order():
+    assert parse_fields(None) == RESULT_FIELDS
+    assert parse_fields(" abstract, title ,,") == ["id", "title", "abstract"]
+    assert parse_fields("id") == ["id"]
+    with pytest.raises(HTTPException) as error:
+        parse_fields("title,authors")
+    assert error.value.status_code == 422 and "authors" in error.value.detail
+
+
+def test_fields_select_the_returned_columns(client, served):
+    item_id = served.metadata.column("id")[0].as_py()
+    response = client.get("/recommend", params={"item_id": item_id, "k": 3, "fields": "title"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert all(set(result) == {"id", "title", "score"} for result in results)
+
+    response = client.get("/search", params={"q": "quantum lattice", "k": 2})
+    assert all(set(result) == {*RESULT_FIELDS, "score"} for result in response.json()["results"])
+    assert client.get("/search", params={"q": "quantum", "fields": "doi"}).status_code == 422
+
+
+def test_format_results_turns_nulls_into_empty_strings(served):
+    served.metadata = pa.table({"id": ["a", "b"], "title": [None, "Second"]})
+    results = served.format_results([0, 1, -1], [0.5, 0.25, 0.0], ["id", "title", "abstract"])
+    assert results == [
+        {"id": "a", "title": "", "abstract": "", "score": 0.5},
+        {"id": "b", "title": "Second", "abstract": "", "score": 0.25},
+    ]
+
+
+def test_search_batch_returns_one_entry_per_query(client):
+    queries = ["quantum lattice", "neural network", "quantum lattice"]
+    response = client.post("/search/batch", json={"queries": queries, "k": 3, "fields": "id"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [entry["query"] for entry in results] == queries
+    assert all(len(entry["results"]) == 3 for entry in results)
+    assert all(set(hit) == {"id", "score"} for entry in results for hit in entry["results"])
+    assert results[0] == results[2]
+    single = client.get("/search", params={"q": queries[1], "k": 3, "fields": "id"}).json()
+    assert results[1]["results"] == single["results"]
+
+
+def test_recommend_batch_reports_unknown_ids_per_item(client, served):
+    known = served.metadata.column("id").to_pylist()[:2]
+    item_ids = [known[0], "no-such-paper", known[1]]
+    response = client.post("/recommend/batch", json={"item_ids": item_ids, "k": 2})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [entry["item_id"] for entry in results] == item_ids
+    assert results[1] == {"item_id": "no-such-paper", "error": "Item id no-such-paper not found"}
+    for entry, item_id in zip(results[::2], known):
+        assert len(entry["results"]) == 2
+        assert item_id not in {hit["id"] for hit in entry["results"]}
+
+
+def test_batch_endpoints_cap_the_number_of_items(client):
+    too_many = MAX_BATCH_ITEMS + 1
+    response = client.post("/search/batch", json={"queries": ["quantum"] * too_many})
+    assert response.status_code == 422
+    response = client.post("/recommend/batch", json={"item_ids": ["x"] * too_many})
+    assert response.status_code == 422
+    response = client.post("/recommend/batch", json={"item_ids": ["x"] * MAX_BATCH_ITEMS})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == MAX_BATCH_ITEMS
+
+
+def test_concurrent_requests_share_one_batch(served, monkeypatch):
+    batcher = MicroBatcher(
+        server.per_state(server.RecommenderState.search_batch, "search"),
+        max_batch_size=8,
+        max_wait_ms=200,
+    )
+    monkeypatch.setattr(server, "search_batcher", batcher)
+    queries = [f"quantum lattice {word}" for word in ("one", "two", "three", "four")]
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(client.get("/search", params={"q": query, "k": 2}) for query in queries)
+            )
+
+    responses = asyncio.run(run())
+    assert all(response.status_code == 200 for response in responses)
+    assert (batcher.batches, batcher.items) == (1, len(queries))
+    alone = [served.search(query, k=2) for query in queries]
+    assert [response.json()["results"] for response in responses] == alone
+
+
+@pytest.fixture
+def cold(make_artifacts, monkeypatch, tmp_path):
+    """Nothing served yet; ARTIFACTS_DIR starts out empty and the encoder is the hashing one."""
+
+    monkeypatch.setattr(server, "_state", None)
+    monkeypatch.setattr(server, "ARTIFACTS_DIR", tmp_path / "empty")
+    monkeypatch.setattr(server, "EmbeddingService", lambda **kwargs: HashingEmbedder())
+    for key, value in {"warming": False, "load_seconds": None, "error": None}.items():
+        monkeypatch.setitem(server.startup, key, value)
+    for key, value in dict(server.reloads).items():  # restored after the test
+        monkeypatch.setitem(server.reloads, key, value)
+    directory, _, _ = make_artifacts()
+    return directory
+
+
+def test_readyz_reports_loading_failed_and_recovered(cold, monkeypatch):
+    client = TestClient(server.app)
+    assert client.get("/healthz").json() == {"status": "ok"}
+
+    monkeypatch.setitem(server.startup, "warming", True)
+    response = client.get("/readyz")
+    assert (response.status_code, response.json()) == (503, {"status": "loading"})
+
+    server.warm_up()  # ARTIFACTS_DIR has nothing to load
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert "Artifacts missing" in response.json()["error"]
+    assert client.get("/healthz").status_code == 200
+
+    server.reload_state(cold)
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready" and response.json()["load_seconds"] is not None
+
+
+def test_readyz_is_not_ready_while_lazy(cold, monkeypatch):
+    monkeypatch.setattr(server, "WARMUP", False)
+    monkeypatch.setattr(server, "ARTIFACTS_DIR", cold)
+    client = TestClient(server.app)
+    response = client.get("/readyz")
+    assert (response.status_code, response.json()) == (503, {"status": "lazy"})
+
+    assert client.get("/search", params={"q": "quantum lattice"}).status_code == 200
+    assert client.get("/readyz").json()["status"] == "ready"
+
+
+def test_watcher_loads_the_first_version(cold, monkeypatch):
+    monkeypatch.setitem(server.startup, "error", "RuntimeError: cold start failed")
+    monkeypatch.setattr(server, "ARTIFACTS_DIR", cold)
+
+    async def watch():
+        task = asyncio.create_task(server.watch_versions(0.01))
+        for _ in range(500):
+            if server._state is not None:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(watch())
+    assert server._state is not None and server._state.directory == cold
+    assert TestClient(server.app).get("/readyz").status_code == 200
+
+
+def test_first_load_is_validated_like_a_reload(cold, monkeypatch):
+    ArtifactManifest.create(cold, rows=1, dimension=384, model_name="hashing-384").save(cold)
+    monkeypatch.setattr(server, "ARTIFACTS_DIR", cold)
+    with pytest.raises(RuntimeError, match="Manifest expects"):
+        server.get_state()
+    assert server._state is None
@@ -0,0 +1,38 @@
+from arxiv_rec.api.cache import LRUCache, normalize_query
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("arxiv_rec.api.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl=5)
+    cache.put("q", "value")
+    now[0] += 4
+    assert cache.get("q") == "value"
+    now[0] += 2
+    assert cache.get("q") is None
+
+
+def test_bind_drops_entries_on_new_version():
+    cache = LRUCache()
+    assert cache.bind("v1")
+    cache.put(("q", 5), [1, 2])
+    assert not cache.bind("v1")
+    assert len(cache) == 1
+    assert cache.bind("v2")
+    assert len(cache) == 0
+
+
+def test_normalize_query_collapses_whitespace():
+    assert normalize_query("  graph\tneural   nets ") == "graph neural nets"
@@ -0,0 +1,54 @@
+import pytest
+
+from arxiv_rec.models.artifacts import (
+    ArtifactManifest,
+    current_directory,
+    new_version_directory,
+    prune_versions,
+    publish,
+)
+
+
+def make_version(root, payload):
+    directory = new_version_directory(root)
+    (directory / "index.faiss").write_bytes(payload)
+    ArtifactManifest.create(directory, rows=3, dimension=4, model_name="m").save(directory)
+    return directory
+
+
+def test_publish_switches_current_and_prune_keeps_it(tmp_path):
+    assert current_directory(tmp_path) == tmp_path  # flat layout
+    first = make_version(tmp_path, b"one")
+    second = make_version(tmp_path, b"two")
+    assert first != second
+
+    publish(tmp_path, first.name)
+    assert current_directory(tmp_path) == first
+    third = make_version(tmp_path, b"three")
+    assert prune_versions(tmp_path, keep=1) == [second.name]
+    assert first.exists() and third.exists()
+
+
+def test_manifest_detects_changed_files(tmp_path):
+    directory = make_version(tmp_path, b"abcd")
+    manifest = ArtifactManifest.load(directory)
+    assert manifest.files["index.faiss"]["bytes"] == 4
+    manifest.verify(directory, checksums=True)
+
+    (directory / "index.faiss").write_bytes(b"abce")
+    manifest.verify(directory)  # same size: only the checksum notices
+    with pytest.raises(ValueError, match="checksum"):
+        manifest.verify(directory, checksums=True)
+    (directory / "index.faiss").unlink()
+    with pytest.raises(ValueError, match="missing"):
+        manifest.verify(directory)
+
+
+def test_manifest_lists_nested_files_named_like_it(tmp_path):
+    directory = new_version_directory(tmp_path)
+    (directory / "partitions").mkdir()
+    (directory / "partitions" / "manifest.json").write_text("{}")
+    (directory / "index.faiss.tmp").write_bytes(b"x")
+    ArtifactManifest.create(directory, rows=3, dimension=4, model_name="m").save(directory)
+    manifest = ArtifactManifest.create(directory, rows=3, dimension=4, model_name="m")
+    assert list(manifest.files) == ["partitions/manifest.json"]
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from arxiv_rec.api.batching import MicroBatcher
+
+
+def test_concurrent_submits_share_a_batch():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert asyncio.run(run()) == [i * 2 for i in range(10)]
+    assert [len(batch) for batch in calls] == [8, 2]
+    assert batcher.mean_batch_size == 5
+
+
+def test_batches_leave_at_the_deadline_or_once_full():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=1000)
+
+    async def full():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+
+    started = time.perf_counter()
+    assert asyncio.run(full()) == [0, 1, 2, 3]
+    assert time.perf_counter() - started < 0.5  # full batches do not sit out the window
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+
+    async def staggered():
+        first = asyncio.ensure_future(batcher.submit("a"))
+        await asyncio.sleep(0.01)  # arrives inside the first item's window
+        second = asyncio.ensure_future(batcher.submit("b"))
+        return await asyncio.gather(first, second)
+
+    calls.clear()
+    started = time.perf_counter()
+    assert asyncio.run(staggered()) == ["a", "b"]
+    assert calls == [["a", "b"]]
+    assert 0.04 <= time.perf_counter() - started < 0.5
+
+
+def test_errors_reach_every_caller():
+    def process(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(process, max_wait_ms=5)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    with pytest.raises(ValueError):
+        asyncio.run(batcher.submit(1))
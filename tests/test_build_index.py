@@ -0,0 +1,83 @@
+import importlib.util
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from arxiv_rec.data.synthetic import write_snapshot
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "build_index.py"
+spec = importlib.util.spec_from_file_location("build_index", SCRIPT)
+build_index = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(build_index)
+
+
+class CountingEmbedder:
+    """Deterministic stand-in for ``EmbeddingService`` that can die mid-build."""
+
+    workers = 1
+    dimension = 8
+
+    def __init__(self, model_name="stub", fail_after=None):
+        self.model_name = model_name
+        self.fail_after = fail_after
+        self.encoded = []
+
+    def iter_encode(self, texts, batch_size=64, block_size=8192):
+        texts = list(texts)
+        for start in range(0, len(texts), block_size):
+            block = texts[start : start + block_size]
+            if self.fail_after is not None and len(self.encoded) + len(block) > self.fail_after:
+                raise KeyboardInterrupt("killed")
+            self.encoded.extend(block)
+            seeds = [zlib.crc32(text.encode()) for text in block]
+            yield np.array(
+                [np.random.default_rng(seed).normal(size=self.dimension) for seed in seeds],
+                dtype="float32",
+            )
+
+
+def run(monkeypatch, data_path, artifacts_dir, embedder, *extra):
+    argv = [
+        "build_index.py",
+        f"--data-path={data_path}",
+        f"--artifacts-dir={artifacts_dir}",
+        "--chunk-size=10",
+        "--checkpoint-every=4",
+        "--neighbors-k=0",
+        "--eval-queries=0",
+        "--no-lexical",
+        "--no-cache",
+        *extra,
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+    args = build_index.parse_args()
+    output_dir = artifacts_dir / "out"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    build_index.build(args, embedder, output_dir)
+    return np.load(output_dir / "embeddings.npy")
+
+
+def test_killed_build_resumes_remaining_rows(monkeypatch, tmp_path):
+    data_path = write_snapshot(tmp_path / "snapshot.jsonl", 25)
+    expected = run(monkeypatch, data_path, tmp_path / "clean", CountingEmbedder())
+
+    artifacts = tmp_path / "artifacts"
+    killed = CountingEmbedder(fail_after=14)  # chunk 0 and one checkpoint of chunk 1
+    with pytest.raises(KeyboardInterrupt):
+        run(monkeypatch, data_path, artifacts, killed)
+    assert len(killed.encoded) == 14
+
+    resumed = CountingEmbedder()
+    embeddings = run(monkeypatch, data_path, artifacts, resumed)
+    assert len(resumed.encoded) == 25 - 14
+    np.testing.assert_array_equal(embeddings, expected)
+    assert not (artifacts / ".build").exists()
+
+    with pytest.raises(KeyboardInterrupt):
+        run(monkeypatch, data_path, artifacts, CountingEmbedder(fail_after=14))
+    other_model = CountingEmbedder(model_name="other")
+    run(monkeypatch, data_path, artifacts, other_model)
+    assert len(other_model.encoded) == 25  # a changed fingerprint starts clean
@@ -0,0 +1,52 @@
+import numpy as np
+
+from arxiv_rec.models.cache import EmbeddingCache, content_hash
+
+
+def stage_all(cache, ids, texts, vectors):
+    cache.stage(ids, content_hash(texts), vectors)
+
+
+def test_cache_hits_unchanged_papers_and_drops_withdrawn_ids(tmp_path):
+    ids, texts = ["a", "b", "c"], ["alpha", "beta", "gamma"]
+    vectors = np.arange(12, dtype="float32").reshape(3, 4)
+    cache = EmbeddingCache(tmp_path, "model-1")
+    hit, cached = cache.lookup(ids, content_hash(texts))
+    assert not hit.any() and cached is None
+    stage_all(cache, ids, texts, vectors)
+    cache.commit()
+
+    cache = EmbeddingCache(tmp_path, "model-1")
+    # "b" changed its text, "d" is new, "c" was withdrawn.
+    lookup_ids, lookup_texts = ["b", "a", "d"], ["beta v2", "alpha", "delta"]
+    hit, cached = cache.lookup(lookup_ids, content_hash(lookup_texts))
+    assert hit.tolist() == [False, True, False]
+    np.testing.assert_array_equal(cached, vectors[[0]])
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    fresh = np.full((3, 4), -1, dtype="float32")
+    fresh[1] = cached[0]
+    stage_all(cache, lookup_ids, lookup_texts, fresh)
+    cache.commit()
+    cache = EmbeddingCache(tmp_path, "model-1")
+    assert cache.size == 3
+    assert cache.lookup(["c"], content_hash(["gamma"]))[0].tolist() == [False]
+    hit, cached = cache.lookup(["b"], content_hash(["beta v2"]))
+    assert hit.all() and (cached == -1).all()
+
+    assert EmbeddingCache(tmp_path, "model-2").size == 0  # other models never hit
+
+
+def test_partial_commit_keeps_rows_it_did_not_see(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model")
+    stage_all(cache, ["a", "b"], ["alpha", "beta"], np.eye(2, dtype="float32"))
+    cache.commit()
+
+    cache = EmbeddingCache(tmp_path, "model")
+    stage_all(cache, ["b"], ["beta v2"], np.full((1, 2), 5, dtype="float32"))
+    cache.commit(drop_missing=False)
+
+    cache = EmbeddingCache(tmp_path, "model")
+    hit, cached = cache.lookup(["a", "b"], content_hash(["alpha", "beta v2"]))
+    assert hit.all()
+    np.testing.assert_array_equal(cached, [[1, 0], [5, 5]])
@@ -0,0 +1,26 @@
+import numpy as np
+import pyarrow as pa
+
+from arxiv_rec.models.categories import CategoryBitmaps
+from arxiv_rec.models.index import VectorIndex
+
+
+def test_bitmaps_filter_flat_search_exactly(tmp_path):
+    labels = ["cs.LG", "hep-th", "cs.LG  stat.ML", None, ""] * 40
+    bitmaps = CategoryBitmaps.from_column(pa.chunked_array([labels[:90], labels[90:]]))
+    assert bitmaps.names == ["cs.LG", "hep-th", "stat.ML"]
+    assert bitmaps.counts() == {"cs.LG": 80, "hep-th": 40, "stat.ML": 40}
+
+    bitmaps = CategoryBitmaps.load(bitmaps.save(tmp_path / "categories.npy"), mmap=True)
+    mask = bitmaps.mask(["hep-th", "stat.ML"])
+    allowed = np.array(
+        [label is not None and bool({"hep-th", "stat.ML"} & set(label.split())) for label in labels]
+    )
+    np.testing.assert_array_equal(bitmaps.contains(mask, np.arange(len(labels))), allowed)
+
+    embeddings = np.random.default_rng(0).normal(size=(len(labels), 8)).astype("float32")
+    index = VectorIndex.from_embeddings(embeddings)
+    _, filtered = index.search(embeddings[:3], k=10, selector=bitmaps.selector(mask))
+    _, everything = index.search(embeddings[:3], k=len(labels))
+    expected = [row[allowed[row]][:10] for row in everything]
+    np.testing.assert_array_equal(filtered, expected)
@@ -0,0 +1,98 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from arxiv_rec.data.clean import (
+    _WHITESPACE,
+    TEXT_COLUMNS,
+    _normalize,
+    prepare_corpus,
+    submission_dates,
+)
+
+
+def _reference_prepare_corpus(df: pd.DataFrame) -> pd.DataFrame:
+    tidy = df.copy()
+    for column in TEXT_COLUMNS:
+        if column in tidy.columns:
+            tidy[column] = tidy[column].apply(_normalize)
+    tidy["text"] = (tidy["title"] + ". " + tidy["abstract"]).str.strip(" .")
+    return tidy[tidy["text"] != ""].reset_index(drop=True)
+
+
+def _awkward_frame() -> pd.DataFrame:
+    spaces = [chr(code) for code in range(sys.maxunicode + 1) if chr(code).isspace()]
+    titles = [f"{space}Deep{space * 2}nets{space}" for space in spaces]
+    titles += [
+        "",
+        None,
+        np.nan,
+        "None",
+        "...",
+        " . Title . ",
+        42,
+        1.5,
+        "\u00dcn\u00efc\u00f6d\u00e9\u200bword",
+    ]
+    abstracts = ["body" if i % 3 else "\t line\none\r\n" for i in range(len(titles))]
+    abstracts[len(spaces) + 4] = ""
+    abstracts[len(spaces)] = None
+    return pd.DataFrame(
+        {
+            "id": [f" 0704.{i:04d} " for i in range(len(titles))],
+            "title": pd.Series(titles, dtype=object),
+            "abstract": pd.Series(abstracts, dtype=object),
+            "categories": ["cs.LG  stat.ML"] * len(titles),
+            "doi": [None] * len(titles),
+        }
+    )
+
+
+def test_whitespace_class_matches_python():
+    expected = "".join(chr(code) for code in range(sys.maxunicode + 1) if chr(code).isspace())
+    assert _WHITESPACE == expected
+
+
+@pytest.mark.parametrize("chunk_size", [None, 7])
+def test_prepare_corpus_matches_reference(chunk_size):
+    df = _awkward_frame()
+    chunks = (
+        [df]
+        if chunk_size is None
+        else [df.iloc[start : start + chunk_size] for start in range(0, len(df), chunk_size)]
+    )
+    for chunk in chunks:
+        expected = _reference_prepare_corpus(chunk)
+        actual = prepare_corpus(chunk)
+        for column in ("id", "title", "abstract", "categories", "text"):
+            assert actual[column].tolist() == expected[column].tolist()
+        assert actual["doi"].isna().all()
+
+
+def test_prepare_corpus_leaves_input_untouched():
+    df = _awkward_frame()
+    before = df.copy()
+    prepare_corpus(df)
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_submission_dates_fall_back_to_updated():
+    df = pd.DataFrame(
+        {
+            "created": ["2015-01-01", "Mon, 2 Apr 2007 19:18:42 GMT", None, "garbage"],
+            "updated": ["2016-01-01", None, "2020-05-06", None],
+        }
+    )
+    dates = submission_dates(df)
+    assert dates.dt.strftime("%Y-%m-%d").tolist()[:3] == ["2015-01-01", "2007-04-02", "2020-05-06"]
+    assert pd.isna(dates.iloc[3])
+
+
+def test_submission_dates_try_known_formats_before_mixed():
+    created = pd.Series(
+        ["Tue, 10 Apr 2007 23:30:00 GMT", "2007-04-10", "10 April 2007", "2007-04-10T23:30:00Z"]
+    )
+    dates = submission_dates(pd.DataFrame({"created": created}))
+    assert dates.dt.strftime("%Y-%m-%d").tolist() == ["2007-04-10"] * 4  # last two: mixed
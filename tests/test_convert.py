@@ -0,0 +1,63 @@
+import json
+
+import pyarrow.dataset as ds
+
+from arxiv_rec.data.convert import convert_to_parquet, line_aligned_ranges
+from arxiv_rec.data.ingest import iter_metadata, load_metadata
+from arxiv_rec.data.synthetic import write_snapshot
+
+
+def test_line_aligned_ranges_cover_the_file(tmp_path):
+    path = write_snapshot(tmp_path / "snapshot.jsonl", 40)
+    ranges = line_aligned_ranges(path, 2000)
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    data = path.read_bytes()
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1 : end] == b"\n"
+
+
+def test_partitioned_parquet_matches_json_and_prunes_by_year(tmp_path):
+    path = write_snapshot(tmp_path / "snapshot.jsonl", 300)
+    output = convert_to_parquet(
+        path, tmp_path / "snapshot.parquet", partition_by_year=True, workers=2, range_bytes=20_000
+    )
+    assert any(child.name.startswith("year=") for child in output.iterdir())
+
+    expected = load_metadata(path).sort_values("id", ignore_index=True)
+    converted = load_metadata(output).sort_values("id", ignore_index=True)
+    assert list(converted.columns) == list(expected.columns)
+    assert (
+        converted.astype(object)
+        .where(converted.notna(), None)
+        .equals(expected.astype(object).where(expected.notna(), None))
+    )
+
+    # Many small per-year files still come back as chunk_size-row chunks.
+    assert [len(chunk) for chunk in iter_metadata(output, chunk_size=128)] == [128, 128, 44]
+    assert [len(chunk) for chunk in iter_metadata(output, chunk_size=128, limit=130)] == [128, 2]
+
+    recent = load_metadata(output, columns=["id", "created"], predicate=ds.field("year") >= 2020)
+    assert list(recent.columns) == ["id", "created"]
+    assert len(recent) == (expected["created"] >= "2020").sum() > 0
+
+
+def test_year_partitions_parse_dates_like_the_cleaning_step(tmp_path):
+    records = [
+        {"id": "rfc", "created": "Mon, 2 Apr 2007 19:18:42 GMT", "updated": ""},
+        {"id": "empty", "created": "", "updated": "2019-05-06"},
+        {"id": "iso", "created": "2021-01-02", "updated": "2022-03-04"},
+        {"id": "none", "created": "", "updated": None},
+    ]
+    path = tmp_path / "snapshot.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    output = convert_to_parquet(
+        path,
+        tmp_path / "snapshot.parquet",
+        columns=["id", "created", "updated"],
+        partition_by_year=True,
+        workers=1,
+    )
+    years = load_metadata(output, columns=["id", "year"]).set_index("id")["year"]
+    assert years[["rfc", "empty", "iso"]].tolist() == [2007, 2019, 2021]
+    assert years[["none"]].isna().all()
@@ -0,0 +1,81 @@
+import hashlib
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from arxiv_rec.data.download import download
+
+PAYLOAD = bytes(range(256)) * 400  # 100 KiB
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves ``PAYLOAD`` with Range support; ``server.drop_after`` cuts bodies short."""
+
+    def do_GET(self):
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        start, end = 0, len(PAYLOAD) - 1
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+        body = PAYLOAD[start : end + 1]
+        self.send_response(206 if match else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        if match:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        self.end_headers()
+        with self.server.lock:
+            self.server.ranges.append(self.headers.get("Range"))
+            limit = self.server.drop_after
+        self.wfile.write(body if limit is None or len(body) <= 1 else body[:limit])
+        with self.server.lock:
+            self.server.served += len(body) if limit is None else min(len(body), limit)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    httpd.lock, httpd.ranges, httpd.served, httpd.drop_after = threading.Lock(), [], 0, None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/snapshot.zip"
+
+
+def test_segmented_download_verifies_checksum(server, tmp_path):
+    target = tmp_path / "snapshot.zip"
+    sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+    download(url(server), target, segments=4, min_segment_size=1024, expected_sha256=sha256)
+
+    assert target.read_bytes() == PAYLOAD
+    assert len(server.ranges) == 5  # probe + one request per segment
+    assert not (tmp_path / "snapshot.zip.partial.json").exists()
+
+    with pytest.raises(ValueError, match="sha256"):
+        download(url(server), tmp_path / "bad.zip", expected_sha256="0" * 64)
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_interrupted_download_resumes_remaining_ranges(server, tmp_path):
+    target = tmp_path / "snapshot.zip"
+    server.drop_after = 10_000
+    with pytest.raises(requests.RequestException):
+        download(url(server), target, segments=4, min_segment_size=1024, retries=0, chunk_size=1000)
+    assert (tmp_path / "snapshot.zip.partial.json").exists()
+    assert not target.exists()
+
+    server.drop_after, server.served = None, 0
+    download(url(server), target, segments=4, min_segment_size=1024)
+    assert target.read_bytes() == PAYLOAD
+    assert server.served == 1 + len(PAYLOAD) - 4 * 10_000
@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+
+from arxiv_rec.models.embed import EmbeddingService
+
+# Stand-ins importable by the spawned workers: a "model" whose vectors record the text
+# length and the process that encoded it.
+STUB_TORCH = "def set_num_threads(threads):\n    pass\n"
+STUB_SENTENCE_TRANSFORMERS = """
+import os
+
+import numpy as np
+
+
+class SentenceTransformer:
+    def __init__(self, model_name, device=None):
+        self.model_name = model_name
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, batch_size, **kwargs):
+        return np.array([[len(text), os.getpid()] for text in texts], dtype="float64")
+"""
+
+
+def test_worker_pool_keeps_order_and_the_model_out_of_the_main_process(tmp_path, monkeypatch):
+    (tmp_path / "torch.py").write_text(STUB_TORCH)
+    (tmp_path / "sentence_transformers.py").write_text(STUB_SENTENCE_TRANSFORMERS)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    texts = ["x" * length for length in range(1, 10)]
+    with EmbeddingService("stub", workers=2) as service:
+        assert service.dimension == 2
+        embeddings = service.encode_texts(texts, batch_size=2)
+        assert embeddings.dtype == np.float32
+        assert embeddings[:, 0].tolist() == list(range(1, 10))
+        assert os.getpid() not in embeddings[:, 1]
+
+        assert service.encode_query("abc")[0] == 3
+        assert service.encode_texts([]).shape == (0, 2)
+        assert service._model is None and service._dimension == 2
@@ -0,0 +1,86 @@
+import gc
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pytest
+
+from arxiv_rec.models.index import IndexConfig, VectorIndex, exact_search, recall_at_k
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 32))
+    embeddings = (centers[rng.integers(20, size=3000)] + 0.3 * rng.normal(size=(3000, 32))).astype(
+        "float32"
+    )
+    queries = embeddings[rng.choice(3000, size=50, replace=False)]
+    return embeddings, queries, exact_search(embeddings, queries, 10)[1]
+
+
+@pytest.mark.parametrize(
+    "config, min_recall",
+    [
+        (IndexConfig(index_type="ivf_flat", nlist=32, nprobe=4), 0.8),
+        (IndexConfig(index_type="ivf_pq", nlist=32, nprobe=8, pq_m=8), 0.4),
+        (IndexConfig(index_type="hnsw", hnsw_m=16, ef_search=32), 0.9),
+    ],
+    ids=["ivf_flat", "ivf_pq", "hnsw"],
+)
+def test_layouts_round_trip_with_their_config(tmp_path, data, config, min_recall):
+    embeddings, queries, exact_ids = data
+    index = VectorIndex.from_embeddings(embeddings, config)
+    _, ids = index.search(queries, k=10)
+    assert recall_at_k(ids, exact_ids) >= min_recall
+    assert index.memory_bytes() == faiss.serialize_index(index.index).nbytes
+
+    loaded = VectorIndex.load(index.save(tmp_path / "index.faiss"), mmap=True)
+    assert loaded.config == index.config
+    np.testing.assert_array_equal(loaded.search(queries, k=10)[1], ids)
+    if config.is_ivf:
+        assert faiss.extract_index_ivf(loaded.index).nprobe == config.nprobe
+        # Probing every list makes IVF-Flat exact for this call only.
+        _, all_lists = loaded.search(queries, k=10, nprobe=config.nlist)
+        if config.index_type == "ivf_flat":
+            assert recall_at_k(all_lists, exact_ids) == 1.0
+        assert faiss.extract_index_ivf(loaded.index).nprobe == config.nprobe
+    else:
+        assert loaded.index.hnsw.efSearch == config.ef_search
+
+
+def test_small_inputs_cap_ivf_without_touching_the_config(data):
+    embeddings = data[0][:200]
+    config = IndexConfig(index_type="ivf_pq", nlist=1024, pq_m=8)
+    index = VectorIndex.from_embeddings(embeddings, config)
+    assert index.config.index_type == "flat"  # too few points for 256-entry PQ codebooks
+    assert index.size == 200
+
+    ivf = VectorIndex.from_embeddings(embeddings, IndexConfig(index_type="ivf_flat"))
+    assert ivf.config.nlist == 200 // 39
+    assert config.nlist == 1024 and config.index_type == "ivf_pq"
+
+
+def anonymous_rss() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) * 1024
+    pytest.skip("RssAnon is not reported on this platform")
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="needs /proc")
+@pytest.mark.parametrize("index_type, rows", [("flat", 60_000), ("hnsw", 40_000)])
+def test_mmap_load_keeps_codes_in_the_file_mapping(tmp_path, index_type, rows):
+    embeddings = np.random.default_rng(0).normal(size=(rows, 384)).astype("float32")
+    config = IndexConfig(index_type=index_type, hnsw_m=8, ef_construction=16)
+    path = VectorIndex.from_embeddings(embeddings, config).save(tmp_path / "index.faiss")
+    codes_bytes = embeddings.nbytes
+    del embeddings
+    gc.collect()
+
+    before = anonymous_rss()
+    loaded = VectorIndex.load(path, mmap=True)
+    loaded.search(np.zeros((1, 384), dtype="float32"), k=5)
+    # A private copy would add every code to the anonymous resident set.
+    assert anonymous_rss() - before < codes_bytes / 4
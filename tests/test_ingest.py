@@ -0,0 +1,64 @@
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+from arxiv_rec.data.ingest import iter_metadata
+
+RECORDS = [
+    {"id": f"0704.{row:04d}", "title": f"Paper {row}", "authors_parsed": [["A", "B", ""]]}
+    for row in range(7)
+]
+RECORDS[3]["doi"] = "10.1/x"
+
+
+def write(path, records):
+    lines = "\n".join(json.dumps(record) for record in records) + "\n"
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("arxiv-metadata-oai-snapshot.json", lines)
+    elif path.suffix == ".csv":
+        pd.DataFrame(records).drop(columns="authors_parsed").to_csv(path, index=False)
+    else:
+        path.write_text(lines)
+    return path
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl", ".zip", ".csv"])
+def test_iter_metadata_streams_projected_chunks(tmp_path, suffix):
+    path = write(tmp_path / f"snapshot{suffix}", RECORDS)
+    columns = ["id", "title", "doi"]
+
+    chunks = list(iter_metadata(path, columns=columns, chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    frame = pd.concat(chunks, ignore_index=True)
+    assert list(frame.columns) == columns
+    assert frame["id"].tolist() == [record["id"] for record in RECORDS]
+    assert frame["doi"].notna().tolist() == [row == 3 for row in range(7)]
+
+    limited = list(iter_metadata(path, columns=columns, chunk_size=3, limit=4))
+    assert [len(chunk) for chunk in limited] == [3, 1]
+
+
+def test_iter_metadata_reports_columns_that_never_appear(tmp_path):
+    path = write(tmp_path / "snapshot.jsonl", RECORDS)
+    with pytest.raises(ValueError, match=r"\['abstract'\]"):
+        list(iter_metadata(path, columns=["id", "abstract"]))
+    with pytest.raises(ValueError, match="Unsupported"):
+        list(iter_metadata(write(tmp_path / "snapshot.txt", RECORDS)))
+
+
+def test_iter_metadata_checks_columns_before_yielding(tmp_path):
+    path = write(tmp_path / "snapshot.jsonl", RECORDS)
+    chunks = iter_metadata(path, columns=["id", "abstract"], chunk_size=1)
+    with pytest.raises(ValueError, match=r"\['abstract'\]"):
+        next(chunks)
+
+
+def test_iter_metadata_names_a_column_with_non_string_values(tmp_path):
+    records = [dict(record) for record in RECORDS]
+    records[5]["id"] = 704.0005
+    path = write(tmp_path / "snapshot.jsonl", records)
+    with pytest.raises(ValueError, match="'id' holds a non-string value"):
+        list(iter_metadata(path, columns=["id", "title"]))
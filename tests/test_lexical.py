@@ -0,0 +1,51 @@
+import numpy as np
+
+from arxiv_rec.models.lexical import LexicalIndex, reciprocal_rank_fusion
+
+TEXTS = [
+    "Low-rank adaptation of large language models",
+    "LoRA: cheap fine-tuning with low-rank updates",
+    "Dark matter halos in galaxy clusters",
+    "Galaxy rotation curves and dark matter",
+    "Quantum error correction with surface codes",
+]
+
+
+def test_bm25_finds_exact_terms_and_applies_filters(tmp_path):
+    built = LexicalIndex.build([TEXTS[:2], TEXTS[2:]], tmp_path / "lexical", n_features=2**10)
+    index = LexicalIndex.load(tmp_path / "lexical", mmap=True)
+    assert index.size == len(TEXTS)
+    np.testing.assert_array_equal(index.postings.data, built.postings.data)
+
+    scores, ids = index.search(["LoRA fine-tuning", "dark matter", "unrelated words"], k=3)
+    assert ids[0, 0] == 1 and ids[0, 1] == -1
+    assert set(ids[1, :2]) == {2, 3} and ids[1, 2] == -1
+    assert (ids[2] == -1).all() and (scores[2] == 0).all()
+    assert scores[1, 0] >= scores[1, 1] > 0
+
+    _, filtered = index.search(["dark matter"], k=3, accept=lambda rows: rows != 2)
+    assert filtered[0].tolist() == [3, -1, -1]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    ids, scores = reciprocal_rank_fusion([np.array([4, 7, 1, -1]), np.array([7, 9, -1, -1])], k=3)
+    assert ids.tolist() == [7, 4, 9]
+    assert scores[0] == np.float32(1 / 62 + 1 / 61)
+    assert scores[1] == np.float32(1 / 61) > scores[2]
+
+
+def test_build_streams_chunks_into_the_same_postings(tmp_path):
+    whole = LexicalIndex.build([TEXTS], tmp_path / "whole", n_features=2**10)
+    chunked = LexicalIndex.build(([text] for text in TEXTS), tmp_path / "one", n_features=2**10)
+    assert (whole.postings != chunked.postings).nnz == 0
+    assert chunked.postings.has_sorted_indices
+    assert sorted(path.name for path in (tmp_path / "one").iterdir()) == [
+        "data.npy",
+        "indices.npy",
+        "indptr.npy",
+        "lexical.json",
+    ]
+    # Terms in over half the papers get empty posting lists, not explicit zeros.
+    common = LexicalIndex.build([["dark matter"] * 3 + ["quantum"]], tmp_path / "df", 2**10)
+    assert common.postings.nnz == 1 and (common.postings.data > 0).all()
+    assert LexicalIndex.build([], tmp_path / "empty", n_features=2**10).size == 0
@@ -0,0 +1,29 @@
+from arxiv_rec.api.metrics import Collected, Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "search")
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{stage="search",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="search",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{stage="search",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{stage="search"} 4' in lines
+    assert 'latency_seconds_sum{stage="search"} 3.65' in lines
+
+
+def test_registry_renders_counters_and_collected_values():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("status",)))
+    requests.inc("200")
+    requests.inc("200")
+    requests.inc('5"0')
+    registry.register(Collected("items", "Items.", lambda: [((), 7)]))
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{status="200"} 2' in text
+    assert 'requests_total{status="5\\"0"} 1' in text
+    assert "# TYPE items gauge\nitems 7\n" in text
@@ -0,0 +1,19 @@
+import numpy as np
+
+from arxiv_rec.models.index import VectorIndex, exact_search
+from arxiv_rec.models.neighbors import NeighborGraph
+
+
+def test_graph_matches_exact_search_without_self(tmp_path):
+    embeddings = np.random.default_rng(0).normal(size=(300, 8)).astype("float32")
+    index = VectorIndex.from_embeddings(embeddings)
+    graph = NeighborGraph.build(index, embeddings, k=4, path=tmp_path / "n.npy", block_size=64)
+
+    _, exact = exact_search(embeddings, embeddings, 5)
+    expected = np.array([row[row != item][:4] for item, row in enumerate(exact)])
+    assert graph.ids.dtype == np.int32 and graph.scores.dtype == np.float16
+    np.testing.assert_array_equal(graph.ids, expected)
+
+    ids, scores = NeighborGraph.load(tmp_path / "n.npy", mmap=True).lookup(7, 2)
+    np.testing.assert_array_equal(ids, expected[7, :2])
+    assert ids.dtype == np.int64 and scores.dtype == np.float32
@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+tokenizers = pytest.importorskip("tokenizers")
+
+from arxiv_rec.models.onnx_encoder import OnnxEncoder, pooling_mode  # noqa: E402
+
+
+def write_toy_encoder(directory, table):
+    """Token embeddings = rows of ``table`` looked up by token id (a one-layer 'model')."""
+
+    from onnx import TensorProto, helper, numpy_helper
+
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["table", "input_ids"], ["token_embeddings"])],
+        "toy",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "seq"]),
+            helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "seq"]),
+        ],
+        [helper.make_tensor_value_info("token_embeddings", TensorProto.FLOAT, None)],
+        [numpy_helper.from_array(table, "table")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)], ir_version=8)
+    onnx.save(model, str(directory / "model.onnx"))
+
+    vocab = {"[PAD]": 0, "alpha": 1, "beta": 2, "gamma": 3, "[UNK]": 4}
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.save(str(directory / "tokenizer.json"))
+    config = {
+        "model_name": "toy",
+        "inputs": ["input_ids", "attention_mask"],
+        "pooling": "mean",
+        "max_seq_length": 3,
+        "dimension": table.shape[1],
+    }
+    (directory / "encoder.json").write_text(json.dumps(config))
+
+
+def test_mean_pooling_ignores_padding_and_normalizes(tmp_path):
+    table = np.random.default_rng(0).normal(size=(5, 6)).astype("float32")
+    write_toy_encoder(tmp_path, table)
+
+    encoder = OnnxEncoder(tmp_path)
+    embeddings = encoder.encode(["alpha beta", "gamma", "alpha beta gamma alpha", "delta"])
+
+    expected = np.stack(
+        [table[[1, 2]].mean(0), table[3], table[[1, 2, 3]].mean(0), table[4]]  # truncated to 3
+    )
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    assert embeddings.shape == (4, 6) and embeddings.dtype == np.float32
+    np.testing.assert_allclose(embeddings, expected, rtol=1e-5, atol=1e-6)
+
+
+def test_embedding_service_onnx_backend(tmp_path):
+    from arxiv_rec.models.embed import EmbeddingService
+
+    table = np.random.default_rng(1).normal(size=(5, 4)).astype("float32")
+    write_toy_encoder(tmp_path, table)
+
+    service = EmbeddingService("toy", backend="onnx", onnx_dir=tmp_path)
+    assert service.dimension == 4
+    np.testing.assert_allclose(
+        service.encode_texts(["beta"]), OnnxEncoder(tmp_path).encode(["beta"]), rtol=1e-6
+    )
+    with pytest.raises(ValueError):
+        EmbeddingService("another-model", backend="onnx", onnx_dir=tmp_path)
+
+
+def test_pooling_mode_reads_old_and_new_pooling_configs():
+    assert pooling_mode({"embedding_dimension": 384, "pooling_mode": "mean"}) == "mean"
+    assert (
+        pooling_mode({"pooling_mode_cls_token": True, "pooling_mode_mean_tokens": False}) == "cls"
+    )
+    assert (
+        pooling_mode({"pooling_mode_cls_token": False, "pooling_mode_mean_tokens": True}) == "mean"
+    )
+    with pytest.raises(ValueError, match="pooling"):
+        pooling_mode({"pooling_mode_max_tokens": True})
+    with pytest.raises(ValueError):
+        pooling_mode({"pooling_mode": "lasttoken"})
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from arxiv_rec.models.index import IndexConfig, exact_search
+from arxiv_rec.models.partitions import (
+    DATE_UNKNOWN,
+    PartitionedIndex,
+    parse_date_bound,
+    period_labels,
+)
+
+
+def _day(value):
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+def test_date_bounds_and_labels():
+    assert parse_date_bound("2021") == _day("2021-01-01")
+    assert parse_date_bound("2021", end=True) == _day("2021-12-31")
+    assert parse_date_bound("2024-02", end=True) == _day("2024-02-29")
+    assert parse_date_bound("2021-03-15", end=True) == _day("2021-03-15")
+    with pytest.raises(ValueError):
+        parse_date_bound("yesterday")
+
+    dates = np.array([_day("2020-05-01"), DATE_UNKNOWN, _day("2021-12-31")], dtype=np.int32)
+    assert period_labels(dates, "year").tolist() == ["2020", "unknown", "2021"]
+    assert period_labels(dates, "month").tolist() == ["2020-05", "unknown", "2021-12"]
+
+
+def test_partitioned_search_matches_filtered_exact_search(tmp_path):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(400, 8)).astype("float32")
+    dates = rng.integers(_day("2019-01-01"), _day("2022-12-31"), size=400).astype(np.int32)
+    dates[::37] = DATE_UNKNOWN
+
+    index, reused = PartitionedIndex.build(tmp_path, embeddings, dates, IndexConfig(), "year")
+    assert (len(index), reused) == (4, 0)
+    since, until = _day("2020-07-01"), _day("2021-12-31")
+    assert [part.name for part in index.overlapping(since, until)] == ["2020", "2021"]
+
+    _, ids = index.search(embeddings[:5], k=6, since=since, until=until)
+    _, ranked = exact_search(embeddings, embeddings[:5], len(embeddings))
+    for got, row in zip(ids, ranked):
+        expected = row[(dates[row] >= since) & (dates[row] <= until)][:6]
+        np.testing.assert_array_equal(got, expected)
+
+    assert PartitionedIndex.build(tmp_path, embeddings, dates, IndexConfig(), "year")[1] == 4
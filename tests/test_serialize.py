@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from arxiv_rec.api.cache import LRUCache
+from arxiv_rec.api.compression import CompressionMiddleware, choose_encoding
+from arxiv_rec.api.serialize import encode_hits, truncate
+
+
+def test_encode_hits_matches_dicts_and_reuses_fragments():
+    table = pa.table(
+        {
+            "id": ["0704.0001", "0704.0002", "0704.0003"],
+            "title": ['Quotes "and" unicode é', None, "Third"],
+            "abstract": ["one two three four five six", "short", "x"],
+        }
+    )
+    cache = LRUCache()
+    indices, scores = np.array([2, 0, -1]), np.array([0.9, 0.5, 0.0], dtype=np.float32)
+    fields = ["id", "title", "abstract", "categories"]
+
+    body = encode_hits(table, indices, scores, fields, cache=cache, namespace=1)
+    expected = [
+        dict(zip(fields, ["0704.0003", "Third", "x", ""]), score=float(scores[0])),
+        dict(
+            zip(fields, ["0704.0001", 'Quotes "and" unicode é', "one two three four five six", ""])
+        ),
+    ]
+    expected[1]["score"] = 0.5
+    assert json.loads(body) == expected
+    assert encode_hits(table, indices, scores, fields, cache=cache, namespace=1) == body
+    assert cache.hits == 2
+
+    nulls = json.loads(encode_hits(table, np.array([1]), np.array([1.0]), ["title"]))
+    assert nulls == [{"title": "", "score": 1.0}]
+
+    short = json.loads(encode_hits(table, np.array([0]), np.array([1.0]), ["abstract"], 12))
+    assert short == [{"abstract": "one two…", "score": 1.0}]
+    assert truncate("short", 12) == "short" and truncate(None, 3) is None
+
+
+def test_encode_hits_writes_non_finite_scores_as_null():
+    table = pa.table({"id": ["a", "b", "c"]})
+    scores = np.array([np.nan, np.inf, -np.inf], dtype=np.float32)
+    body = encode_hits(table, np.arange(3), scores, ["id"])
+    assert json.loads(body, parse_constant=pytest.fail) == [
+        {"id": "a", "score": None},
+        {"id": "b", "score": None},
+        {"id": "c", "score": None},
+    ]
+
+
+def test_compression_is_negotiated():
+    assert choose_encoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("gzip;q=1, br;q=0.2", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("br;q=0, *", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+
+    payload = {"results": ["abstract " * 20] * 20}
+    app = Starlette(
+        routes=[
+            Route("/big", lambda request: JSONResponse(payload)),
+            Route("/small", lambda request: PlainTextResponse("ok")),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, minimum_size=100, threadpool_size=1000)
+    client = TestClient(app)
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(payload)) / 5
+    assert response.json() == payload
+    for path, coding in (("/small", "gzip"), ("/big", "identity")):
+        headers = client.get(path, headers={"Accept-Encoding": coding}).headers
+        assert "content-encoding" not in headers
+
+    capped = Starlette(routes=[Route("/big", lambda request: JSONResponse(payload))])
+    capped.add_middleware(CompressionMiddleware, minimum_size=100, maximum_size=1000)
+    response = TestClient(capped).get("/big", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == payload
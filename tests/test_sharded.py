@@ -0,0 +1,31 @@
+import faiss
+import numpy as np
+
+from arxiv_rec.models.index import IndexConfig, VectorIndex
+from arxiv_rec.models.sharded import ShardedIndex, build_index, load_index
+
+
+def test_sharded_flat_matches_single_index(tmp_path):
+    embeddings = np.random.default_rng(0).normal(size=(1000, 8)).astype("float32")
+    single = VectorIndex.from_embeddings(embeddings)
+    sharded = build_index(embeddings, IndexConfig(shards=4))
+    assert isinstance(sharded, ShardedIndex) and sharded.size == 1000
+    assert sorted(np.concatenate(sharded.rows).tolist()) == list(range(1000))
+
+    _, expected = single.search(embeddings[:20], k=10)
+    path = sharded.save(tmp_path / "index.faiss")
+    loaded = load_index(path, mmap=True)
+    np.testing.assert_array_equal(loaded.search(embeddings[:20], k=10)[1], expected)
+    np.testing.assert_allclose(
+        loaded.reconstruct_batch(np.array([5, 999])), single.reconstruct_batch(np.array([5, 999]))
+    )
+
+    mask = np.packbits(np.arange(1000) % 7 == 0, bitorder="little")
+    selector = faiss.IDSelectorBitmap(1000, faiss.swig_ptr(mask))
+    _, filtered = loaded.search(embeddings[:20], k=10, selector=selector)
+    np.testing.assert_array_equal(
+        filtered, single.search(embeddings[:20], k=10, selector=selector)[1]
+    )
+
+    single.save(path)
+    assert isinstance(load_index(path), VectorIndex)
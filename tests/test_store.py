@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from arxiv_rec.api.server import RecommenderState
+from arxiv_rec.data.synthetic import HashingEmbedder
+from arxiv_rec.models.index import IndexConfig, VectorIndex
+from arxiv_rec.models.store import VectorStore
+
+
+@pytest.fixture(scope="module")
+def embeddings():
+    vectors = np.random.default_rng(0).normal(size=(500, 32)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("dtype, itemsize", [("float32", 4), ("float16", 2), ("int8", 1)])
+def test_write_round_trip_error_is_bounded(tmp_path, embeddings, dtype, itemsize):
+    path = tmp_path / "embeddings.npy"
+    store = VectorStore.write(path, embeddings, dtype, block_size=128)
+    assert store.dtype == dtype and store.shape == embeddings.shape
+    assert store.codes.nbytes == embeddings.size * itemsize
+    assert VectorStore.scale_path_for(path).exists() == (dtype == "int8")
+    assert not list(tmp_path.glob("*.partial.npy"))
+
+    error = np.abs(VectorStore.load(path)[:] - embeddings)
+    if dtype == "float32":
+        assert error.max() == 0
+    elif dtype == "float16":
+        assert error.max() <= 2**-11  # half the float16 spacing for |x| <= 1
+    else:
+        # Rounding to the nearest code is off by at most half a step per dimension.
+        assert np.all(error <= store.scale / 2 + 1e-6)
+
+    # Rewriting as float drops the stale scale file.
+    VectorStore.write(path, embeddings, "float32")
+    assert not VectorStore.scale_path_for(path).exists()
+
+
+@pytest.mark.parametrize(
+    "index_type, storage, factory",
+    [
+        ("flat", "float16", "SQfp16"),
+        ("flat", "int8", "SQ8"),
+        ("ivf_flat", "int8", "IVF1024,SQ8"),
+        ("hnsw", "float16", "HNSW32,SQfp16"),
+    ],
+)
+def test_storage_picks_the_scalar_quantizer(index_type, storage, factory):
+    assert IndexConfig(index_type=index_type, storage=storage).factory_string() == factory
+
+
+def test_ivf_pq_rejects_a_storage_it_would_ignore():
+    with pytest.raises(ValueError, match="ivf_pq"):
+        IndexConfig(index_type="ivf_pq", storage="int8")
+    with pytest.raises(ValueError, match="storage"):
+        IndexConfig(storage="bfloat16")
+
+
+def test_quantized_index_keeps_recall(embeddings):
+    queries = embeddings[:20]
+    for storage in ("float16", "int8"):
+        index = VectorIndex.from_embeddings(embeddings, IndexConfig(storage=storage))
+        assert (index.search(queries, k=1)[1][:, 0] == np.arange(20)).all()
+
+
+@pytest.mark.parametrize(
+    "index_type, from_store", [("flat", False), ("hnsw", False), ("ivf_flat", True)]
+)
+def test_item_vectors_use_the_store_only_without_reconstruct(
+    make_artifacts, index_type, from_store
+):
+    directory, _, embeddings = make_artifacts(index_type=index_type, storage="int8")
+    state = RecommenderState(directory, embedder=HashingEmbedder())
+    assert (state.vectors is not None) == from_store
+    if from_store:
+        assert state.vectors.dtype == "int8"
+
+    rows = np.array([3, 0, 7])
+    vectors = state._item_vectors(rows)
+    assert vectors.dtype == np.float32 and vectors.shape == (3, embeddings.shape[1])
+    np.testing.assert_allclose(vectors, embeddings[rows], atol=0.02)
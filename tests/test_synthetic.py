@@ -0,0 +1,25 @@
+import numpy as np
+
+from arxiv_rec.data.clean import prepare_corpus
+from arxiv_rec.data.ingest import load_metadata
+from arxiv_rec.data.synthetic import HashingEmbedder, iter_records, write_snapshot
+
+
+def test_synthetic_snapshot_is_deterministic_and_loadable(tmp_path):
+    assert list(iter_records(50, seed=3)) == list(iter_records(50, seed=3))
+    assert list(iter_records(50, seed=3)) != list(iter_records(50, seed=4))
+
+    tidy = prepare_corpus(load_metadata(write_snapshot(tmp_path / "snapshot.jsonl", 50)))
+    assert len(tidy) == 50
+    assert tidy["id"].is_unique
+
+
+def test_hashing_embedder_is_normalized_and_stable():
+    embedder = HashingEmbedder()
+    assert embedder.model_name == "hashing-384"
+    texts = ["quantum gauge symmetry", "gauge symmetry of quantum fields", "galaxy survey"]
+    first = embedder.encode_texts(texts, show_progress_bar=False)
+    second = HashingEmbedder().encode_texts(texts, show_progress_bar=False)
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-6)
+    assert first[0] @ first[1] > first[0] @ first[2]